@@ -2,36 +2,62 @@
 
 import logging
 
-from bwt_api.api import BwtApi
-from bwt_api.exception import BwtException
-
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform
+from homeassistant.const import CONF_HOST, Platform
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.entity_registry import async_migrate_entries
+from homeassistant.helpers.typing import ConfigType
 
-from .const import DOMAIN
+from .api import SharedSessionBwtApi
+from .availability import GracePeriods
+from .const import CONF_EXPORT_TARGET, CONF_STATISTICS, DOMAIN
+from .coordinator import BwtCoordinator
+from .leak import LeakConfig
+from .policy import PollingPolicy
+from .services import async_setup_services
+from .websocket import async_setup_websocket
 
 _LOGGER = logging.getLogger(__name__)
-PLATFORMS: list[Platform] = [Platform.SENSOR]
+PLATFORMS: list[Platform] = [Platform.BINARY_SENSOR, Platform.SENSOR]
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+
+async def async_setup(hass: HomeAssistant, config: ConfigType) -> bool:
+    """Set up the services and websocket commands of the BWT Perla integration."""
+    async_setup_services(hass)
+    async_setup_websocket(hass)
+    return True
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up BWT Perla from a config entry."""
 
     hass.data.setdefault(DOMAIN, {})
-    api = BwtApi(entry.data["host"], entry.data["code"])
-    try:
-        await api.get_current_data()
-    except BwtException as e:
-        _LOGGER.exception("Error setting up Bwt API")
-        await api.close()
-        raise ConfigEntryNotReady from e
-
-    hass.data[DOMAIN][entry.entry_id] = api
+    api = SharedSessionBwtApi(hass, entry.data["host"], entry.data["code"])
+    coordinator = BwtCoordinator(hass, api, entry)
+    await coordinator.async_load()
+    entry.async_on_unload(coordinator.scheduler.async_register(coordinator))
+
+    if coordinator.data is None:
+        # Nothing known yet, the first refresh raises ConfigEntryNotReady on failure
+        try:
+            await coordinator.async_config_entry_first_refresh()
+        except ConfigEntryNotReady:
+            # The next attempt uses the new address if the device moved
+            await coordinator.async_rediscover()
+            raise
+    else:
+        # Start with the last known data and refresh it in the background
+        entry.async_create_background_task(
+            hass, coordinator.async_refresh(), f"{DOMAIN} {entry.entry_id} refresh"
+        )
+
+    hass.data[DOMAIN][entry.entry_id] = coordinator
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
 
     return True
 
@@ -39,12 +65,29 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(entry, PLATFORMS):
-        api = hass.data[DOMAIN].pop(entry.entry_id)
-        await api.close()
+        coordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        await coordinator.async_set_capture(False)
+        await coordinator.async_set_export(None)
+        await coordinator.my_api.close()
 
     return unload_ok
 
 
+async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply changed options and data, the polling policy without a reload."""
+    coordinator: BwtCoordinator = hass.data[DOMAIN][entry.entry_id]
+    moved = entry.data[CONF_HOST] != coordinator.host
+    statistics = entry.options.get(CONF_STATISTICS, False)
+    if moved or statistics != (coordinator.statistics is not None):
+        # A new address or the statistics changing the sensors need a new setup
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+    coordinator.leak.config = LeakConfig.from_options(entry.options)
+    coordinator.grace = GracePeriods.from_options(entry.options)
+    coordinator.async_set_policy(PollingPolicy.from_options(entry.options))
+    await coordinator.async_set_export(entry.options.get(CONF_EXPORT_TARGET))
+
+
 async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Migrate old entry."""
     _LOGGER.debug("Migrating from version %s", entry.version)
@@ -0,0 +1,144 @@
+"""Access the device api over the session shared within Home Assistant."""
+
+import asyncio
+from datetime import UTC, datetime
+import logging
+from typing import Any
+
+import aiohttp
+from bwt_api.data import BwtStatus, CurrentResponse, Hardness
+from bwt_api.error import BwtError
+from bwt_api.exception import ApiException, ConnectException, WrongCodeException
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+_DATA_HOSTS = f"{DOMAIN}_hosts"
+# The local API of the device always listens on this port
+PORT = 8080
+# The small web server of the device handles requests one after the other
+_REQUESTS_PER_HOST = 1
+_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class SharedSessionBwtApi:
+    """Api of a device sending its requests over the shared Home Assistant session.
+
+    Connections are kept alive and reused across polls, config flows and
+    devices instead of every api owning a session. Requests and errors are
+    the same as with bwt_api, of which only the data classes and exceptions
+    are used.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, host: str, code: str, *, limit_host: bool = True
+    ) -> None:
+        """Initialize the api of the device at the host.
+
+        The requests to a host are limited together with the other apis of the
+        host. Without limit_host, no limit is registered for a new host.
+        """
+        self._host = host
+        self._url = f"http://{host}:{PORT}/api/"
+        self._session = async_get_clientsession(hass)
+        self._auth = aiohttp.BasicAuth("user", code)
+        limits: dict[str, asyncio.Semaphore] = hass.data.setdefault(_DATA_HOSTS, {})
+        if (limit := limits.get(host)) is None:
+            limit = asyncio.Semaphore(_REQUESTS_PER_HOST)
+            if limit_host:
+                limits[host] = limit
+        self._limit = limit
+
+    async def __aenter__(self) -> "SharedSessionBwtApi":
+        """Return the api, nothing to open."""
+        return self
+
+    async def __aexit__(self, *err: object) -> None:
+        """Close the api."""
+        await self.close()
+
+    async def close(self) -> None:
+        """Keep the shared session open, it is owned by Home Assistant."""
+
+    async def _async_get(self, endpoint: str) -> dict[str, Any]:
+        """Return the payload of an endpoint of the device.
+
+        Every failure is raised as one of the bwt_api exceptions.
+        """
+        try:
+            async with self._limit, self._session.get(
+                self._url + endpoint, auth=self._auth
+            ) as response:
+                if response.status == 200:
+                    return await response.json(content_type=None)
+                text = await response.text()
+        except aiohttp.ClientConnectorError as err:
+            raise ConnectException from err
+        except (aiohttp.ClientError, ValueError) as err:
+            # Broken connections and payloads that are not json
+            raise ApiException(f"Invalid response: {err!r}") from err
+        if response.status == 404 and not text:
+            # The device answers a wrong code with an empty 404
+            raise WrongCodeException
+        _LOGGER.debug("Unknown response with status %s: %s", response.status, text)
+        raise ApiException(f"Unknown response: {text}")
+
+    async def get_current_data(self) -> CurrentResponse:
+        """Return all values of the device."""
+        raw = await self._async_get("GetCurrentData")
+        try:
+            return _current_response(raw)
+        except (AttributeError, KeyError, TypeError, ValueError) as err:
+            raise ApiException(f"Unexpected payload: {err!r}") from err
+
+
+def _datetime(value: str) -> datetime:
+    """Return a time of the payload, the device uses UTC."""
+    return datetime.strptime(value, _TIME_FORMAT).replace(tzinfo=UTC)
+
+
+def _current_response(raw: dict[str, Any]) -> CurrentResponse:
+    """Return the values of the GetCurrentData payload."""
+    return CurrentResponse(
+        errors=[
+            BwtError(int(error)) for error in raw["ActiveErrorIDs"].split(",") if error
+        ],
+        blended_total=raw["BlendedWaterSinceSetup_l"],
+        capacity_1=raw["CapacityColumn1_ml_dH"],
+        capacity_2=raw["CapacityColumn2_ml_dH"],
+        current_flow=raw["CurrentFlowrate_l_h"],
+        dosing_total=raw["DosingSinceSetup_ml"],
+        firmware_version=raw["FirmwareVersion"],
+        in_hardness=Hardness(
+            raw["HardnessIN_CaCO3"],
+            raw["HardnessIN_dH"],
+            raw["HardnessIN_fH"],
+            raw["HardnessIN_mmol_l"],
+        ),
+        out_hardness=Hardness(
+            raw["HardnessOUT_CaCO3"],
+            raw["HardnessOUT_dH"],
+            raw["HardnessOUT_fH"],
+            raw["HardnessOUT_mmol_l"],
+        ),
+        holiday_mode=raw["HolidayModeStartTime"],
+        regeneration_last_1=_datetime(raw["LastRegenerationColumn1"]),
+        regeneration_last_2=_datetime(raw["LastRegenerationColumn2"]),
+        service_customer=_datetime(raw["LastServiceCustomer"]),
+        service_technician=_datetime(raw["LastServiceTechnican"]),
+        out_of_service=raw["OutOfService"],
+        regeneration_count_1=raw["RegenerationCounterColumn1"],
+        regeneration_count_2=raw["RegenerationCounterColumn2"],
+        regeneration_count=raw["RegenerationCountSinceSetup"],
+        regenerativ_level=raw["RegenerativLevel"],
+        regenerativ_days=raw["RegenerativRemainingDays"],
+        regenerativ_total=raw["RegenerativSinceSetup_g"],
+        state=BwtStatus(int(raw["ShowError"])),
+        treated_day=raw["WaterTreatedCurrentDay_l"],
+        treated_month=raw["WaterTreatedCurrentMonth_l"],
+        treated_year=raw["WaterTreatedCurrentYear_l"],
+    )
@@ -0,0 +1,44 @@
+"""Keep the entities available with the last values while polls fail."""
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any
+
+from .const import CONF_GRACE_PERIOD
+
+DEFAULT_GRACE_PERIOD = 300
+# Seconds values that change within weeks at most stay available, the
+# regenerations happen every few days and are not among them
+SLOW_GRACE_PERIOD = 24 * 3600
+SLOW_FIELDS = frozenset(
+    {
+        "in_hardness",
+        "out_hardness",
+        "service_customer",
+        "service_technician",
+        "holiday_start",
+        "last_salt_refill",
+    }
+)
+
+
+@dataclass(frozen=True, slots=True)
+class GracePeriods:
+    """How long the last values stay available after the last successful poll."""
+
+    fast: timedelta = timedelta(seconds=DEFAULT_GRACE_PERIOD)
+    # Entities that only depend on slow fields
+    slow: timedelta = timedelta(seconds=SLOW_GRACE_PERIOD)
+
+    @classmethod
+    def from_options(cls, options: Mapping[str, Any]) -> "GracePeriods":
+        """Create the grace periods from the options of the entry."""
+        fast = timedelta(seconds=options.get(CONF_GRACE_PERIOD, DEFAULT_GRACE_PERIOD))
+        return cls(fast, max(fast, timedelta(seconds=SLOW_GRACE_PERIOD)))
+
+    def for_fields(self, fields: frozenset[str] | None) -> timedelta:
+        """Return the grace period of a listener depending on the fields."""
+        if fields is not None and fields <= SLOW_FIELDS:
+            return self.slow
+        return self.fast
@@ -0,0 +1,64 @@
+"""Binary sensors of the BWT Perla integration."""
+
+from homeassistant.components.binary_sensor import (
+    BinarySensorDeviceClass,
+    BinarySensorEntity,
+    BinarySensorEntityDescription,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import Platform
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+
+from .const import DOMAIN
+from .coordinator import BwtCoordinator
+from .entity import BwtEntity, bwt_device_info
+
+LEAK = BinarySensorEntityDescription(
+    key="leak",
+    icon="mdi:pipe-leak",
+    device_class=BinarySensorDeviceClass.PROBLEM,
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up bwt binary sensors from config entry."""
+    coordinator: BwtCoordinator = hass.data[DOMAIN][config_entry.entry_id]
+    device_info = bwt_device_info(coordinator, config_entry)
+    async_add_entities(
+        [LeakSensor(coordinator, device_info, config_entry.entry_id, LEAK)]
+    )
+
+
+class LeakSensor(BwtEntity, BinarySensorEntity):
+    """Problem sensor that is on while a leak is detected."""
+
+    _platform = Platform.BINARY_SENSOR
+
+    def __init__(
+        self,
+        coordinator: BwtCoordinator,
+        device_info: DeviceInfo,
+        entry_id: str,
+        description: BinarySensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor with the common coordinator."""
+        super().__init__(
+            coordinator, device_info, entry_id, description, frozenset({"leak"})
+        )
+
+    @callback
+    def _update_attrs(self) -> None:
+        """Update the state from the coordinator data."""
+        leak = self.coordinator.leak_state
+        self._attr_is_on = self.coordinator.data.leak is not None
+        self._attr_extra_state_attributes = {
+            "reason": self.coordinator.data.leak,
+            "duration": round(leak.duration),
+            "volume": leak.volume,
+        }
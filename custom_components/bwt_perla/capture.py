@@ -0,0 +1,144 @@
+"""Capture the responses of the device to files, e.g. to replay them later."""
+
+import asyncio
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+import gzip
+import json
+import logging
+import os
+
+from bwt_api.data import CurrentResponse
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import DOMAIN
+from .data import response_as_dict, response_from_dict
+
+_LOGGER = logging.getLogger(__name__)
+
+CAPTURE_DIRECTORY = f"{DOMAIN}_capture"
+# Compressed bytes of one file and the number of files in the ring
+DEFAULT_MAX_SIZE = 1_000_000
+DEFAULT_FILES = 4
+# Lines are written in batches of this size or after the delay in seconds
+_BATCH_LINES = 30
+_BATCH_DELAY = 60
+
+
+class ResponseCapture:
+    """Append the responses of a device to a ring of compressed JSONL files.
+
+    Every line holds the time of the poll and the response as stored in the
+    snapshot. A file that exceeds the maximum size is closed and the next file
+    of the ring is overwritten, so a capture never takes more than the number
+    of files times the maximum size. Every batch of lines is appended as
+    complete gzip member, the files can be read at any time.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        name: str,
+        max_size: int = DEFAULT_MAX_SIZE,
+        files: int = DEFAULT_FILES,
+    ) -> None:
+        """Initialize the capture, the files are created with the first write."""
+        self._hass = hass
+        self._prefix = hass.config.path(CAPTURE_DIRECTORY, name)
+        self._max_size = max_size
+        self._files = files
+        # File of the ring that is appended to, found with the first write
+        self._index: int | None = None
+        self._pending: list[str] = []
+        self._task: asyncio.Task | None = None
+        self._unsub_flush: CALLBACK_TYPE | None = None
+
+    @property
+    def paths(self) -> list[str]:
+        """Return the paths of all files of the ring."""
+        return [self._path(index) for index in range(self._files)]
+
+    def _path(self, index: int) -> str:
+        return f"{self._prefix}.{index}.jsonl.gz"
+
+    @callback
+    def add(self, now: datetime, response: CurrentResponse) -> None:
+        """Queue the response of a poll to be written."""
+        self._pending.append(
+            json.dumps(
+                {"time": now.isoformat(), "response": response_as_dict(response)}
+            )
+        )
+        if len(self._pending) >= _BATCH_LINES:
+            self._async_flush()
+        elif self._unsub_flush is None:
+            self._unsub_flush = async_call_later(
+                self._hass, _BATCH_DELAY, self._async_flush
+            )
+
+    @callback
+    def _async_flush(self, _now: datetime | None = None) -> None:
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+            self._unsub_flush = None
+        if self._task is None and self._pending:
+            self._task = self._hass.async_create_background_task(
+                self._async_write(), f"{DOMAIN} capture {self._prefix}"
+            )
+
+    async def _async_write(self) -> None:
+        try:
+            # Lines added during a write are part of the next batch
+            while self._pending:
+                lines, self._pending = self._pending, []
+                await self._hass.async_add_executor_job(self._write, lines)
+        except OSError as err:
+            _LOGGER.error("Error writing the capture %s: %s", self._prefix, err)
+        finally:
+            self._task = None
+
+    async def async_close(self) -> None:
+        """Write the queued lines."""
+        self._async_flush()
+        if self._task is not None:
+            await self._task
+
+    def _write(self, lines: list[str]) -> None:
+        """Append the lines to the current file, runs in the executor."""
+        if self._index is None:
+            os.makedirs(os.path.dirname(self._prefix), exist_ok=True)
+            self._index = self._newest_index()
+        path = self._path(self._index)
+        with gzip.open(path, "at", encoding="utf-8") as file:
+            file.write("\n".join(lines) + "\n")
+        if os.path.getsize(path) >= self._max_size:
+            self._index = (self._index + 1) % self._files
+            # Start the next file of the ring, dropping the oldest capture
+            with open(self._path(self._index), "wb"):
+                pass
+
+    def _newest_index(self) -> int:
+        """Return the file that was written last, to continue a capture."""
+        modified = {
+            index: os.path.getmtime(path)
+            for index, path in enumerate(self.paths)
+            if os.path.exists(path)
+        }
+        return max(modified, key=modified.__getitem__, default=0)
+
+
+def read_capture(paths: Iterable[str]) -> Iterator[tuple[datetime, CurrentResponse]]:
+    """Return the captured responses of the files in order of their time."""
+    records: list[tuple[datetime, dict]] = []
+    for path in paths:
+        with gzip.open(path, "rt", encoding="utf-8") as file:
+            for line in file:
+                if line.strip():
+                    record = json.loads(line)
+                    records.append(
+                        (datetime.fromisoformat(record["time"]), record["response"])
+                    )
+    records.sort(key=lambda record: record[0])
+    return ((time, response_from_dict(response)) for time, response in records)
@@ -1,23 +1,61 @@
 """Config flow for BWT Perla integration."""
+from collections.abc import Mapping
 import logging
 from typing import Any
 
-from bwt_api.api import BwtApi
 from bwt_api.exception import ConnectException, WrongCodeException
 import voluptuous as vol
 
 from homeassistant import config_entries
 from homeassistant.const import CONF_CODE, CONF_HOST
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
+from homeassistant.helpers import selector
 
-from .const import DOMAIN
+from .api import SharedSessionBwtApi
+from .availability import DEFAULT_GRACE_PERIOD
+from .const import (
+    CONF_DRIP_END,
+    CONF_DRIP_START,
+    CONF_EXPORT_TARGET,
+    CONF_GRACE_PERIOD,
+    CONF_HOLIDAY_INTERVAL,
+    CONF_LEAK_DURATION,
+    CONF_LEAK_VOLUME,
+    CONF_MAX_INTERVAL,
+    CONF_MIN_INTERVAL,
+    CONF_QUIET_END,
+    CONF_QUIET_INTERVAL,
+    CONF_QUIET_START,
+    CONF_RAMP_FACTOR,
+    CONF_STATISTICS,
+    DOMAIN,
+)
+from .discovery import async_discover
+from .export import parse_target
+from .leak import (
+    DEFAULT_DRIP_END,
+    DEFAULT_DRIP_START,
+    DEFAULT_LEAK_DURATION,
+    DEFAULT_LEAK_VOLUME,
+)
+from .policy import (
+    DEFAULT_HOLIDAY_INTERVAL,
+    DEFAULT_MAX_INTERVAL,
+    DEFAULT_MIN_INTERVAL,
+    DEFAULT_QUIET_INTERVAL,
+    DEFAULT_RAMP_FACTOR,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
+# Polling intervals in seconds
+_SECONDS = vol.All(vol.Coerce(int), vol.Range(min=1, max=3600))
+
 STEP_USER_DATA_SCHEMA = vol.Schema(
     {
-        vol.Required(CONF_HOST): str,
+        # Without host the local network is searched for the device
+        vol.Optional(CONF_HOST): str,
         vol.Required(CONF_CODE): str,
     }
 )
@@ -28,7 +66,7 @@ async def validate_input(hass: HomeAssistant, data: dict[str, Any]) -> dict[str,
 
     Data has the keys from STEP_USER_DATA_SCHEMA with values provided by the user.
     """
-    async with BwtApi(data[CONF_HOST], data[CONF_CODE]) as api:
+    async with SharedSessionBwtApi(hass, data[CONF_HOST], data[CONF_CODE]) as api:
         await api.get_current_data()
 
     # Return info that you want to store in the config entry.
@@ -40,25 +78,218 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 2
 
+    def __init__(self) -> None:
+        """Initialize the config flow."""
+        self._code: str | None = None
+        self._hosts: list[str] = []
+        self._reauth_entry: config_entries.ConfigEntry | None = None
+
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> config_entries.OptionsFlow:
+        """Create the options flow."""
+        return OptionsFlowHandler(config_entry)
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
         """Handle the initial step."""
         errors: dict[str, str] = {}
-        if user_input is not None:
-            try:
-                info = await validate_input(self.hass, user_input)
-                return self.async_create_entry(title=info["title"], data=user_input)
-            except ConnectException:
-                _LOGGER.exception("Connection error setting up the Bwt Api")
-                errors["base"] = "cannot_connect"
-            except WrongCodeException:
-                _LOGGER.exception("Wrong user code passed to bwt api")
-                errors["base"] = "invalid_auth"
-            except Exception:  # pylint: disable=broad-except
-                _LOGGER.exception("Unexpected exception")
-                errors["base"] = "unknown"
+        if user_input is not None and not user_input.get(CONF_HOST):
+            configured = {
+                entry.data[CONF_HOST] for entry in self._async_current_entries()
+            }
+            self._code = user_input[CONF_CODE]
+            self._hosts = [
+                host
+                for host in await async_discover(self.hass, self._code)
+                if host not in configured
+            ]
+            if len(self._hosts) > 1:
+                return await self.async_step_pick_host()
+            if not self._hosts:
+                errors["base"] = "no_devices_found"
+            else:
+                user_input = {CONF_HOST: self._hosts[0], CONF_CODE: self._code}
+        if user_input is not None and not errors:
+            result = await self._async_create_entry(user_input, errors)
+            if result is not None:
+                return result
 
         return self.async_show_form(
             step_id="user", data_schema=STEP_USER_DATA_SCHEMA, errors=errors
         )
+
+    async def async_step_pick_host(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Let the user pick one of the discovered devices."""
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            data = {CONF_HOST: user_input[CONF_HOST], CONF_CODE: self._code}
+            result = await self._async_create_entry(data, errors)
+            if result is not None:
+                return result
+
+        return self.async_show_form(
+            step_id="pick_host",
+            data_schema=vol.Schema({vol.Required(CONF_HOST): vol.In(self._hosts)}),
+            errors=errors,
+        )
+
+    async def async_step_reauth(self, entry_data: Mapping[str, Any]) -> FlowResult:
+        """Handle a user code the device no longer accepts."""
+        self._reauth_entry = self.hass.config_entries.async_get_entry(
+            self.context["entry_id"]
+        )
+        return await self.async_step_reauth_confirm()
+
+    async def async_step_reauth_confirm(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Ask for the new user code."""
+        assert self._reauth_entry is not None
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            data = {**self._reauth_entry.data, CONF_CODE: user_input[CONF_CODE]}
+            if await self._async_validate(data, errors) is not None:
+                return self.async_update_reload_and_abort(self._reauth_entry, data=data)
+
+        return self.async_show_form(
+            step_id="reauth_confirm",
+            data_schema=vol.Schema({vol.Required(CONF_CODE): str}),
+            errors=errors,
+        )
+
+    async def _async_create_entry(
+        self, data: dict[str, Any], errors: dict[str, str]
+    ) -> FlowResult | None:
+        """Create the entry if the device is reachable, else add the error."""
+        if (info := await self._async_validate(data, errors)) is None:
+            return None
+        return self.async_create_entry(title=info["title"], data=data)
+
+    async def _async_validate(
+        self, data: dict[str, Any], errors: dict[str, str]
+    ) -> dict[str, Any] | None:
+        """Return the info of the device if it is reachable, else add the error."""
+        try:
+            return await validate_input(self.hass, data)
+        except ConnectException:
+            _LOGGER.exception("Connection error setting up the Bwt Api")
+            errors["base"] = "cannot_connect"
+        except WrongCodeException:
+            _LOGGER.exception("Wrong user code passed to bwt api")
+            errors["base"] = "invalid_auth"
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Unexpected exception")
+            errors["base"] = "unknown"
+        return None
+
+
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle the options of a BWT Perla."""
+
+    def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
+        """Initialize the options flow."""
+        self.config_entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the options."""
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            if user_input[CONF_MIN_INTERVAL] > user_input[CONF_MAX_INTERVAL]:
+                errors["base"] = "invalid_intervals"
+            elif (CONF_QUIET_START in user_input) != (CONF_QUIET_END in user_input):
+                errors["base"] = "incomplete_quiet_window"
+            elif not _valid_export_target(user_input.get(CONF_EXPORT_TARGET)):
+                errors["base"] = "invalid_export_target"
+            else:
+                return self.async_create_entry(title="", data=user_input)
+
+        options = user_input or self.config_entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        CONF_STATISTICS,
+                        default=options.get(CONF_STATISTICS, False),
+                    ): bool,
+                    vol.Optional(
+                        CONF_MIN_INTERVAL,
+                        default=options.get(CONF_MIN_INTERVAL, DEFAULT_MIN_INTERVAL),
+                    ): _SECONDS,
+                    vol.Optional(
+                        CONF_MAX_INTERVAL,
+                        default=options.get(CONF_MAX_INTERVAL, DEFAULT_MAX_INTERVAL),
+                    ): _SECONDS,
+                    vol.Optional(
+                        CONF_RAMP_FACTOR,
+                        default=options.get(CONF_RAMP_FACTOR, DEFAULT_RAMP_FACTOR),
+                    ): vol.All(vol.Coerce(float), vol.Range(min=1.1, max=10)),
+                    vol.Optional(
+                        CONF_HOLIDAY_INTERVAL,
+                        default=options.get(
+                            CONF_HOLIDAY_INTERVAL, DEFAULT_HOLIDAY_INTERVAL
+                        ),
+                    ): _SECONDS,
+                    vol.Optional(
+                        CONF_QUIET_START,
+                        description={"suggested_value": options.get(CONF_QUIET_START)},
+                    ): selector.TimeSelector(),
+                    vol.Optional(
+                        CONF_QUIET_END,
+                        description={"suggested_value": options.get(CONF_QUIET_END)},
+                    ): selector.TimeSelector(),
+                    vol.Optional(
+                        CONF_QUIET_INTERVAL,
+                        default=options.get(
+                            CONF_QUIET_INTERVAL, DEFAULT_QUIET_INTERVAL
+                        ),
+                    ): _SECONDS,
+                    vol.Optional(
+                        CONF_LEAK_DURATION,
+                        default=options.get(CONF_LEAK_DURATION, DEFAULT_LEAK_DURATION),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=24 * 60)),
+                    vol.Optional(
+                        CONF_LEAK_VOLUME,
+                        default=options.get(CONF_LEAK_VOLUME, DEFAULT_LEAK_VOLUME),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=1, max=10000)),
+                    vol.Optional(
+                        CONF_DRIP_START,
+                        default=options.get(CONF_DRIP_START, DEFAULT_DRIP_START),
+                    ): selector.TimeSelector(),
+                    vol.Optional(
+                        CONF_DRIP_END,
+                        default=options.get(CONF_DRIP_END, DEFAULT_DRIP_END),
+                    ): selector.TimeSelector(),
+                    vol.Optional(
+                        CONF_GRACE_PERIOD,
+                        default=options.get(CONF_GRACE_PERIOD, DEFAULT_GRACE_PERIOD),
+                    ): vol.All(vol.Coerce(int), vol.Range(min=0, max=24 * 3600)),
+                    vol.Optional(
+                        CONF_EXPORT_TARGET,
+                        description={
+                            "suggested_value": options.get(CONF_EXPORT_TARGET)
+                        },
+                    ): str,
+                }
+            ),
+            errors=errors,
+        )
+
+
+def _valid_export_target(target: str | None) -> bool:
+    """Return if the export target is empty or supported."""
+    if not target:
+        return True
+    try:
+        parse_target(target)
+    except ValueError:
+        return False
+    return True
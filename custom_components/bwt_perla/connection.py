@@ -0,0 +1,99 @@
+"""Adapt the requests to how fast and how reliably the device responds."""
+
+import random
+
+# Smoothing of the round trip time and its variation as in RFC 6298
+_ALPHA = 1 / 8
+_BETA = 1 / 4
+# Bounds of the timeout in seconds
+TIMEOUT_MIN = 2.0
+TIMEOUT_MAX = 10.0
+# Consecutive failures after which the circuit opens
+_FAILURE_THRESHOLD = 3
+# Seconds to wait after the circuit opened, doubled with every failed probe
+_BACKOFF_MIN = 30.0
+_BACKOFF_MAX = 600.0
+# Relative random variation of the backoff, so devices don't retry in sync
+_JITTER = 0.2
+# The coordinator aligns its timer to full seconds, so it may fire a bit early
+_SLACK = 1.0
+
+
+class RttEstimator:
+    """Estimate the round trip time of the device to derive the timeout.
+
+    The timeout is the smoothed round trip time plus four times its variation.
+    It doubles after every timeout until a request succeeds again.
+    """
+
+    def __init__(self) -> None:
+        """Initialize without samples, using the maximum timeout."""
+        self.srtt: float | None = None
+        self.rttvar = 0.0
+        self._backoff = 1
+
+    def add(self, rtt: float) -> None:
+        """Add the round trip time of a successful request."""
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
+        else:
+            self.rttvar = (1 - _BETA) * self.rttvar + _BETA * abs(self.srtt - rtt)
+            self.srtt = (1 - _ALPHA) * self.srtt + _ALPHA * rtt
+        self._backoff = 1
+
+    def timed_out(self) -> None:
+        """Back off the timeout after a request timed out."""
+        self._backoff = min(self._backoff * 2, 8)
+
+    @property
+    def timeout(self) -> float:
+        """Return the timeout for the next request in seconds."""
+        if self.srtt is None:
+            return TIMEOUT_MAX
+        timeout = (self.srtt + 4 * self.rttvar) * self._backoff
+        return min(TIMEOUT_MAX, max(TIMEOUT_MIN, timeout))
+
+
+class CircuitBreaker:
+    """Stop polling fast once the device failed repeatedly.
+
+    After consecutive failures the circuit opens and the next request is only
+    sent after an exponential backoff. That request is a probe: the circuit
+    closes if it succeeds and opens again with a longer backoff otherwise.
+    """
+
+    def __init__(self) -> None:
+        """Initialize a closed circuit."""
+        self.failures = 0
+        self._retry_at: float | None = None
+
+    @property
+    def is_open(self) -> bool:
+        """Return if the circuit is open or half open."""
+        return self._retry_at is not None
+
+    def allow_request(self, now: float) -> bool:
+        """Return if a request may be sent at the given monotonic time."""
+        return self._retry_at is None or now + _SLACK >= self._retry_at
+
+    def success(self) -> None:
+        """Close the circuit after a successful request."""
+        self.failures = 0
+        self._retry_at = None
+
+    def failure(self, now: float) -> float | None:
+        """Count a failed request.
+
+        Returns the seconds to wait before the next request if the circuit is
+        open, None if it is still closed.
+        """
+        self.failures += 1
+        if self.failures < _FAILURE_THRESHOLD:
+            return None
+        backoff = min(
+            _BACKOFF_MAX, _BACKOFF_MIN * 2 ** (self.failures - _FAILURE_THRESHOLD)
+        )
+        backoff *= random.uniform(1 - _JITTER, 1 + _JITTER)
+        self._retry_at = now + backoff
+        return backoff
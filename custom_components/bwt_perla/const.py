@@ -1,3 +1,21 @@
 """Constants for the BWT Perla integration."""
 
 DOMAIN = "bwt_perla"
+
+CONF_STATISTICS = "statistics"
+CONF_MIN_INTERVAL = "min_interval"
+CONF_MAX_INTERVAL = "max_interval"
+CONF_RAMP_FACTOR = "ramp_factor"
+CONF_HOLIDAY_INTERVAL = "holiday_interval"
+CONF_QUIET_START = "quiet_start"
+CONF_QUIET_END = "quiet_end"
+CONF_QUIET_INTERVAL = "quiet_interval"
+CONF_LEAK_DURATION = "leak_duration"
+CONF_LEAK_VOLUME = "leak_volume"
+CONF_DRIP_START = "drip_start"
+CONF_DRIP_END = "drip_end"
+CONF_GRACE_PERIOD = "grace_period"
+CONF_EXPORT_TARGET = "export_target"
+
+EVENT_LEAK_DETECTED = f"{DOMAIN}_leak_detected"
+EVENT_REGENERATION = f"{DOMAIN}_regeneration"
@@ -1,61 +1,642 @@
 """Coordinator to fetch the data once for all sensors."""
 
 import asyncio
-from datetime import timedelta
+from collections.abc import Callable
+from datetime import datetime, timedelta
 import logging
+import time
+from typing import Any
 
-from bwt_api.api import BwtApi
+import aiohttp
 from bwt_api.data import CurrentResponse
+from bwt_api.exception import BwtException, ConnectException, WrongCodeException
 
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_CODE, CONF_HOST
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+from homeassistant.util import dt as dt_util
+
+from .api import SharedSessionBwtApi
+from .availability import GracePeriods
+from .capture import ResponseCapture
+from .connection import CircuitBreaker, RttEstimator
+from .const import (
+    CONF_EXPORT_TARGET,
+    CONF_STATISTICS,
+    DOMAIN,
+    EVENT_LEAK_DETECTED,
+    EVENT_REGENERATION,
+)
+from .counters import Output, OutputCounters
+from .data import BwtData, response_as_dict, response_from_dict
+from .discovery import async_discover
+from .export import Exporter
+from .flow import FlowEstimator
+from .forecast import Forecaster
+from .health import PollHealth
+from .leak import LeakConfig, LeakDetector, LeakState
+from .policy import (
+    DEFAULT_MAX_INTERVAL,
+    DEFAULT_MIN_INTERVAL,
+    DEFAULT_RAMP_FACTOR,
+    PollingPolicy,
+)
+from .regeneration import RegenerationLog
+from .scheduler import async_get_scheduler
+from .statistics import HourlyStatistics, async_import_statistics
+from .usage import UsageHistogram
 
 _LOGGER = logging.getLogger(__name__)
 
-_UPDATE_INTERVAL_MIN = 1
-_UPDATE_INTERVAL_MAX = 30
+# Pseudo field that changes with every successful poll
+POLL_FIELD = "poll"
+_COUNTER_FIELDS = frozenset(
+    {"day_consumption", "month_consumption", "year_consumption"}
+)
+# The counters start from the device values if a period is not known yet
+_DEVICE_OUTPUT_FIELDS = frozenset({"blended_day", "blended_month", "blended_year"})
+_FORECAST_FIELDS = frozenset(
+    {
+        "salt_per_m3",
+        "salt_refill",
+        "last_salt_refill",
+        "next_regeneration_1",
+        "next_regeneration_2",
+    }
+)
+
+# Seconds a refresh on demand reuses the data of the last poll
+_REFRESH_DEBOUNCE = 1
+# Seconds the boost window of fast polls can extend into the future
+MAX_BOOST = 600
+
+# Seconds between two searches for a device that is no longer reachable
+_REDISCOVER_INTERVAL = 600
+_DATA_REDISCOVERED = f"{DOMAIN}_rediscovered"
 
+_STORAGE_VERSION = 1
+_STORAGE_SAVE_DELAY = 300
 
-class BwtCoordinator(DataUpdateCoordinator[CurrentResponse]):
+
+class BwtCoordinator(DataUpdateCoordinator[BwtData]):
     """Bwt coordinator."""
 
-    def __init__(self, hass: HomeAssistant, my_api: BwtApi) -> None:
+    def __init__(
+        self, hass: HomeAssistant, my_api: SharedSessionBwtApi, entry: ConfigEntry
+    ) -> None:
         """Initialize my coordinator."""
+        self.policy = PollingPolicy.from_options(entry.options)
         super().__init__(
             hass,
             _LOGGER,
             # Name of the data. For logging purposes.
             name="My sensor",
             # Polling interval. Will only be polled if there are subscribers.
-            update_interval=timedelta(seconds=_UPDATE_INTERVAL_MAX),
+            update_interval=timedelta(seconds=self.policy.max_interval),
         )
         self.my_api = my_api
+        self.host = entry.data[CONF_HOST]
+        self._entry = entry
+        self.usage = UsageHistogram()
+        self.flow = FlowEstimator()
+        self.counters = OutputCounters()
+        self.forecaster = Forecaster()
+        self.regenerations = RegenerationLog()
+        self.leak = LeakDetector(LeakConfig.from_options(entry.options))
+        self.leak_state = LeakState(None, 0.0, 0)
+        # Hourly statistics are only collected if enabled in the options
+        self.statistics: HourlyStatistics | None = None
+        self._store: Store[dict] = Store(
+            hass, _STORAGE_VERSION, f"{DOMAIN}.{entry.entry_id}"
+        )
+        self._last_poll: float | None = None
+        # Refresh on demand shared by all callers while it runs
+        self._refresh_now: asyncio.Task[None] | None = None
+        self._boost_until = float("-inf")
+        self._save_requested = float("-inf")
+        # Set once the state was saved on shutdown, a new coordinator owns it then
+        self._store_closed = False
+        # Fields that changed with the last update, None to update all listeners
+        self._changed: frozenset[str] | None = None
+        # Values stay available after failed polls until the grace periods expired
+        self.grace = GracePeriods.from_options(entry.options)
+        self.data_time: datetime | None = None
+        self._expired: frozenset[timedelta] = frozenset()
+        self._unsub_grace: CALLBACK_TYPE | None = None
+        # Fields any listener depends on, computed again when listeners change
+        self._wanted: frozenset[str] | None = None
+        self._wanted_valid = False
+        self.health = PollHealth()
+        self.rtt = RttEstimator()
+        self.breaker = CircuitBreaker()
+        self.scheduler = async_get_scheduler(hass)
+        # Set while the responses are captured, see async_set_capture
+        self.capture: ResponseCapture | None = None
+        # Set if the polled values are exported, see async_set_export
+        self.exporter: Exporter | None = None
+        if target := entry.options.get(CONF_EXPORT_TARGET):
+            self.exporter = Exporter(hass, target, entry.entry_id)
+
+    async def async_load(self) -> None:
+        """Restore the persisted state of the coordinator.
+
+        This includes the last known data, if there is any.
+        """
+        stored = await self._store.async_load() or {}
+        self.usage = UsageHistogram.from_dict(stored.get("usage"))
+        self.counters = OutputCounters.from_dict(stored.get("counters"))
+        self.forecaster = Forecaster.from_dict(stored.get("forecast"))
+        self.regenerations = RegenerationLog.from_dict(stored.get("regenerations"))
+        if self._entry.options.get(CONF_STATISTICS, False):
+            self.statistics = HourlyStatistics.from_dict(stored.get("statistics"))
+        if snapshot := stored.get("snapshot"):
+            try:
+                self.data = BwtData.from_response(response_from_dict(snapshot))
+            except (KeyError, TypeError, ValueError):
+                _LOGGER.warning("Ignoring invalid stored data: %s", snapshot)
+            else:
+                if snapshot_time := stored.get("snapshot_time"):
+                    self.data_time = dt_util.parse_datetime(snapshot_time)
+
+    def _data_to_save(self) -> dict:
+        """Return the state of the coordinator that is persisted."""
+        data = {
+            "usage": self.usage.as_dict(),
+            "counters": self.counters.as_dict(),
+            "forecast": self.forecaster.as_dict(),
+            "regenerations": self.regenerations.as_dict(),
+        }
+        if self.statistics is not None:
+            data["statistics"] = self.statistics.as_dict()
+        if self.data is not None:
+            data["snapshot"] = response_as_dict(self.data.current)
+        if self.data_time is not None:
+            data["snapshot_time"] = self.data_time.isoformat()
+        return data
+
+    def _async_schedule_save(self) -> None:
+        """Persist the state at most once per save delay.
 
-    async def _async_update_data(self):
+        Every call of async_delay_save postpones a pending write, so with
+        frequent polls it is only called once the previous delay passed.
+        """
+        now = time.monotonic()
+        if self._store_closed:
+            return
+        if now - self._save_requested >= _STORAGE_SAVE_DELAY:
+            self._save_requested = now
+            self._store.async_delay_save(self._data_to_save, _STORAGE_SAVE_DELAY)
+
+    async def _async_update_data(self) -> BwtData:
         """Fetch data from API endpoint.
 
         This is the place to pre-process the data to lookup tables
         so entities can quickly look up their data.
         """
-        #        try:
-        # Note: asyncio.TimeoutError and aiohttp.ClientError are already
-        # handled by the data update coordinator.
-        async with asyncio.timeout(10):
-            new_values = await self.my_api.get_current_data()
-            self.update_interval = calculate_update_interval(
-                self.update_interval, new_values.current_flow
+        try:
+            return await self._async_poll()
+        except Exception:
+            # The base class of Home Assistant 2024.3 skips the listeners if the
+            # previous poll failed too, the data age and the availability would
+            # then not change while the device is unreachable
+            if not self.last_update_success:
+                self.async_update_listeners()
+            raise
+
+    async def _async_poll(self) -> BwtData:
+        """Poll the device and derive the data of the entities."""
+        if not self.breaker.allow_request(time.monotonic()):
+            raise UpdateFailed("Device unreachable, waiting before the next attempt")
+        # Devices with flow are polled first if many requests are pending
+        flowing = self.data is not None and self.data.flow > 0
+        async with self.scheduler.request_slot(flowing):
+            start = time.monotonic()
+            try:
+                async with asyncio.timeout(self.rtt.timeout):
+                    new_values = await self.my_api.get_current_data()
+            except WrongCodeException as err:
+                # Cancels future updates and starts a reauth flow
+                self.health.add_error(err)
+                raise ConfigEntryAuthFailed from err
+            except (BwtException, aiohttp.ClientError, TimeoutError) as err:
+                self.health.add_error(err)
+                if isinstance(err, TimeoutError):
+                    self.rtt.timed_out()
+                if (backoff := self.breaker.failure(time.monotonic())) is not None:
+                    # Wait before probing the device again instead of polling fast
+                    self.update_interval = timedelta(seconds=backoff)
+                    if isinstance(err, (ConnectException, TimeoutError)):
+                        self._entry.async_create_background_task(
+                            self.hass,
+                            self.async_rediscover(),
+                            f"{DOMAIN} {self._entry.entry_id} rediscover",
+                        )
+                raise UpdateFailed(
+                    f"Error communicating with the device: {err!r}"
+                ) from err
+            except Exception as err:
+                self.health.add_error(err)
+                raise
+            poll = time.monotonic()
+        self.health.add_latency(poll - start)
+        self.rtt.add(poll - start)
+        self.breaker.success()
+        self.data_time = dt_util.utcnow()
+        if self.capture is not None:
+            self.capture.add(dt_util.utcnow(), new_values)
+        flow = self.flow.update(poll, new_values.blended_total, new_values.current_flow)
+        wanted = self.wanted_fields()
+        with_counters = wanted is None or not wanted.isdisjoint(_COUNTER_FIELDS)
+        if wanted is not None and with_counters:
+            wanted |= _DEVICE_OUTPUT_FIELDS
+        data = BwtData.from_response(new_values, flow, wanted)
+        now = dt_util.now()
+        if with_counters:
+            (
+                data.day_consumption,
+                data.month_consumption,
+                data.year_consumption,
+            ) = self.counters.update(
+                now,
+                new_values.blended_total,
+                Output(data.blended_day, data.blended_month, data.blended_year),
+            )
+        else:
+            self.counters.pause()
+        if wanted is None or not wanted.isdisjoint(_FORECAST_FIELDS):
+            (
+                data.salt_per_m3,
+                data.salt_refill,
+                data.last_salt_refill,
+                data.next_regeneration_1,
+                data.next_regeneration_2,
+            ) = self.forecaster.update(
+                now,
+                new_values.regenerativ_total,
+                new_values.blended_total,
+                new_values.regenerativ_level,
+                new_values.capacity_1,
+                new_values.capacity_2,
+            )
+        self._update_regenerations(new_values)
+        if self.exporter is not None:
+            self.exporter.add(self.data_time, data)
+        self._update_leak(now, data)
+        changed = data.changed_fields(self.data)
+        self._changed = changed | {POLL_FIELD} if changed is not None else None
+
+        if self._last_poll is not None:
+            seconds = poll - self._last_poll
+            self.usage.record(now, seconds, data.flow > 0)
+            if self.statistics is not None and self.statistics.add(
+                now, seconds, new_values.blended_total, data.flow
+            ):
+                self._async_import_statistics()
+        self._last_poll = poll
+        self._async_schedule_save()
+
+        self.update_interval = self._next_interval(now, data, self.update_interval)
+        self.health.add_interval(self.update_interval.total_seconds())
+        return data
+
+    def _next_interval(
+        self, now: datetime, data: BwtData, current: timedelta | None
+    ) -> timedelta:
+        """Return the interval until the next poll according to the policy."""
+        policy = self.policy
+        if time.monotonic() < self._boost_until:
+            return timedelta(seconds=policy.min_interval)
+        idle_interval = policy.idle_interval(
+            now, data.current.holiday_mode == 1, self.usage.interval_factor(now)
+        )
+        # The flow derived from the total also covers draws the reported one missed
+        return calculate_update_interval(
+            current,
+            data.flow,
+            idle_interval,
+            timedelta(seconds=policy.min_interval),
+            policy.ramp_factor,
+        )
+
+    @callback
+    def async_set_policy(self, policy: PollingPolicy) -> None:
+        """Apply a new polling policy without waiting for the next poll."""
+        self.policy = policy
+        if self.data is None or self.breaker.is_open:
+            return
+        self.update_interval = self._next_interval(dt_util.now(), self.data, None)
+        if self._listeners:
+            self._schedule_refresh()
+
+    @property
+    def poll_phase(self) -> float:
+        """Return the offset of the scheduled polls within the second."""
+        return getattr(self, "_microsecond", 0.0)
+
+    @poll_phase.setter
+    def poll_phase(self, phase: float) -> None:
+        """Set the offset of the scheduled polls within the second.
+
+        DataUpdateCoordinator has no public way to set it. _schedule_refresh
+        polls at full seconds plus the private _microsecond, a random offset
+        set in its constructor (Home Assistant 2024.3). If a later version
+        drops it, the polls keep their random offset and a warning is logged.
+        """
+        if hasattr(self, "_microsecond"):
+            self._microsecond = phase  # pylint: disable=attribute-defined-outside-init
+        else:
+            _LOGGER.warning(
+                "The polls of %s can't be staggered with this Home Assistant"
+                " version, they keep a random offset within the second",
+                self.host,
+            )
+
+    async def async_refresh_now(self) -> None:
+        """Poll the device now, once for all concurrent callers.
+
+        Data that was polled within the debounce window is fresh enough, e.g.
+        during a flow or for update_entity called on many entities.
+        """
+        if (
+            self._last_poll is not None
+            and self.last_update_success
+            and time.monotonic() - self._last_poll < _REFRESH_DEBOUNCE
+        ):
+            return
+        if (task := self._refresh_now) is None or task.done():
+            task = self._entry.async_create_background_task(
+                self.hass,
+                self.async_refresh(),
+                f"{DOMAIN} {self._entry.entry_id} refresh now",
             )
-            return new_values
+            # Set after the task was created, it may already be done
+            self._refresh_now = task
+            task.add_done_callback(self._refresh_done)
+        # A cancelled caller doesn't cancel the refresh of the others
+        await asyncio.shield(task)
+
+    @callback
+    def _refresh_done(self, task: asyncio.Task[None]) -> None:
+        if self._refresh_now is task:
+            self._refresh_now = None
+
+    @callback
+    def async_boost(self, seconds: float) -> None:
+        """Poll fast for the given seconds, e.g. when a tap is opened.
+
+        A boost during a boost extends the window, but never beyond the
+        maximum boost from now.
+        """
+        now = time.monotonic()
+        self._boost_until = min(max(self._boost_until, now) + seconds, now + MAX_BOOST)
+        self.async_set_policy(self.policy)
+
+    async def async_set_capture(self, enabled: bool) -> None:
+        """Start or stop capturing the responses of the device to files."""
+        if enabled and self.capture is None:
+            self.capture = ResponseCapture(self.hass, self._entry.entry_id)
+            _LOGGER.info(
+                "Capturing the responses of %s to %s", self.host, self.capture.paths
+            )
+        elif not enabled and self.capture is not None:
+            capture, self.capture = self.capture, None
+            await capture.async_close()
+            _LOGGER.info("Stopped capturing the responses of %s", self.host)
+
+    async def async_set_export(self, target: str | None) -> None:
+        """Start, change or stop the export of the polled values."""
+        if self.exporter is not None:
+            if self.exporter.target == target:
+                return
+            exporter, self.exporter = self.exporter, None
+            await exporter.async_close()
+        if target:
+            self.exporter = Exporter(self.hass, target, self._entry.entry_id)
+
+    async def async_rediscover(self) -> bool:
+        """Search the device in the local network after it was unreachable.
+
+        If exactly one device that is not configured yet accepts the code,
+        it is assumed that the device got a new address and the entry is
+        updated. Returns True in that case.
+        """
+        entry = self._entry
+        last_searched: dict[str, float] = self.hass.data.setdefault(
+            _DATA_REDISCOVERED, {}
+        )
+        now = time.monotonic()
+        if now - last_searched.get(entry.entry_id, -_REDISCOVER_INTERVAL) < (
+            _REDISCOVER_INTERVAL
+        ):
+            return False
+        last_searched[entry.entry_id] = now
+
+        configured = {
+            other.data[CONF_HOST]
+            for other in self.hass.config_entries.async_entries(DOMAIN)
+        }
+        hosts = [
+            host
+            for host in await async_discover(self.hass, entry.data[CONF_CODE])
+            if host not in configured
+        ]
+        if len(hosts) != 1:
+            _LOGGER.debug("Device %s not found at another address", self.host)
+            return False
+        _LOGGER.info("Device moved from %s to %s", self.host, hosts[0])
+        self.hass.config_entries.async_update_entry(
+            entry, data={**entry.data, CONF_HOST: hosts[0]}
+        )
+        return True
+
+    def _update_regenerations(self, current: CurrentResponse) -> None:
+        """Log the regenerations and fire an event for each of them."""
+        for regeneration in self.regenerations.update(current):
+            _LOGGER.debug("Regeneration: %s", regeneration)
+            self.hass.bus.async_fire(
+                EVENT_REGENERATION,
+                {"entry_id": self._entry.entry_id, **regeneration.as_event()},
+            )
+
+    def _update_leak(self, now: datetime, data: BwtData) -> None:
+        """Run the leak detection and fire an event when a leak starts."""
+        previous = self.leak_state.reason
+        self.leak_state = self.leak.update(
+            now, data.flow, data.drawn, self.update_interval
+        )
+        data.leak = self.leak_state.reason
+        if data.leak is not None and previous is None:
+            _LOGGER.warning("Leak detected: %s", self.leak_state)
+            self.hass.bus.async_fire(
+                EVENT_LEAK_DETECTED,
+                {
+                    "entry_id": self._entry.entry_id,
+                    "reason": data.leak,
+                    "duration": round(self.leak_state.duration),
+                    "volume": self.leak_state.volume,
+                },
+            )
+
+    @callback
+    def _async_import_statistics(self) -> None:
+        """Import the completed hours, they are kept until the recorder runs."""
+        if self.statistics is None or "recorder" not in self.hass.config.components:
+            return
+        if rows := self.statistics.pop_rows():
+            async_import_statistics(
+                self.hass, self._entry.entry_id, self._entry.title, rows
+            )
+
+    @callback
+    def async_add_listener(
+        self, update_callback: CALLBACK_TYPE, context: Any = None
+    ) -> Callable[[], None]:
+        """Listen for data updates and track the fields the listener uses."""
+        remove_listener = super().async_add_listener(update_callback, context)
+        self._wanted_valid = False
+
+        @callback
+        def remove() -> None:
+            remove_listener()
+            self._wanted_valid = False
+
+        return remove
+
+    def wanted_fields(self) -> frozenset[str] | None:
+        """Return the fields any listener depends on, None for all fields.
+
+        Only enabled entities listen, so disabled ones are skipped. Without
+        listeners, e.g. during the first refresh, all fields are computed.
+        """
+        if not self._wanted_valid:
+            wanted: set[str] | None = set()
+            for _, context in self._listeners.values():
+                if context is None:
+                    wanted = None
+                    break
+                wanted.update(context)
+            if not self._listeners:
+                wanted = None
+            self._wanted = frozenset(wanted) if wanted is not None else None
+            self._wanted_valid = True
+        return self._wanted
+
+    @property
+    def data_age(self) -> float | None:
+        """Return the seconds since the data was polled successfully."""
+        if self.data_time is None:
+            return None
+        return (dt_util.utcnow() - self.data_time).total_seconds()
+
+    def is_available(self, fields: frozenset[str] | None) -> bool:
+        """Return if a listener depending on the fields is available.
+
+        After failed polls the last values stay available until the grace
+        period of the listener expired.
+        """
+        return self.last_update_success or (
+            self.grace.for_fields(fields) not in self._expired
+        )
+
+    @callback
+    def _async_expire_grace(self) -> frozenset[timedelta]:
+        """Return the grace periods that expired since they were checked last.
+
+        A timer checks them again when the next one expires, failed polls are
+        too rare to rely on while the device is unreachable.
+        """
+        self._async_cancel_grace()
+        age = self.data_age
+        periods = {self.grace.fast, self.grace.slow}
+        expired = frozenset(
+            period for period in periods if age is None or age >= period.total_seconds()
+        )
+        newly_expired = expired - self._expired
+        self._expired = expired
+        if remaining := [period.total_seconds() - age for period in periods - expired]:
+            self._unsub_grace = async_call_later(
+                self.hass, min(remaining), self._async_grace_timer
+            )
+        return newly_expired
+
+    @callback
+    def _async_grace_timer(self, _now: datetime) -> None:
+        self._unsub_grace = None
+        if not self.last_update_success:
+            self.async_update_listeners()
+
+    @callback
+    def _async_cancel_grace(self) -> None:
+        if self._unsub_grace is not None:
+            self._unsub_grace()
+            self._unsub_grace = None
+
+    async def async_shutdown(self) -> None:
+        """Cancel the timers and save the state, e.g. before a reload.
+
+        Without this, a reload starts from the state saved up to a save delay
+        ago and the delayed write of this coordinator overwrites the state of
+        the next one later.
+        """
+        await super().async_shutdown()
+        self._async_cancel_grace()
+        self._store_closed = True
+        await self._store.async_save(self._data_to_save())
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update the listeners that depend on a changed field.
+
+        Entities pass the fields they depend on as coordinator context. After
+        a failed poll only the listeners of the polling itself and the ones
+        whose grace period expired are updated. Once a poll succeeds again, all
+        listeners are updated if any grace period expired.
+        """
+        expired: frozenset[timedelta] = frozenset()
+        if self.last_update_success:
+            changed = None if self._expired else self._changed
+            self._expired = frozenset()
+            self._async_cancel_grace()
+        else:
+            changed = frozenset({POLL_FIELD})
+            expired = self._async_expire_grace()
+        self._changed = None
+
+        updated = 0
+        listeners = list(self._listeners.values())
+        for update_callback, context in listeners:
+            if (
+                changed is None
+                or context is None
+                or not changed.isdisjoint(context)
+                or self.grace.for_fields(context) in expired
+            ):
+                update_callback()
+                updated += 1
+        self.health.add_notification(updated, len(listeners) - updated)
+        _LOGGER.debug("Updated %s of %s listeners", updated, len(listeners))
+
 
+def calculate_update_interval(
+    current_interval: timedelta | None,
+    current_flow: float,
+    idle_interval: timedelta = timedelta(seconds=DEFAULT_MAX_INTERVAL),
+    min_interval: timedelta = timedelta(seconds=DEFAULT_MIN_INTERVAL),
+    ramp_factor: float = DEFAULT_RAMP_FACTOR,
+):
+    """Calculate the new update interval, based on the old one and the current flow.
 
-def calculate_update_interval(current_interval: timedelta | None, current_flow: int):
-    """Calculate the new update interval, based on the old one and the current flow."""
+    The idle interval is the one used without flow. It is shorter when water is
+    usually drawn at this time and longer when the device is usually idle.
+    """
 
     if current_flow > 0:
-        return timedelta(seconds=_UPDATE_INTERVAL_MIN)
-    if current_interval is None:
-        return timedelta(seconds=_UPDATE_INTERVAL_MAX)
-    if current_interval.seconds >= _UPDATE_INTERVAL_MAX:
-        return current_interval
-    # Increase the interval to max step by step if there is no flow at the moment
-    return timedelta(seconds=min(_UPDATE_INTERVAL_MAX, current_interval.seconds * 2))
+        return min_interval
+    if current_interval is None or current_interval >= idle_interval:
+        return idle_interval
+    # Increase the interval to the idle one step by step if there is no flow at the moment
+    return min(idle_interval, current_interval * ramp_factor)
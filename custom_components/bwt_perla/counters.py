@@ -0,0 +1,89 @@
+"""Day, month and year output reconstructed from the total output."""
+
+from datetime import datetime
+from typing import NamedTuple
+
+
+class Output(NamedTuple):
+    """Liters of blended water in the current periods."""
+
+    day: float
+    month: float
+    year: float
+
+
+def _periods(now: datetime) -> tuple[str, str, str]:
+    """Return the keys of the periods the local time is in."""
+    return now.date().isoformat(), f"{now.year}-{now.month:02}", str(now.year)
+
+
+class OutputCounters:
+    """Keep the output of the current periods from increments of the total.
+
+    Each period stores the total at its start as anchor. A reset of the device
+    counter is detected if the total decreases, the total before the reset is
+    then added as offset.
+    """
+
+    def __init__(self) -> None:
+        """Initialize without anchors."""
+        self._offset = 0
+        self._last_total: int | None = None
+        # Period key and total at the start of the period, in the order of Output
+        self._anchors: list[tuple[str, float] | None] = [None, None, None]
+        # Anchors are only moved to the last total if it was seen in this run
+        self._polled = False
+
+    def update(self, now: datetime, total: int, device: Output) -> Output:
+        """Update the counters with the total at the given local time.
+
+        The device values are used as start if a period is not known yet, or
+        if Home Assistant was not running at its start.
+        """
+        previous = self._offset + (self._last_total or 0)
+        if self._last_total is not None and total < self._last_total:
+            self._offset = previous
+        self._last_total = total
+        effective = self._offset + total
+
+        output = []
+        for index, key in enumerate(_periods(now)):
+            anchor = self._anchors[index]
+            if anchor is None or anchor[0] != key:
+                if anchor is not None and self._polled:
+                    # The period started since the previous poll
+                    anchor = (key, previous)
+                else:
+                    anchor = (key, max(0, effective - device[index]))
+                self._anchors[index] = anchor
+            output.append(effective - anchor[1])
+        self._polled = True
+        return Output(*output)
+
+    def pause(self) -> None:
+        """Forget that the last total was seen in this run.
+
+        Used while the counters are not updated, so a period that started in
+        the meantime is seeded from the device values again.
+        """
+        self._polled = False
+
+    def as_dict(self) -> dict:
+        """Return the anchors in a form that can be stored."""
+        return {
+            "offset": self._offset,
+            "last_total": self._last_total,
+            "anchors": self._anchors,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict | None) -> "OutputCounters":
+        """Restore the anchors stored with as_dict."""
+        counters = cls()
+        if data:
+            counters._offset = data["offset"]
+            counters._last_total = data["last_total"]
+            counters._anchors = [
+                tuple(anchor) if anchor else None for anchor in data["anchors"]
+            ]
+        return counters
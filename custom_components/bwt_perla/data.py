@@ -0,0 +1,159 @@
+"""Data of one update, derived once for all entities."""
+
+from collections.abc import Container
+from dataclasses import asdict, dataclass, fields
+from datetime import datetime
+from typing import Any
+
+from bwt_api.api import treated_to_blended
+from bwt_api.data import BwtStatus, CurrentResponse, Hardness
+from bwt_api.error import BwtError
+
+from homeassistant.util import dt as dt_util
+
+from .flow import FlowSample
+
+_RESPONSE_FIELDS = tuple(field.name for field in fields(CurrentResponse))
+_DATETIME_FIELDS = (
+    "regeneration_last_1",
+    "regeneration_last_2",
+    "service_customer",
+    "service_technician",
+)
+
+
+def response_as_dict(current: CurrentResponse) -> dict[str, Any]:
+    """Return the response in a form that can be stored as json."""
+    data = asdict(current)
+    data["errors"] = [error.value for error in current.errors]
+    data["state"] = current.state.value
+    for name in _DATETIME_FIELDS:
+        data[name] = data[name].isoformat()
+    return data
+
+
+def response_from_dict(data: dict[str, Any]) -> CurrentResponse:
+    """Restore a response stored with response_as_dict."""
+    data = dict(data)
+    data["errors"] = [BwtError(error) for error in data["errors"]]
+    data["state"] = BwtStatus(data["state"])
+    data["in_hardness"] = Hardness(**data["in_hardness"])
+    data["out_hardness"] = Hardness(**data["out_hardness"])
+    for name in _DATETIME_FIELDS:
+        data[name] = datetime.fromisoformat(data[name])
+    return CurrentResponse(**data)
+
+
+@dataclass(slots=True)
+class BwtData:
+    """Response of the device together with the values derived from it."""
+
+    current: CurrentResponse
+    # Derived values are None if no entity uses them
+    blended_day: float | None
+    blended_month: float | None
+    blended_year: float | None
+    # Liters of water with the outgoing hardness the columns can still treat
+    blended_capacity_1: float | None
+    blended_capacity_2: float | None
+    error_names: str | None
+    warning_names: str | None
+    holiday_start: datetime | None
+    # Flow in liters, see FlowSample
+    drawn: int
+    derived_flow: float | None
+    flow: float
+    # Output reconstructed from the total, set by the coordinator
+    day_consumption: float | None = None
+    month_consumption: float | None = None
+    year_consumption: float | None = None
+    # Estimated from the history, set by the coordinator
+    salt_per_m3: float | None = None
+    salt_refill: datetime | None = None
+    last_salt_refill: datetime | None = None
+    next_regeneration_1: datetime | None = None
+    next_regeneration_2: datetime | None = None
+    # LEAK_FLOW, LEAK_DRIP or None, set by the coordinator
+    leak: str | None = None
+
+    @classmethod
+    def from_response(
+        cls,
+        current: CurrentResponse,
+        flow: FlowSample | None = None,
+        wanted: Container[str] | None = None,
+    ) -> "BwtData":
+        """Derive the values from the response of the device.
+
+        The flow values are derived from the previous polls, without them only
+        the reported flow is known. If the wanted fields are given, the other
+        derived fields are skipped and left None.
+        """
+        if flow is None:
+            flow = FlowSample(0, None, current.current_flow)
+        hardness_in = current.in_hardness.dH
+        hardness_out = current.out_hardness.dH
+        hardness_delta = (hardness_in - hardness_out) * 1000.0
+
+        def blended(name: str, treated: int) -> float | None:
+            if wanted is not None and name not in wanted:
+                return None
+            return treated_to_blended(treated, hardness_in, hardness_out)
+
+        def capacity(name: str, capacity: int) -> float | None:
+            if (wanted is not None and name not in wanted) or not hardness_delta:
+                return None
+            return capacity / hardness_delta
+
+        error_names = warning_names = None
+        if wanted is None or "error_names" in wanted or "warning_names" in wanted:
+            errors = []
+            warnings = []
+            for error in current.errors:
+                (errors if error.is_fatal() else warnings).append(error.name)
+            error_names = ",".join(errors)
+            warning_names = ",".join(warnings)
+
+        return cls(
+            current=current,
+            blended_day=blended("blended_day", current.treated_day),
+            blended_month=blended("blended_month", current.treated_month),
+            blended_year=blended("blended_year", current.treated_year),
+            blended_capacity_1=capacity("blended_capacity_1", current.capacity_1),
+            blended_capacity_2=capacity("blended_capacity_2", current.capacity_2),
+            error_names=error_names,
+            warning_names=warning_names,
+            holiday_start=(
+                datetime.fromtimestamp(current.holiday_mode, tz=dt_util.UTC)
+                if current.holiday_mode > 1
+                and (wanted is None or "holiday_start" in wanted)
+                else None
+            ),
+            drawn=flow.drawn,
+            derived_flow=flow.derived_flow,
+            flow=flow.flow,
+        )
+
+    def changed_fields(self, old: "BwtData | None") -> frozenset[str] | None:
+        """Return the names of the fields that differ, None if there is no old data.
+
+        Names are the ones of the response fields and of the derived fields.
+        """
+        if old is None:
+            return None
+        changed = {
+            name
+            for name in _RESPONSE_FIELDS
+            if getattr(old.current, name) != getattr(self.current, name)
+        }
+        changed.update(
+            name
+            for name in _DERIVED_FIELDS
+            if getattr(old, name) != getattr(self, name)
+        )
+        return frozenset(changed)
+
+
+_DERIVED_FIELDS = tuple(
+    field.name for field in fields(BwtData) if field.name != "current"
+)
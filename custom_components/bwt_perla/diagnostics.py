@@ -0,0 +1,44 @@
+"""Diagnostics support for BWT Perla."""
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_CODE, CONF_HOST
+from homeassistant.core import HomeAssistant
+
+from .const import CONF_EXPORT_TARGET, DOMAIN
+from .coordinator import BwtCoordinator
+from .data import response_as_dict
+
+TO_REDACT = {CONF_CODE, CONF_EXPORT_TARGET, CONF_HOST}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: BwtCoordinator = hass.data[DOMAIN][entry.entry_id]
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "coordinator": {
+            "last_update_success": coordinator.last_update_success,
+            "last_exception": repr(coordinator.last_exception),
+            "update_interval": (
+                coordinator.update_interval.total_seconds()
+                if coordinator.update_interval
+                else None
+            ),
+            "srtt": coordinator.rtt.srtt,
+            "rttvar": coordinator.rtt.rttvar,
+            "timeout": coordinator.rtt.timeout,
+            "circuit_open": coordinator.breaker.is_open,
+            "consecutive_failures": coordinator.breaker.failures,
+            "data_age": coordinator.data_age,
+        },
+        "health": coordinator.health.as_dict(),
+        "export": coordinator.exporter.as_dict() if coordinator.exporter else None,
+        "data": (
+            response_as_dict(coordinator.data.current) if coordinator.data else None
+        ),
+    }
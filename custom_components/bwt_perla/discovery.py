@@ -0,0 +1,96 @@
+"""Find devices in the local network by probing the Perla api."""
+
+import asyncio
+from ipaddress import IPv4Address, IPv4Network
+import logging
+
+from bwt_api.exception import BwtException
+
+from homeassistant.components import network
+from homeassistant.core import HomeAssistant
+
+from .api import PORT, SharedSessionBwtApi
+
+_LOGGER = logging.getLogger(__name__)
+
+# Subnets larger than this are only probed around the own address
+_MIN_PREFIX = 24
+# Hosts probed at the same time
+_CONCURRENCY = 64
+# Seconds to open a connection, most addresses are not used and never answer
+_CONNECT_TIMEOUT = 1.0
+# Seconds for the api request to hosts with the port open
+_REQUEST_TIMEOUT = 5.0
+
+
+async def async_get_candidate_hosts(hass: HomeAssistant) -> list[str]:
+    """Return the addresses in the local IPv4 networks of enabled adapters."""
+    hosts: dict[str, None] = {}
+    own: set[IPv4Address] = set()
+    for adapter in await network.async_get_adapters(hass):
+        if not adapter["enabled"]:
+            continue
+        for ipv4 in adapter["ipv4"]:
+            address = IPv4Address(ipv4["address"])
+            if address.is_loopback or address.is_link_local:
+                continue
+            own.add(address)
+            subnet = IPv4Network(
+                f"{address}/{max(ipv4['network_prefix'], _MIN_PREFIX)}", strict=False
+            )
+            hosts.update((str(host), None) for host in subnet.hosts())
+    for address in own:
+        hosts.pop(str(address), None)
+    return list(hosts)
+
+
+async def _async_port_open(host: str) -> bool:
+    """Return if the api port of the host accepts connections."""
+    try:
+        async with asyncio.timeout(_CONNECT_TIMEOUT):
+            _, writer = await asyncio.open_connection(host, PORT)
+    except (OSError, TimeoutError):
+        return False
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+    return True
+
+
+async def async_probe(hass: HomeAssistant, host: str, code: str) -> bool:
+    """Return if the host is a device accepting the code."""
+    if not await _async_port_open(host):
+        return False
+    # Most probed hosts are no device, their requests are not limited per host
+    api = SharedSessionBwtApi(hass, host, code, limit_host=False)
+    try:
+        async with asyncio.timeout(_REQUEST_TIMEOUT):
+            await api.get_current_data()
+    except (BwtException, TimeoutError) as err:
+        # Other services on the port fail with an ApiException as well
+        _LOGGER.debug("No device with this code at %s: %r", host, err)
+        return False
+    return True
+
+
+async def async_discover(
+    hass: HomeAssistant, code: str, hosts: list[str] | None = None
+) -> list[str]:
+    """Return the hosts of the devices in the local network accepting the code.
+
+    At most a fixed number of hosts is probed at the same time, so a /24
+    network takes a few seconds.
+    """
+    if hosts is None:
+        hosts = await async_get_candidate_hosts(hass)
+    limit = asyncio.Semaphore(_CONCURRENCY)
+
+    async def probe(host: str) -> bool:
+        async with limit:
+            return await async_probe(hass, host, code)
+
+    found = await asyncio.gather(*(probe(host) for host in hosts))
+    _LOGGER.debug("Probed %s hosts, found %s", len(hosts), found.count(True))
+    return [host for host, is_device in zip(hosts, found) if is_device]
@@ -0,0 +1,93 @@
+"""Base entity of the BWT Perla integration."""
+
+from abc import abstractmethod
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import Platform
+from homeassistant.core import callback
+from homeassistant.helpers.device_registry import DeviceInfo
+from homeassistant.helpers.entity import EntityDescription
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import DOMAIN
+from .coordinator import BwtCoordinator
+
+
+def bwt_device_info(coordinator: BwtCoordinator, entry: ConfigEntry) -> DeviceInfo:
+    """Return the device all entities of the entry belong to."""
+    return DeviceInfo(
+        configuration_url=None,
+        connections=set(),
+        entry_type=None,
+        hw_version=None,
+        identifiers={(DOMAIN, entry.entry_id)},
+        manufacturer="BWT",
+        model="Perla",
+        name=entry.title,
+        serial_number=None,
+        suggested_area=None,
+        sw_version=coordinator.data.current.firmware_version,
+        via_device=(DOMAIN, ""),
+    )
+
+
+def bwt_entity_id(platform: Platform, key: str) -> str:
+    """Return the entity id of an entity of the device."""
+    return f"{platform}.{DOMAIN}_{key}"
+
+
+class BwtEntity(CoordinatorEntity[BwtCoordinator]):
+    """General bwt entity with common properties."""
+
+    _platform = Platform.SENSOR
+
+    def __init__(
+        self,
+        coordinator: BwtCoordinator,
+        device_info: DeviceInfo,
+        entry_id: str,
+        description: EntityDescription,
+        fields: frozenset[str],
+    ) -> None:
+        """Initialize the common properties.
+
+        The entity is only updated if one of the given fields changed.
+        """
+        super().__init__(coordinator, fields)
+        self.entity_description = description
+        self._attr_device_info = device_info
+        self._attr_translation_key = description.key
+        self.entity_id = bwt_entity_id(self._platform, description.key)
+        self._attr_unique_id = entry_id + "_" + description.key
+
+    async def async_added_to_hass(self) -> None:
+        """Set the initial state when added to hass."""
+        await super().async_added_to_hass()
+        self._update_attrs()
+
+    @property
+    def available(self) -> bool:
+        """Return if the last values are available or still within the grace."""
+        return self.coordinator.is_available(self.coordinator_context)
+
+    async def async_update(self) -> None:
+        """Refresh the data, once for all entities updated at the same time."""
+        if self.enabled:
+            await self.coordinator.async_refresh_now()
+
+    @callback
+    def async_write_ha_state(self) -> None:
+        """Write the state and count it in the health of the polling."""
+        super().async_write_ha_state()
+        self.coordinator.health.add_write()
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Handle updated data from the coordinator."""
+        self._update_attrs()
+        self.async_write_ha_state()
+
+    @abstractmethod
+    @callback
+    def _update_attrs(self) -> None:
+        """Update the state from the coordinator data."""
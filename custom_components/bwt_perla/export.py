@@ -0,0 +1,255 @@
+"""Export the polled values as Influx line protocol to a time series sink."""
+
+import asyncio
+from collections import deque
+from datetime import datetime
+import logging
+from typing import Any
+from urllib.parse import SplitResult, urlsplit
+
+import aiohttp
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.event import async_call_later
+
+from .const import DOMAIN
+from .data import BwtData
+
+_LOGGER = logging.getLogger(__name__)
+
+# Lines kept while the sink is slow or unreachable, the oldest are dropped
+_MAX_QUEUE = 20_000
+# Lines written in one batch, a batch is written once full or after the delay
+_BATCH_LINES = 500
+_BATCH_DELAY = 10
+# Seconds to write one batch
+_WRITE_TIMEOUT = 10
+# Bytes per datagram, below the usual MTU
+_DATAGRAM_SIZE = 1400
+# Seconds between the lines with all values while water flows
+_SNAPSHOT_INTERVAL = 300
+
+SCHEMES = ("file", "udp", "tcp", "http", "https")
+
+# Integer fields of the response in the snapshot measurement
+_SNAPSHOT_FIELDS = (
+    "blended_total",
+    "capacity_1",
+    "capacity_2",
+    "current_flow",
+    "dosing_total",
+    "holiday_mode",
+    "out_of_service",
+    "regeneration_count",
+    "regeneration_count_1",
+    "regeneration_count_2",
+    "regenerativ_level",
+    "regenerativ_days",
+    "regenerativ_total",
+    "treated_day",
+    "treated_month",
+    "treated_year",
+)
+
+
+def parse_target(target: str) -> SplitResult:
+    """Return the parsed target, raises ValueError if it is not supported."""
+    url = urlsplit(target)
+    if url.scheme not in SCHEMES:
+        raise ValueError(f"Unsupported scheme: {url.scheme}")
+    if url.scheme == "file" and not url.path:
+        raise ValueError("Missing path")
+    if url.scheme in ("udp", "tcp") and (not url.hostname or not url.port):
+        raise ValueError("Missing host or port")
+    if url.scheme in ("http", "https") and not url.hostname:
+        raise ValueError("Missing host")
+    return url
+
+
+def _log_name(url: SplitResult) -> str:
+    """Return the target without credentials and query to be logged."""
+    if url.scheme == "file":
+        return url.geturl()
+    if url.port is None:
+        return f"{url.scheme}://{url.hostname}"
+    return f"{url.scheme}://{url.hostname}:{url.port}"
+
+
+def _escape_tag(value: str) -> str:
+    return value.replace(",", r"\,").replace("=", r"\=").replace(" ", r"\ ")
+
+
+def _escape_string(value: str) -> str:
+    return '"' + value.replace("\\", "\\\\").replace('"', r"\"") + '"'
+
+
+class Exporter:
+    """Queue the values of every poll and write them in batches to a sink.
+
+    Every poll adds a line with the flow and the total. Polls without a flow
+    add one more with all values of the device, the fast polls during a flow
+    only every few minutes. Adding lines
+    never waits for the sink: a single task writes the batches, and while the
+    sink is slow or unreachable the oldest lines are dropped.
+    """
+
+    def __init__(self, hass: HomeAssistant, target: str, device: str) -> None:
+        """Initialize the exporter of a device, connections are opened lazily."""
+        self._hass = hass
+        self.target = target
+        self._url = parse_target(target)
+        self._name = _log_name(self._url)
+        self._tags = f"device={_escape_tag(device)}"
+        self._queue: deque[str] = deque(maxlen=_MAX_QUEUE)
+        self._task: asyncio.Task | None = None
+        self._unsub_flush: CALLBACK_TYPE | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._transport: asyncio.DatagramTransport | None = None
+        self._failing = False
+        self._snapshot_at: datetime | None = None
+        self.exported = 0
+        self.dropped = 0
+        self.errors = 0
+
+    @callback
+    def add(self, now: datetime, data: BwtData) -> None:
+        """Queue the lines of a poll."""
+        timestamp = int(now.timestamp() * 1_000_000_000)
+        current = data.current
+        lines = [
+            f"{DOMAIN}_flow,{self._tags} flow={float(data.flow)},"
+            f"current_flow={current.current_flow}i,"
+            f"total={current.blended_total}i {timestamp}"
+        ]
+        if (
+            data.flow == 0
+            or self._snapshot_at is None
+            or (now - self._snapshot_at).total_seconds() >= _SNAPSHOT_INTERVAL
+        ):
+            self._snapshot_at = now
+            fields = [f"{name}={getattr(current, name)}i" for name in _SNAPSHOT_FIELDS]
+            fields.append(f"state={current.state.value}i")
+            fields.append(f"hardness_in={current.in_hardness.dH}i")
+            fields.append(f"hardness_out={current.out_hardness.dH}i")
+            fields.append(
+                "errors="
+                + _escape_string(",".join(str(error.value) for error in current.errors))
+            )
+            fields.append(f"firmware={_escape_string(current.firmware_version)}")
+            lines.append(f"{DOMAIN},{self._tags} {','.join(fields)} {timestamp}")
+        self.dropped += max(0, len(self._queue) + len(lines) - _MAX_QUEUE)
+        self._queue.extend(lines)
+        if len(self._queue) >= _BATCH_LINES:
+            self._async_flush()
+        elif self._unsub_flush is None:
+            self._unsub_flush = async_call_later(
+                self._hass, _BATCH_DELAY, self._async_flush
+            )
+
+    @callback
+    def _async_flush(self, _now: datetime | None = None) -> None:
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+            self._unsub_flush = None
+        if self._task is None and self._queue:
+            self._task = self._hass.async_create_background_task(
+                self._async_write_queue(), f"{DOMAIN} export {self._name}"
+            )
+
+    async def _async_write_queue(self) -> None:
+        try:
+            while self._queue:
+                batch = [
+                    self._queue.popleft()
+                    for _ in range(min(_BATCH_LINES, len(self._queue)))
+                ]
+                try:
+                    async with asyncio.timeout(_WRITE_TIMEOUT):
+                        await self._async_write("\n".join(batch) + "\n")
+                except (OSError, TimeoutError, aiohttp.ClientError) as err:
+                    # The batch is lost, retrying it would only delay newer lines
+                    self.errors += 1
+                    self.dropped += len(batch)
+                    if not self._failing:
+                        _LOGGER.warning("Error exporting to %s: %r", self._name, err)
+                    self._failing = True
+                    await self._async_disconnect()
+                    break
+                self.exported += len(batch)
+                if self._failing:
+                    _LOGGER.info("Exporting to %s again", self._name)
+                self._failing = False
+        finally:
+            self._task = None
+
+    async def _async_write(self, payload: str) -> None:
+        url = self._url
+        if url.scheme == "file":
+            await self._hass.async_add_executor_job(self._append, url.path, payload)
+        elif url.scheme == "udp":
+            if self._transport is None:
+                loop = asyncio.get_running_loop()
+                self._transport, _ = await loop.create_datagram_endpoint(
+                    asyncio.DatagramProtocol, remote_addr=(url.hostname, url.port)
+                )
+            for datagram in _datagrams(payload.encode()):
+                self._transport.sendto(datagram)
+        elif url.scheme == "tcp":
+            if self._writer is None:
+                _, self._writer = await asyncio.open_connection(url.hostname, url.port)
+            self._writer.write(payload.encode())
+            await self._writer.drain()
+        else:
+            session = async_get_clientsession(self._hass)
+            async with session.post(url.geturl(), data=payload.encode()) as response:
+                response.raise_for_status()
+
+    @staticmethod
+    def _append(path: str, payload: str) -> None:
+        """Append the lines to the file, runs in the executor."""
+        with open(path, "a", encoding="utf-8") as file:
+            file.write(payload)
+
+    async def _async_disconnect(self) -> None:
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+        if self._writer is not None:
+            writer, self._writer = self._writer, None
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except OSError:
+                pass
+
+    async def async_close(self) -> None:
+        """Write the queued lines and close the connection."""
+        self._async_flush()
+        if self._task is not None:
+            await self._task
+        await self._async_disconnect()
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the state of the export for the diagnostics."""
+        return {
+            "scheme": self._url.scheme,
+            "queued": len(self._queue),
+            "exported": self.exported,
+            "dropped": self.dropped,
+            "errors": self.errors,
+        }
+
+
+def _datagrams(payload: bytes) -> list[bytes]:
+    """Split the lines into datagrams of at most the datagram size."""
+    datagrams: list[bytes] = []
+    current = b""
+    for line in payload.splitlines(keepends=True):
+        if current and len(current) + len(line) > _DATAGRAM_SIZE:
+            datagrams.append(current)
+            current = b""
+        current += line
+    if current:
+        datagrams.append(current)
+    return datagrams
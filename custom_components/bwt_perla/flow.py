@@ -0,0 +1,64 @@
+"""Flow derived from the reliable total output counter of the device."""
+
+from collections import deque
+from typing import NamedTuple
+
+# The total only has a resolution of one liter, so the flow is averaged over
+# this many seconds: one liter in the window is 60 l/h.
+_WINDOW = 60
+# A draw only seen in the total is considered ongoing for this many seconds
+# after the total last increased. 600 l/h increase it every six seconds.
+_RECENT = 10
+
+
+class FlowSample(NamedTuple):
+    """Flow values of one poll."""
+
+    # Liters drawn since the previous poll
+    drawn: int
+    # Liters per hour derived from the total over the last window
+    derived_flow: float | None
+    # Liters per hour, the reported flow or the derived one if it was missed
+    flow: float
+
+
+class FlowEstimator:
+    """Derive the flow from consecutive samples of the total output."""
+
+    def __init__(self) -> None:
+        """Initialize without samples."""
+        # (monotonic seconds, total liters), oldest first
+        self._samples: deque[tuple[float, int]] = deque()
+        self._last_increase: float | None = None
+
+    def update(self, now: float, total: int, reported_flow: int) -> FlowSample:
+        """Add a sample of the total and return the flow values."""
+        samples = self._samples
+        if samples and total < samples[-1][1]:
+            # The device counter was reset, start over
+            samples.clear()
+            self._last_increase = None
+
+        drawn = total - samples[-1][1] if samples else 0
+        if drawn > 0:
+            self._last_increase = now
+        samples.append((now, total))
+        # Keep one sample at or before the start of the window
+        while len(samples) > 2 and samples[1][0] <= now - _WINDOW:
+            samples.popleft()
+
+        derived_flow = None
+        start, start_total = samples[0]
+        if now > start:
+            derived_flow = (total - start_total) / (now - start) * 3600
+
+        flow: float = reported_flow
+        if (
+            reported_flow <= 0
+            and derived_flow
+            and self._last_increase is not None
+            and now - self._last_increase <= _RECENT
+        ):
+            # The reported flow missed a draw the total has seen
+            flow = derived_flow
+        return FlowSample(drawn, derived_flow, flow)
@@ -0,0 +1,187 @@
+"""Forecast the salt consumption and the next regenerations from the history."""
+
+from collections import deque
+from datetime import datetime
+from typing import NamedTuple
+
+from homeassistant.util import dt as dt_util
+
+# Seconds between two samples of the history
+_SAMPLE_INTERVAL = 30 * 60
+# Samples kept, two weeks
+_MAX_SAMPLES = 14 * 24 * 2
+# Liters of water needed before the salt per m³ is estimated
+_MIN_WATER = 100
+# Seconds a trend needs before it is extrapolated
+_MIN_TREND = 6 * 3600
+# An increase of the salt level by this many percent is a refill
+_REFILL_STEP = 10
+
+
+class Sample(NamedTuple):
+    """Values of the device at one point in time."""
+
+    # Unix timestamp
+    time: float
+    # Grams of salt used in total
+    salt: int
+    # Liters of water in total
+    total: int
+    # Percent of salt left
+    level: int
+    # ml * dH the columns can still treat
+    capacity_1: int
+    capacity_2: int
+
+
+class Forecast(NamedTuple):
+    """Values estimated from the history."""
+
+    # Grams of salt per m³ of water
+    salt_per_m3: float | None
+    salt_refill: datetime | None
+    last_salt_refill: datetime | None
+    next_regeneration_1: datetime | None
+    next_regeneration_2: datetime | None
+
+
+_EMPTY = Forecast(None, None, None, None, None)
+
+
+class _Trend:
+    """Linear decrease of a value since it last increased.
+
+    The start is kept within the history, so the trend follows changes of the
+    consumption instead of averaging since the last increase.
+    """
+
+    def __init__(self, start: tuple[float, float] | None = None) -> None:
+        self.start = start
+        self.last: tuple[float, float] | None = start
+
+    def add(self, time: float, value: float, oldest: tuple[float, float]) -> float:
+        """Add a value and return the increase to the previous value."""
+        increase = 0.0
+        if self.last is not None:
+            increase = value - self.last[1]
+        if self.start is None or increase > 0:
+            self.start = (time, value)
+        elif self.start[0] < oldest[0]:
+            self.start = oldest
+        self.last = (time, value)
+        return increase
+
+    def reaches_zero(self) -> float | None:
+        """Return the timestamp the value reaches zero at the current rate."""
+        if self.start is None or self.last is None:
+            return None
+        seconds = self.last[0] - self.start[0]
+        decrease = self.start[1] - self.last[1]
+        if seconds < _MIN_TREND or decrease <= 0:
+            return None
+        return self.last[0] + self.last[1] * seconds / decrease
+
+
+class Forecaster:
+    """Keep a bounded history of the device values and extrapolate them.
+
+    A sample is taken every half hour, each update only looks at the oldest
+    and the newest sample.
+    """
+
+    def __init__(self) -> None:
+        """Initialize without history."""
+        self._samples: deque[Sample] = deque(maxlen=_MAX_SAMPLES)
+        self._level = _Trend()
+        self._capacities = (_Trend(), _Trend())
+        self._last_refill: float | None = None
+        self._forecast = _EMPTY
+
+    def update(
+        self,
+        now: datetime,
+        salt: int,
+        total: int,
+        level: int,
+        capacity_1: int,
+        capacity_2: int,
+    ) -> Forecast:
+        """Add the current values and return the forecast.
+
+        The forecast only changes when a sample is taken.
+        """
+        samples = self._samples
+        time = now.timestamp()
+        if samples and time - samples[-1].time < _SAMPLE_INTERVAL:
+            return self._forecast
+        if samples and (salt < samples[-1].salt or total < samples[-1].total):
+            # The counters of the device were reset
+            samples.clear()
+        sample = Sample(time, salt, total, level, capacity_1, capacity_2)
+        samples.append(sample)
+        oldest = samples[0]
+
+        if self._level.add(time, level, (oldest.time, oldest.level)) >= _REFILL_STEP:
+            self._last_refill = time
+        for trend, capacity, oldest_capacity in zip(
+            self._capacities,
+            (capacity_1, capacity_2),
+            (oldest.capacity_1, oldest.capacity_2),
+        ):
+            trend.add(time, capacity, (oldest.time, oldest_capacity))
+
+        self._forecast = self._estimate()
+        return self._forecast
+
+    def _estimate(self) -> Forecast:
+        first = self._samples[0]
+        last = self._samples[-1]
+        water = last.total - first.total
+        return Forecast(
+            salt_per_m3=(
+                (last.salt - first.salt) * 1000 / water if water >= _MIN_WATER else None
+            ),
+            salt_refill=_as_datetime(self._level.reaches_zero()),
+            last_salt_refill=_as_datetime(self._last_refill),
+            next_regeneration_1=_as_datetime(self._capacities[0].reaches_zero()),
+            next_regeneration_2=_as_datetime(self._capacities[1].reaches_zero()),
+        )
+
+    def as_dict(self) -> dict:
+        """Return the history in a form that can be stored."""
+        return {
+            "samples": [list(sample) for sample in self._samples],
+            "level": self._level.start,
+            "capacities": [trend.start for trend in self._capacities],
+            "last_refill": self._last_refill,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict | None) -> "Forecaster":
+        """Restore the history stored with as_dict."""
+        forecaster = cls()
+        if data and data["samples"]:
+            forecaster._samples.extend(Sample(*sample) for sample in data["samples"])
+            last = forecaster._samples[-1]
+            forecaster._level = _restore_trend(data["level"], last.time, last.level)
+            forecaster._capacities = tuple(
+                _restore_trend(start, last.time, value)
+                for start, value in zip(
+                    data["capacities"], (last.capacity_1, last.capacity_2)
+                )
+            )
+            forecaster._last_refill = data["last_refill"]
+            forecaster._forecast = forecaster._estimate()
+        return forecaster
+
+
+def _restore_trend(start: list | None, time: float, value: float) -> _Trend:
+    trend = _Trend(tuple(start) if start else None)
+    trend.last = (time, value)
+    return trend
+
+
+def _as_datetime(timestamp: float | None) -> datetime | None:
+    if timestamp is None:
+        return None
+    return dt_util.utc_from_timestamp(round(timestamp))
@@ -0,0 +1,118 @@
+"""Health of the polling, to tune it with data instead of guesses."""
+
+from bisect import bisect_left
+from collections import Counter, deque
+
+# Upper bounds in seconds of the latency buckets, the last one is unbounded
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# Polls covered by the rolling latency histogram
+_WINDOW = 500
+
+
+class PollHealth:
+    """Rolling latency histogram, errors and intervals of the polls.
+
+    The histogram counts are kept in sync with the window of latencies, so
+    adding a poll is O(1).
+    """
+
+    def __init__(self) -> None:
+        """Initialize without polls."""
+        self._latencies: deque[float] = deque()
+        self._histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+        self._latency_sum = 0.0
+        self.polls = 0
+        # Failed polls by the name of the exception type
+        self.errors: Counter[str] = Counter()
+        # Polls by the interval in seconds that was scheduled after them
+        self.intervals: Counter[int] = Counter()
+        # Notifications of the listeners, the listeners called or skipped by
+        # them and the states the entities actually wrote
+        self.notifications = 0
+        self.notified_listeners = 0
+        self.skipped_listeners = 0
+        self.entity_writes = 0
+
+    def add_latency(self, seconds: float) -> None:
+        """Add the latency of a successful poll."""
+        self.polls += 1
+        if len(self._latencies) == _WINDOW:
+            oldest = self._latencies.popleft()
+            self._histogram[bisect_left(LATENCY_BUCKETS, oldest)] -= 1
+            self._latency_sum -= oldest
+        self._latencies.append(seconds)
+        self._histogram[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self._latency_sum += seconds
+
+    def add_error(self, err: BaseException) -> None:
+        """Count a failed poll."""
+        self.polls += 1
+        self.errors[type(err).__name__] += 1
+
+    def add_interval(self, seconds: float) -> None:
+        """Count the interval scheduled after a poll."""
+        self.intervals[round(seconds)] += 1
+
+    def add_notification(self, notified: int, skipped: int) -> None:
+        """Count the listeners called and skipped by one notification."""
+        self.notifications += 1
+        self.notified_listeners += notified
+        self.skipped_listeners += skipped
+
+    def add_write(self) -> None:
+        """Count a state written by an entity."""
+        self.entity_writes += 1
+
+    @property
+    def writes_per_update(self) -> float | None:
+        """Return the mean number of states written per notification."""
+        if not self.notifications:
+            return None
+        return self.entity_writes / self.notifications
+
+    @property
+    def mean_latency(self) -> float | None:
+        """Return the mean latency in seconds over the window."""
+        if not self._latencies:
+            return None
+        return self._latency_sum / len(self._latencies)
+
+    @property
+    def error_count(self) -> int:
+        """Return the number of failed polls."""
+        return self.errors.total()
+
+    def latency_quantile(self, quantile: float) -> float | None:
+        """Return the upper bound of the bucket containing the quantile."""
+        if not self._latencies:
+            return None
+        rank = quantile * len(self._latencies)
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS, self._histogram):
+            seen += count
+            if seen >= rank:
+                return bound
+        return max(self._latencies)
+
+    def as_dict(self) -> dict:
+        """Return the health for the diagnostics."""
+        buckets = [f"<={bound}" for bound in LATENCY_BUCKETS]
+        buckets.append(f">{LATENCY_BUCKETS[-1]}")
+        return {
+            "polls": self.polls,
+            "latency": {
+                "window": len(self._latencies),
+                "mean": self.mean_latency,
+                "p50": self.latency_quantile(0.5),
+                "p95": self.latency_quantile(0.95),
+                "max": max(self._latencies, default=None),
+                "histogram": dict(zip(buckets, self._histogram)),
+            },
+            "errors": dict(self.errors),
+            "intervals": dict(sorted(self.intervals.items())),
+            "notifications": self.notifications,
+            "notified_listeners": self.notified_listeners,
+            "skipped_listeners": self.skipped_listeners,
+            "entity_writes": self.entity_writes,
+            "writes_per_update": self.writes_per_update,
+        }
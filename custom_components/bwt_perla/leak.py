@@ -0,0 +1,144 @@
+"""Detect leaks from the flow seen by the polls."""
+
+from collections import deque
+from collections.abc import Mapping
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+from typing import Any, NamedTuple
+
+from homeassistant.util import dt as dt_util
+
+from .const import CONF_DRIP_END, CONF_DRIP_START, CONF_LEAK_DURATION, CONF_LEAK_VOLUME
+
+DEFAULT_LEAK_DURATION = 60
+DEFAULT_LEAK_VOLUME = 500
+DEFAULT_DRIP_START = "01:00:00"
+DEFAULT_DRIP_END = "05:00:00"
+
+# A flow continues through polls without flow that are at most this far apart,
+# or this factor of the poll interval if that is longer
+_GAP = timedelta(seconds=90)
+_GAP_INTERVALS = 1.5
+# The drip window is split into slots of this length
+_SLOT_MINUTES = 30
+# Consecutive slots with water drawn that are reported as drip
+_DRIP_SLOTS = 4
+
+LEAK_FLOW = "flow"
+LEAK_DRIP = "drip"
+
+
+@dataclass(frozen=True, slots=True)
+class LeakConfig:
+    """Thresholds of the leak detection, configured in the options."""
+
+    # Minutes of continuous flow
+    duration: int = DEFAULT_LEAK_DURATION
+    # Liters drawn in one continuous flow
+    volume: int = DEFAULT_LEAK_VOLUME
+    # Local times of the window expected to be without any water drawn
+    drip_start: time = dt_util.parse_time(DEFAULT_DRIP_START)
+    drip_end: time = dt_util.parse_time(DEFAULT_DRIP_END)
+
+    @classmethod
+    def from_options(cls, options: Mapping[str, Any]) -> "LeakConfig":
+        """Create the config from the options of the entry."""
+        return cls(
+            duration=options.get(CONF_LEAK_DURATION, DEFAULT_LEAK_DURATION),
+            volume=options.get(CONF_LEAK_VOLUME, DEFAULT_LEAK_VOLUME),
+            drip_start=dt_util.parse_time(
+                options.get(CONF_DRIP_START, DEFAULT_DRIP_START)
+            ),
+            drip_end=dt_util.parse_time(options.get(CONF_DRIP_END, DEFAULT_DRIP_END)),
+        )
+
+    def in_drip_window(self, now: datetime) -> bool:
+        """Return if the local time is within the drip window."""
+        current = now.time()
+        if self.drip_start <= self.drip_end:
+            return self.drip_start <= current < self.drip_end
+        return current >= self.drip_start or current < self.drip_end
+
+
+class LeakState(NamedTuple):
+    """Result of the leak detection after a poll."""
+
+    # LEAK_FLOW, LEAK_DRIP or None without leak
+    reason: str | None
+    # Seconds and liters of the current continuous flow
+    duration: float
+    volume: int
+
+
+class LeakDetector:
+    """Flag continuous flows and water drawn through the whole night.
+
+    A continuous flow is flagged once it exceeds the configured duration or
+    volume. The drip window keeps a sliding window of the last slots: if water
+    was drawn in each of them, even single liters, a drip is flagged.
+    """
+
+    def __init__(self, config: LeakConfig) -> None:
+        """Initialize without flow."""
+        self.config = config
+        self._run_start: datetime | None = None
+        self._run_last: datetime | None = None
+        self._run_volume = 0
+        # If water was drawn in the recent slots of the drip window, newest last
+        self._slots: deque[bool] = deque(maxlen=_DRIP_SLOTS)
+        self._slot: datetime | None = None
+        self._drip = False
+
+    def update(
+        self, now: datetime, flow: float, drawn: int, interval: timedelta
+    ) -> LeakState:
+        """Add the flow and the liters drawn since the previous poll.
+
+        The interval is the one the device is polled with, a draw seen by
+        polls this far apart is still continuous.
+        """
+        gap = max(_GAP, interval * _GAP_INTERVALS)
+        flowing = flow > 0 or drawn > 0
+        if flowing:
+            if self._run_start is None or now - self._run_last > gap:
+                self._run_start = now
+                self._run_volume = 0
+            self._run_volume += drawn
+            self._run_last = now
+        elif self._run_last is not None and now - self._run_last > gap:
+            self._run_start = self._run_last = None
+            self._run_volume = 0
+        duration = (now - self._run_start).total_seconds() if self._run_start else 0.0
+
+        self._update_drip(now, drawn > 0)
+
+        reason = None
+        if self._run_start is not None and (
+            duration >= self.config.duration * 60
+            or self._run_volume >= self.config.volume
+        ):
+            reason = LEAK_FLOW
+        elif self._drip:
+            reason = LEAK_DRIP
+        return LeakState(reason, duration, self._run_volume)
+
+    def _update_drip(self, now: datetime, drawn: bool) -> None:
+        if not self.config.in_drip_window(now):
+            # A drip is only reported until the end of the window
+            self._slots.clear()
+            self._slot = None
+            self._drip = False
+            return
+        slot = now.replace(
+            minute=now.minute - now.minute % _SLOT_MINUTES, second=0, microsecond=0
+        )
+        if slot != self._slot:
+            if self._slot is not None and not self._slots[-1]:
+                # A completed slot without water ends a drip
+                self._drip = False
+            self._slot = slot
+            self._slots.append(False)
+        if drawn:
+            self._slots[-1] = True
+        if len(self._slots) == _DRIP_SLOTS and all(self._slots):
+            self._drip = True
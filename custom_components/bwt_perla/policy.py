@@ -0,0 +1,81 @@
+"""Polling policy of an entry, configured in the options."""
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+from .const import (
+    CONF_HOLIDAY_INTERVAL,
+    CONF_MAX_INTERVAL,
+    CONF_MIN_INTERVAL,
+    CONF_QUIET_END,
+    CONF_QUIET_INTERVAL,
+    CONF_QUIET_START,
+    CONF_RAMP_FACTOR,
+)
+
+DEFAULT_MIN_INTERVAL = 1
+DEFAULT_MAX_INTERVAL = 30
+DEFAULT_RAMP_FACTOR = 2.0
+DEFAULT_HOLIDAY_INTERVAL = 300
+DEFAULT_QUIET_INTERVAL = 120
+
+
+@dataclass(frozen=True, slots=True)
+class PollingPolicy:
+    """Intervals to poll the device with, in seconds."""
+
+    # Used while water flows
+    min_interval: int = DEFAULT_MIN_INTERVAL
+    # Used without flow, scaled with the learned usage
+    max_interval: int = DEFAULT_MAX_INTERVAL
+    # Growth of the interval per poll after a flow stopped
+    ramp_factor: float = DEFAULT_RAMP_FACTOR
+    # Used without flow while the holiday mode is active
+    holiday_interval: int = DEFAULT_HOLIDAY_INTERVAL
+    # Local times of the quiet window, it may span midnight
+    quiet_start: time | None = None
+    quiet_end: time | None = None
+    # Used without flow during the quiet window
+    quiet_interval: int = DEFAULT_QUIET_INTERVAL
+
+    @classmethod
+    def from_options(cls, options: Mapping[str, Any]) -> "PollingPolicy":
+        """Create the policy from the options of the entry."""
+        quiet_start = options.get(CONF_QUIET_START)
+        quiet_end = options.get(CONF_QUIET_END)
+        return cls(
+            min_interval=options.get(CONF_MIN_INTERVAL, DEFAULT_MIN_INTERVAL),
+            max_interval=options.get(CONF_MAX_INTERVAL, DEFAULT_MAX_INTERVAL),
+            ramp_factor=options.get(CONF_RAMP_FACTOR, DEFAULT_RAMP_FACTOR),
+            holiday_interval=options.get(
+                CONF_HOLIDAY_INTERVAL, DEFAULT_HOLIDAY_INTERVAL
+            ),
+            quiet_start=dt_util.parse_time(quiet_start) if quiet_start else None,
+            quiet_end=dt_util.parse_time(quiet_end) if quiet_end else None,
+            quiet_interval=options.get(CONF_QUIET_INTERVAL, DEFAULT_QUIET_INTERVAL),
+        )
+
+    def is_quiet(self, now: datetime) -> bool:
+        """Return if the local time is within the quiet window."""
+        if self.quiet_start is None or self.quiet_end is None:
+            return False
+        current = now.time()
+        if self.quiet_start <= self.quiet_end:
+            return self.quiet_start <= current < self.quiet_end
+        return current >= self.quiet_start or current < self.quiet_end
+
+    def idle_interval(
+        self, now: datetime, holiday: bool, usage_factor: float
+    ) -> timedelta:
+        """Return the interval to use without flow."""
+        if holiday:
+            seconds = self.holiday_interval
+        elif self.is_quiet(now):
+            seconds = self.quiet_interval
+        else:
+            seconds = round(self.max_interval * usage_factor)
+        return timedelta(seconds=max(self.min_interval, seconds))
@@ -0,0 +1,64 @@
+"""Limit how often fast changing values are published as state."""
+
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True, kw_only=True, slots=True)
+class PublishPolicy:
+    """When a new value of a sensor is written to the state machine."""
+
+    # Changes up to this absolute or relative amount are not published
+    deadband: float = 0.0
+    relative_deadband: float = 0.0
+    # Seconds between two published states, later changes are published after it
+    min_interval: float = 0.0
+    # Seconds after which the value is published again, also if it is unchanged
+    # or the change is within the deadband
+    heartbeat: float | None = None
+
+
+class Publisher:
+    """Decide per update if and when the value of a sensor is published.
+
+    Changes from or to zero are always significant, so the start and the end
+    of a flow are not held back by the deadband.
+    """
+
+    def __init__(self, policy: PublishPolicy) -> None:
+        """Initialize without a published value."""
+        self._policy = policy
+        self._value: float | None = None
+        self._published_at = float("-inf")
+
+    def delay(self, now: float, value: float | None) -> float | None:
+        """Return the seconds until the value should be published.
+
+        Zero means to publish it now, None to not publish it at all.
+        """
+        policy = self._policy
+        last = self._value
+        if last is None or value is None or (last == 0) != (value == 0):
+            significant = True
+        else:
+            band = max(policy.deadband, policy.relative_deadband * abs(last))
+            significant = abs(value - last) > band
+        if not significant:
+            if policy.heartbeat is None:
+                return None
+            return max(0.0, self._published_at + policy.heartbeat - now)
+        return max(0.0, self._published_at + policy.min_interval - now)
+
+    @property
+    def heartbeat(self) -> float | None:
+        """Return the seconds after which a published value is published again."""
+        return self._policy.heartbeat
+
+    def reset(self) -> None:
+        """Publish the next value right away, e.g. after being unavailable."""
+        self._value = None
+        self._published_at = float("-inf")
+
+    def published(self, now: float, value: float | None) -> None:
+        """Remember the value that was published."""
+        self._value = value
+        self._published_at = now
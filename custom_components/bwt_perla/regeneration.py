@@ -0,0 +1,102 @@
+"""Keep a log of the regenerations of the columns."""
+
+from collections import deque
+from datetime import datetime
+from typing import Any, NamedTuple
+
+from bwt_api.data import CurrentResponse
+
+from homeassistant.util import dt as dt_util
+
+# Regenerations kept, a device regenerates a few times per day at most
+_MAX_EVENTS = 200
+
+
+class Regeneration(NamedTuple):
+    """Regeneration of one column."""
+
+    # Unix timestamp reported by the device
+    time: float
+    column: int
+    # Regenerations of the column since the setup of the device
+    count: int
+    # Liters of water and grams of salt since the previous regeneration of any
+    # column, None for the first one seen
+    water: int | None
+    salt: int | None
+
+    def as_event(self) -> dict[str, Any]:
+        """Return the regeneration as data of an event or a message."""
+        return {
+            "time": dt_util.utc_from_timestamp(self.time).isoformat(),
+            "column": self.column,
+            "count": self.count,
+            "water": self.water,
+            "salt": self.salt,
+        }
+
+
+class RegenerationLog:
+    """Detect regenerations from the counters and timestamps of the columns.
+
+    A column regenerated if its counter increased or the time of its last
+    regeneration changed. The totals at the previous regeneration give the
+    water and salt between two regenerations.
+    """
+
+    def __init__(self) -> None:
+        """Initialize without history."""
+        self.events: deque[Regeneration] = deque(maxlen=_MAX_EVENTS)
+        # Counter and time of the last regeneration per column
+        self._columns: list[tuple[int, float]] | None = None
+        # Water and salt totals at the previous regeneration
+        self._totals: tuple[int, int] | None = None
+
+    def update(self, current: CurrentResponse) -> list[Regeneration]:
+        """Add the values of a poll, returns the new regenerations."""
+        columns = [
+            (current.regeneration_count_1, current.regeneration_last_1.timestamp()),
+            (current.regeneration_count_2, current.regeneration_last_2.timestamp()),
+        ]
+        previous, self._columns = self._columns, columns
+        if previous is None or previous == columns:
+            return []
+        totals = (current.blended_total, current.regenerativ_total)
+        new = []
+        for column, (before, after) in enumerate(zip(previous, columns), 1):
+            if after[0] > before[0] or after[1] != before[1]:
+                water = salt = None
+                if self._totals is not None:
+                    water = totals[0] - self._totals[0]
+                    salt = totals[1] - self._totals[1]
+                new.append(Regeneration(after[1], column, after[0], water, salt))
+                self._totals = totals
+        self.events.extend(new)
+        return new
+
+    def as_dict(self) -> dict:
+        """Return the log in a form that can be stored."""
+        return {
+            "events": [list(event) for event in self.events],
+            "columns": self._columns,
+            "totals": self._totals,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict | None) -> "RegenerationLog":
+        """Restore the log stored with as_dict."""
+        log = cls()
+        if data:
+            log.events.extend(Regeneration(*event) for event in data["events"])
+            if data["columns"] is not None:
+                log._columns = [tuple(column) for column in data["columns"]]
+            if data["totals"] is not None:
+                log._totals = tuple(data["totals"])
+        return log
+
+    def since(self, start: datetime | None) -> list[Regeneration]:
+        """Return the regenerations since the given time, oldest first."""
+        if start is None:
+            return list(self.events)
+        timestamp = start.timestamp()
+        return [event for event in self.events if event.time >= timestamp]
@@ -0,0 +1,97 @@
+"""Schedule the polls of all devices of the domain together."""
+
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterator, Callable
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN
+
+if TYPE_CHECKING:
+    from .coordinator import BwtCoordinator
+
+_DATA_SCHEDULER = f"{DOMAIN}_scheduler"
+# Requests to all devices at the same time
+_MAX_CONCURRENT = 4
+
+
+class PollScheduler:
+    """Stagger the polls of the devices and limit the concurrent requests.
+
+    The coordinators schedule their polls at full seconds plus a phase. The
+    phases are spread evenly over the second, so devices polling every second
+    during a flow don't poll at the same time. Devices with flow get a free
+    request slot before the idle ones.
+    """
+
+    def __init__(self) -> None:
+        """Initialize without devices."""
+        self._coordinators: list[BwtCoordinator] = []
+        self._active = 0
+        self._waiting: tuple[deque[asyncio.Future[None]], ...] = (deque(), deque())
+
+    @callback
+    def async_register(self, coordinator: "BwtCoordinator") -> Callable[[], None]:
+        """Add the coordinator of a device, returns the function to remove it."""
+        self._coordinators.append(coordinator)
+        self._spread_phases()
+
+        @callback
+        def unregister() -> None:
+            self._coordinators.remove(coordinator)
+            self._spread_phases()
+
+        return unregister
+
+    def _spread_phases(self) -> None:
+        count = len(self._coordinators)
+        for index, coordinator in enumerate(self._coordinators):
+            coordinator.poll_phase = index / count
+
+    @asynccontextmanager
+    async def request_slot(self, priority: bool) -> AsyncIterator[None]:
+        """Wait for a free request slot, devices with priority first."""
+        await self._acquire(priority)
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _acquire(self, priority: bool) -> None:
+        if self._active < _MAX_CONCURRENT:
+            self._active += 1
+            return
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        queue = self._waiting[0 if priority else 1]
+        queue.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter in queue:
+                queue.remove(waiter)
+            elif waiter.done() and not waiter.cancelled():
+                # The slot was handed over just before the cancellation, pass
+                # it on to the next waiter
+                self._release()
+            raise
+
+    def _release(self) -> None:
+        for queue in self._waiting:
+            while queue:
+                waiter = queue.popleft()
+                if not waiter.done():
+                    # Hand the slot over to the waiter
+                    waiter.set_result(None)
+                    return
+        self._active -= 1
+
+
+@callback
+def async_get_scheduler(hass: HomeAssistant) -> PollScheduler:
+    """Return the scheduler shared by all entries."""
+    if _DATA_SCHEDULER not in hass.data:
+        hass.data[_DATA_SCHEDULER] = PollScheduler()
+    return hass.data[_DATA_SCHEDULER]
@@ -1,35 +1,43 @@
 """Example integration using DataUpdateCoordinator."""
 
+from collections.abc import Callable
+from dataclasses import dataclass
 from datetime import datetime
 import logging
-from zoneinfo import ZoneInfo
+import time
 
-from bwt_api.api import treated_to_blended
 from bwt_api.data import BwtStatus
-from bwt_api.exception import WrongCodeException
 
-from homeassistant.components.binary_sensor import BinarySensorEntity
+from homeassistant.components.binary_sensor import (
+    BinarySensorEntity,
+    BinarySensorEntityDescription,
+)
 from homeassistant.components.sensor import (
     SensorDeviceClass,
     SensorEntity,
+    SensorEntityDescription,
     SensorStateClass,
 )
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (
     PERCENTAGE,
+    EntityCategory,
     UnitOfMass,
     UnitOfTime,
     UnitOfVolume,
     UnitOfVolumeFlowRate,
 )
-from homeassistant.core import HomeAssistant, callback
-from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.helpers.device_registry import DeviceInfo
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.typing import StateType
 
 from .const import DOMAIN
-from .coordinator import BwtCoordinator
+from .coordinator import POLL_FIELD, BwtCoordinator
+from .data import BwtData
+from .entity import BwtEntity, bwt_device_info
+from .publish import PublishPolicy, Publisher
 
 _LOGGER = logging.getLogger(__name__)
 _GLASS = "mdi:cup-water"
@@ -51,491 +59,534 @@ _DAY = "mdi:calendar-today"
 _MONTH = "mdi:calendar-month"
 _YEAR = "mdi:calendar-blank-multiple"
 _HOLIDAY = "mdi:location-exit"
+_SALT = "mdi:shaker-outline"
+_TIMER = "mdi:timer-outline"
+_ALERT = "mdi:alert-outline"
+_PENCIL = "mdi:pencil"
 
 
-async def async_setup_entry(
-    hass: HomeAssistant,
-    config_entry: ConfigEntry,
-    async_add_entities: AddEntitiesCallback,
-) -> None:
-    """Set up bwt sensors from config entry."""
-    my_api = hass.data[DOMAIN][config_entry.entry_id]
-    coordinator = BwtCoordinator(hass, my_api)
-
-    # Fetch initial data so we have data when entities subscribe
-    #
-    # If the refresh fails, async_config_entry_first_refresh will
-    # raise ConfigEntryNotReady and setup will try again later
-    #
-    # If you do not want to retry setup on failure, use
-    # coordinator.async_refresh() instead
-    #
-    try:
-        await coordinator.async_config_entry_first_refresh()
-    except WrongCodeException as e:
-        # Raising ConfigEntryAuthFailed will cancel future updates
-        # and start a config flow with SOURCE_REAUTH (async_step_reauth)
-        raise ConfigEntryAuthFailed from e
-
-    device_info = DeviceInfo(
-        configuration_url=None,
-        connections=set(),
-        entry_type=None,
-        hw_version=None,
-        identifiers={(DOMAIN, config_entry.entry_id)},
-        manufacturer="BWT",
-        model="Perla",
-        name=config_entry.title,
-        serial_number=None,
-        suggested_area=None,
-        sw_version=coordinator.data.firmware_version,
-        via_device=(DOMAIN, ""),
-    )
-
-    async_add_entities(
-        [
-            TotalOutputSensor(coordinator, device_info, config_entry.entry_id),
-            ErrorSensor(coordinator, device_info, config_entry.entry_id),
-            WarningSensor(coordinator, device_info, config_entry.entry_id),
-            SimpleSensor(
-                coordinator,
-                device_info,
-                config_entry.entry_id,
-                "hardness_in",
-                lambda data: data.in_hardness.dH,
-                _WATER_PLUS,
-            ),
-            SimpleSensor(
-                coordinator,
-                device_info,
-                config_entry.entry_id,
-                "hardness_out",
-                lambda data: data.out_hardness.dH,
-                _WATER_MINUS,
-            ),
-            DeviceClassSensor(
-                coordinator,
-                device_info,
-                config_entry.entry_id,
-                "customer_service",
-                lambda data: data.service_customer,
-                SensorDeviceClass.TIMESTAMP,
-                _WRENCH_CLOCK,
-            ),
-            DeviceClassSensor(
-                coordinator,
-                device_info,
-                config_entry.entry_id,
-                "technician_service",
-                lambda data: data.service_technician,
-                SensorDeviceClass.TIMESTAMP,
-                _WRENCH_PERSON,
-            ),
-            StateSensor(coordinator, device_info, config_entry.entry_id),
-            UnitSensor(
-                coordinator,
-                device_info,
-                config_entry.entry_id,
-                "regenerativ_level",
-                lambda data: data.regenerativ_level,
-                PERCENTAGE,
-                _PERCENTAGE,
-            ),
-            UnitSensor(
-                coordinator,
-                device_info,
-                config_entry.entry_id,
-                "regenerativ_days",
-                lambda data: data.regenerativ_days,
-                UnitOfTime.DAYS,
-                _DAYS_LEFT,
-            ),
-            UnitSensor(
-                coordinator,
-                device_info,
-                config_entry.entry_id,
-                "regenerativ_mass",
-                lambda data: data.regenerativ_total,
-                UnitOfMass.GRAMS,
-                _MASS,
-            ),
-            DeviceClassSensor(
-                coordinator,
-                device_info,
-                config_entry.entry_id,
-                "last_regeneration_1",
-                lambda data: data.regeneration_last_1,
-                SensorDeviceClass.TIMESTAMP,
-                _TIME,
-            ),
-            DeviceClassSensor(
-                coordinator,
-                device_info,
-                config_entry.entry_id,
-                "last_regeneration_2",
-                lambda data: data.regeneration_last_2,
-                SensorDeviceClass.TIMESTAMP,
-                _TIME,
-            ),
-            SimpleSensor(
-                coordinator,
-                device_info,
-                config_entry.entry_id,
-                "counter_regeneration_1",
-                lambda data: data.regeneration_count_1,
-                _COUNTER,
-            ),
-            SimpleSensor(
-                coordinator,
-                device_info,
-                config_entry.entry_id,
-                "counter_regeneration_2",
-                lambda data: data.regeneration_count_2,
-                _COUNTER,
-            ),
-            HolidayModeSensor(coordinator, device_info, config_entry.entry_id),
-            HolidayStartSensor(coordinator, device_info, config_entry.entry_id),
-            CalculatedWaterSensor(
-                coordinator,
-                device_info,
-                config_entry.entry_id,
-                "day_output",
-                lambda data: data.treated_day,
-                _DAY,
-            ),
-            CalculatedWaterSensor(
-                coordinator,
-                device_info,
-                config_entry.entry_id,
-                "month_output",
-                lambda data: data.treated_month,
-                _MONTH,
-            ),
-            CalculatedWaterSensor(
-                coordinator,
-                device_info,
-                config_entry.entry_id,
-                "year_output",
-                lambda data: data.treated_year,
-                _YEAR,
-            ),
-            CalculatedCapacitySensor(
-                coordinator,
-                device_info,
-                config_entry.entry_id,
-                "capacity_1",
-                lambda data: data.capacity_1,
-            ),
-            CalculatedCapacitySensor(
-                coordinator,
-                device_info,
-                config_entry.entry_id,
-                "capacity_2",
-                lambda data: data.capacity_2,
-            ),
-            CurrentFlowSensor(coordinator, device_info, config_entry.entry_id),
-        ]
-    )
-
-
-class BwtEntity(CoordinatorEntity[BwtCoordinator]):
-    """General bwt entity with common properties."""
-
-    def __init__(
-        self,
-        coordinator: BwtCoordinator,
-        device_info: DeviceInfo,
-        entry_id: str,
-        key: str,
-    ) -> None:
-        """Initialize the common properties."""
-        super().__init__(coordinator)
-        self._attr_device_info = device_info
-        self._attr_translation_key = key
-        self.entity_id = f"sensor.${DOMAIN}_${key}"
-        self._attr_unique_id = entry_id + "_" + key
+@dataclass(frozen=True, kw_only=True)
+class BwtSensorEntityDescription(SensorEntityDescription):
+    """Description of a bwt sensor reading one precomputed value."""
 
+    value_fn: Callable[[BwtData], StateType | datetime]
+    # Fields of the update the value depends on
+    fields: frozenset[str]
+    # Covered by the hourly statistics if they are enabled
+    in_statistics: bool = False
+    # Limits the published states of fast changing values, all are published without
+    publish: PublishPolicy | None = None
 
-class TotalOutputSensor(BwtEntity, SensorEntity):
-    """Total water [liter] that passed through the output."""
 
-    _attr_icon = _WATER
-    _attr_native_unit_of_measurement = UnitOfVolume.LITERS
-    _attr_device_class = SensorDeviceClass.WATER
-    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+@dataclass(frozen=True, kw_only=True)
+class BwtBinarySensorEntityDescription(BinarySensorEntityDescription):
+    """Description of a bwt binary sensor reading one precomputed value."""
 
-    def __init__(self, coordinator, device_info, entry_id) -> None:
-        """Initialize the sensor with the common coordinator."""
-        super().__init__(coordinator, device_info, entry_id, "total_output")
+    is_on_fn: Callable[[BwtData], bool]
+    fields: frozenset[str]
 
-    @callback
-    def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
-        self._attr_native_value = self.coordinator.data.blended_total
-        self.async_write_ha_state()
 
+@dataclass(frozen=True, kw_only=True)
+class BwtHealthSensorEntityDescription(SensorEntityDescription):
+    """Description of a sensor about the polling itself."""
 
-class CurrentFlowSensor(BwtEntity, SensorEntity):
-    """Current flow per hour."""
+    value_fn: Callable[[BwtCoordinator], StateType]
+    entity_category: EntityCategory = EntityCategory.DIAGNOSTIC
+    entity_registry_enabled_default: bool = False
 
-    _attr_native_unit_of_measurement = UnitOfVolumeFlowRate.CUBIC_METERS_PER_HOUR
-    _attr_state_class = SensorStateClass.MEASUREMENT
-    _attr_icon = _FAUCET
-    suggested_display_precision = 3
 
-    def __init__(self, coordinator, device_info, entry_id) -> None:
-        """Initialize the sensor with the common coordinator."""
-        super().__init__(coordinator, device_info, entry_id, "current_flow")
+# Flow in m³/h: small changes are published at least every minute
+_FLOW_PUBLISH = PublishPolicy(
+    deadband=0.01, relative_deadband=0.1, min_interval=5, heartbeat=60
+)
 
-    @callback
-    def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
+SENSORS: tuple[BwtSensorEntityDescription, ...] = (
+    BwtSensorEntityDescription(
+        key="total_output",
+        icon=_WATER,
+        native_unit_of_measurement=UnitOfVolume.LITERS,
+        device_class=SensorDeviceClass.WATER,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda data: data.current.blended_total,
+        fields=frozenset({"blended_total"}),
+        in_statistics=True,
+        publish=PublishPolicy(min_interval=10),
+    ),
+    BwtSensorEntityDescription(
+        key="errors",
+        icon=_ERROR,
+        value_fn=lambda data: data.error_names,
+        fields=frozenset({"error_names"}),
+    ),
+    BwtSensorEntityDescription(
+        key="warnings",
+        icon=_WARNING,
+        value_fn=lambda data: data.warning_names,
+        fields=frozenset({"warning_names"}),
+    ),
+    BwtSensorEntityDescription(
+        key="hardness_in",
+        entity_registry_enabled_default=False,
+        icon=_WATER_PLUS,
+        value_fn=lambda data: data.current.in_hardness.dH,
+        fields=frozenset({"in_hardness"}),
+    ),
+    BwtSensorEntityDescription(
+        key="hardness_out",
+        entity_registry_enabled_default=False,
+        icon=_WATER_MINUS,
+        value_fn=lambda data: data.current.out_hardness.dH,
+        fields=frozenset({"out_hardness"}),
+    ),
+    BwtSensorEntityDescription(
+        key="customer_service",
+        entity_registry_enabled_default=False,
+        icon=_WRENCH_CLOCK,
+        device_class=SensorDeviceClass.TIMESTAMP,
+        value_fn=lambda data: data.current.service_customer,
+        fields=frozenset({"service_customer"}),
+    ),
+    BwtSensorEntityDescription(
+        key="technician_service",
+        entity_registry_enabled_default=False,
+        icon=_WRENCH_PERSON,
+        device_class=SensorDeviceClass.TIMESTAMP,
+        value_fn=lambda data: data.current.service_technician,
+        fields=frozenset({"service_technician"}),
+    ),
+    BwtSensorEntityDescription(
+        key="state",
+        icon=_WATER_CHECK,
+        device_class=SensorDeviceClass.ENUM,
+        options=list(BwtStatus.__members__),
+        value_fn=lambda data: data.current.state.name,
+        fields=frozenset({"state"}),
+    ),
+    BwtSensorEntityDescription(
+        key="regenerativ_level",
+        icon=_PERCENTAGE,
+        native_unit_of_measurement=PERCENTAGE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda data: data.current.regenerativ_level,
+        fields=frozenset({"regenerativ_level"}),
+    ),
+    BwtSensorEntityDescription(
+        key="regenerativ_days",
+        icon=_DAYS_LEFT,
+        native_unit_of_measurement=UnitOfTime.DAYS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda data: data.current.regenerativ_days,
+        fields=frozenset({"regenerativ_days"}),
+    ),
+    BwtSensorEntityDescription(
+        key="regenerativ_mass",
+        entity_registry_enabled_default=False,
+        icon=_MASS,
+        native_unit_of_measurement=UnitOfMass.GRAMS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda data: data.current.regenerativ_total,
+        fields=frozenset({"regenerativ_total"}),
+    ),
+    BwtSensorEntityDescription(
+        key="salt_per_m3",
+        icon=_MASS,
+        native_unit_of_measurement="g/m³",
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=0,
+        value_fn=lambda data: data.salt_per_m3,
+        fields=frozenset({"salt_per_m3"}),
+    ),
+    BwtSensorEntityDescription(
+        key="salt_refill",
+        icon=_SALT,
+        device_class=SensorDeviceClass.TIMESTAMP,
+        value_fn=lambda data: data.salt_refill,
+        fields=frozenset({"salt_refill"}),
+    ),
+    BwtSensorEntityDescription(
+        key="last_salt_refill",
+        icon=_SALT,
+        device_class=SensorDeviceClass.TIMESTAMP,
+        value_fn=lambda data: data.last_salt_refill,
+        fields=frozenset({"last_salt_refill"}),
+    ),
+    BwtSensorEntityDescription(
+        key="next_regeneration_1",
+        icon=_TIME,
+        device_class=SensorDeviceClass.TIMESTAMP,
+        value_fn=lambda data: data.next_regeneration_1,
+        fields=frozenset({"next_regeneration_1"}),
+    ),
+    BwtSensorEntityDescription(
+        key="next_regeneration_2",
+        icon=_TIME,
+        device_class=SensorDeviceClass.TIMESTAMP,
+        value_fn=lambda data: data.next_regeneration_2,
+        fields=frozenset({"next_regeneration_2"}),
+    ),
+    BwtSensorEntityDescription(
+        key="last_regeneration_1",
+        icon=_TIME,
+        device_class=SensorDeviceClass.TIMESTAMP,
+        value_fn=lambda data: data.current.regeneration_last_1,
+        fields=frozenset({"regeneration_last_1"}),
+    ),
+    BwtSensorEntityDescription(
+        key="last_regeneration_2",
+        icon=_TIME,
+        device_class=SensorDeviceClass.TIMESTAMP,
+        value_fn=lambda data: data.current.regeneration_last_2,
+        fields=frozenset({"regeneration_last_2"}),
+    ),
+    BwtSensorEntityDescription(
+        key="counter_regeneration_1",
+        entity_registry_enabled_default=False,
+        icon=_COUNTER,
+        value_fn=lambda data: data.current.regeneration_count_1,
+        fields=frozenset({"regeneration_count_1"}),
+    ),
+    BwtSensorEntityDescription(
+        key="counter_regeneration_2",
+        entity_registry_enabled_default=False,
+        icon=_COUNTER,
+        value_fn=lambda data: data.current.regeneration_count_2,
+        fields=frozenset({"regeneration_count_2"}),
+    ),
+    BwtSensorEntityDescription(
+        key="holiday_mode_start",
+        entity_registry_enabled_default=False,
+        icon=_HOLIDAY,
+        device_class=SensorDeviceClass.TIMESTAMP,
+        value_fn=lambda data: data.holiday_start,
+        fields=frozenset({"holiday_start"}),
+    ),
+    BwtSensorEntityDescription(
+        key="day_output",
+        icon=_DAY,
+        native_unit_of_measurement=UnitOfVolume.LITERS,
+        device_class=SensorDeviceClass.WATER,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        suggested_display_precision=0,
+        value_fn=lambda data: data.blended_day,
+        fields=frozenset({"blended_day"}),
+    ),
+    BwtSensorEntityDescription(
+        key="month_output",
+        icon=_MONTH,
+        native_unit_of_measurement=UnitOfVolume.LITERS,
+        device_class=SensorDeviceClass.WATER,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        suggested_display_precision=0,
+        value_fn=lambda data: data.blended_month,
+        fields=frozenset({"blended_month"}),
+    ),
+    BwtSensorEntityDescription(
+        key="year_output",
+        icon=_YEAR,
+        native_unit_of_measurement=UnitOfVolume.LITERS,
+        device_class=SensorDeviceClass.WATER,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        suggested_display_precision=0,
+        value_fn=lambda data: data.blended_year,
+        fields=frozenset({"blended_year"}),
+    ),
+    BwtSensorEntityDescription(
+        key="day_consumption",
+        icon=_DAY,
+        native_unit_of_measurement=UnitOfVolume.LITERS,
+        device_class=SensorDeviceClass.WATER,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        suggested_display_precision=0,
+        value_fn=lambda data: data.day_consumption,
+        fields=frozenset({"day_consumption"}),
+    ),
+    BwtSensorEntityDescription(
+        key="month_consumption",
+        icon=_MONTH,
+        native_unit_of_measurement=UnitOfVolume.LITERS,
+        device_class=SensorDeviceClass.WATER,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        suggested_display_precision=0,
+        value_fn=lambda data: data.month_consumption,
+        fields=frozenset({"month_consumption"}),
+    ),
+    BwtSensorEntityDescription(
+        key="year_consumption",
+        icon=_YEAR,
+        native_unit_of_measurement=UnitOfVolume.LITERS,
+        device_class=SensorDeviceClass.WATER,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        suggested_display_precision=0,
+        value_fn=lambda data: data.year_consumption,
+        fields=frozenset({"year_consumption"}),
+    ),
+    BwtSensorEntityDescription(
+        key="capacity_1",
+        icon=_GLASS,
+        native_unit_of_measurement=UnitOfVolume.LITERS,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=0,
+        value_fn=lambda data: data.blended_capacity_1,
+        fields=frozenset({"blended_capacity_1"}),
+    ),
+    BwtSensorEntityDescription(
+        key="capacity_2",
+        icon=_GLASS,
+        native_unit_of_measurement=UnitOfVolume.LITERS,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=0,
+        value_fn=lambda data: data.blended_capacity_2,
+        fields=frozenset({"blended_capacity_2"}),
+    ),
+    BwtSensorEntityDescription(
+        key="current_flow",
+        icon=_FAUCET,
         # HA only has m3 / h, we get the values in l/h
-        self._attr_native_value = self.coordinator.data.current_flow / 1000
-        self.async_write_ha_state()
-
-
-class ErrorSensor(BwtEntity, SensorEntity):
-    """Errors reported by the device."""
-
-    _attr_icon = _ERROR
+        native_unit_of_measurement=UnitOfVolumeFlowRate.CUBIC_METERS_PER_HOUR,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=3,
+        value_fn=lambda data: data.current.current_flow / 1000,
+        fields=frozenset({"current_flow"}),
+        in_statistics=True,
+        publish=_FLOW_PUBLISH,
+    ),
+    BwtSensorEntityDescription(
+        key="derived_flow",
+        icon=_FAUCET,
+        native_unit_of_measurement=UnitOfVolumeFlowRate.CUBIC_METERS_PER_HOUR,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=3,
+        value_fn=lambda data: (
+            data.derived_flow / 1000 if data.derived_flow is not None else None
+        ),
+        fields=frozenset({"derived_flow"}),
+        in_statistics=True,
+        publish=_FLOW_PUBLISH,
+    ),
+)
 
-    def __init__(self, coordinator, device_info, entry_id) -> None:
-        """Initialize the sensor with the common coordinator."""
-        super().__init__(coordinator, device_info, entry_id, "errors")
+HEALTH_SENSORS: tuple[BwtHealthSensorEntityDescription, ...] = (
+    BwtHealthSensorEntityDescription(
+        key="poll_latency",
+        icon=_TIMER,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=3,
+        value_fn=lambda coordinator: coordinator.health.mean_latency,
+    ),
+    BwtHealthSensorEntityDescription(
+        key="poll_errors",
+        icon=_ALERT,
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda coordinator: coordinator.health.error_count,
+    ),
+    BwtHealthSensorEntityDescription(
+        key="update_interval",
+        icon=_TIMER,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: (
+            coordinator.update_interval.total_seconds()
+            if coordinator.update_interval
+            else None
+        ),
+    ),
+    BwtHealthSensorEntityDescription(
+        key="data_age",
+        # Tells how old the values kept during the grace period are
+        entity_registry_enabled_default=True,
+        icon=_TIMER,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: (
+            round(coordinator.data_age) if coordinator.data_age is not None else None
+        ),
+    ),
+    BwtHealthSensorEntityDescription(
+        key="writes_per_update",
+        icon=_PENCIL,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=1,
+        value_fn=lambda coordinator: coordinator.health.writes_per_update,
+    ),
+)
 
-    @callback
-    def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
-        values = [x.name for x in self.coordinator.data.errors if x.is_fatal()]
-        self._attr_native_value = ",".join(values)
-        self.async_write_ha_state()
+HOLIDAY_MODE = BwtBinarySensorEntityDescription(
+    key="holiday_mode",
+    icon=_HOLIDAY,
+    is_on_fn=lambda data: data.current.holiday_mode == 1,
+    fields=frozenset({"holiday_mode"}),
+)
 
 
-class WarningSensor(BwtEntity, SensorEntity):
-    """Warnings reported by the device."""
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up bwt sensors from config entry."""
+    coordinator: BwtCoordinator = hass.data[DOMAIN][config_entry.entry_id]
 
-    _attr_icon = _WARNING
+    device_info = bwt_device_info(coordinator, config_entry)
 
-    def __init__(self, coordinator, device_info, entry_id) -> None:
-        """Initialize the sensor with the common coordinator."""
-        super().__init__(coordinator, device_info, entry_id, "warnings")
+    entities: list[BwtEntity] = [
+        BwtSensor(coordinator, device_info, config_entry.entry_id, description)
+        for description in SENSORS
+    ]
+    entities.extend(
+        BwtHealthSensor(coordinator, device_info, config_entry.entry_id, description)
+        for description in HEALTH_SENSORS
+    )
+    entities.append(
+        HolidayModeSensor(coordinator, device_info, config_entry.entry_id, HOLIDAY_MODE)
+    )
+    async_add_entities(entities)
 
-    @callback
-    def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
-        values = [x.name for x in self.coordinator.data.errors if not x.is_fatal()]
-        self._attr_native_value = ",".join(values)
-        self.async_write_ha_state()
 
+class BwtSensor(BwtEntity, SensorEntity):
+    """Sensor reading its value from the coordinator data."""
 
-class SimpleSensor(BwtEntity, SensorEntity):
-    """Simplest sensor with least configuration options."""
+    entity_description: BwtSensorEntityDescription
 
     def __init__(
         self,
         coordinator: BwtCoordinator,
         device_info: DeviceInfo,
         entry_id: str,
-        key: str,
-        extract,
-        icon: str,
+        description: BwtSensorEntityDescription,
     ) -> None:
         """Initialize the sensor with the common coordinator."""
-        super().__init__(coordinator, device_info, entry_id, key)
-        self._attr_icon = icon
-        self._extract = extract
-
-    @callback
-    def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
-        self._attr_native_value = self._extract(self.coordinator.data)
-        self.async_write_ha_state()
-
-
-class DeviceClassSensor(SimpleSensor):
-    """Basic sensor specifying a device class."""
-
-    def __init__(
-        self,
-        coordinator: BwtCoordinator,
-        device_info: DeviceInfo,
-        entry_id: str,
-        key: str,
-        extract,
-        device_class: SensorDeviceClass,
-        icon: str,
-    ) -> None:
-        """Initialize the sensor."""
-        super().__init__(coordinator, device_info, entry_id, key, extract, icon)
-        self._attr_device_class = device_class
-
-
-class UnitSensor(SimpleSensor):
-    """Sensor specifying a unit."""
-
-    def __init__(
-        self,
-        coordinator: BwtCoordinator,
-        device_info: DeviceInfo,
-        entry_id: str,
-        key: str,
-        extract,
-        unit: str,
-        icon: str,
-    ) -> None:
-        """Initialize the sensor."""
-        super().__init__(coordinator, device_info, entry_id, key, extract, icon)
-        self._attr_native_unit_of_measurement = unit
-        self._attr_state_class = SensorStateClass.MEASUREMENT
-
-
-class StateSensor(BwtEntity, SensorEntity):
-    """State of the machine."""
-
-    _attr_device_class = SensorDeviceClass.ENUM
-    _attr_options = list(BwtStatus.__members__)
-    _attr_icon = _WATER_CHECK
+        super().__init__(
+            coordinator, device_info, entry_id, description, description.fields
+        )
+        if description.in_statistics and coordinator.statistics is not None:
+            # The imported hourly statistics replace the ones compiled from states
+            self._attr_state_class = None
+        self._publisher = (
+            Publisher(description.publish) if description.publish else None
+        )
+        self._unsub_publish: CALLBACK_TYPE | None = None
+        self._publish_due = float("-inf")
 
-    def __init__(self, coordinator, device_info: DeviceInfo, entry_id: str) -> None:
-        """Initialize the sensor with the common coordinator."""
-        super().__init__(coordinator, device_info, entry_id, "state")
+    async def async_added_to_hass(self) -> None:
+        """Set the initial state when added to hass."""
+        await super().async_added_to_hass()
+        if self._publisher is not None:
+            self._publisher.published(time.monotonic(), self._attr_native_value)
+            self.async_on_remove(self._cancel_publish)
+            self._schedule_publish(self._publisher.heartbeat)
 
     @callback
     def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
-        self._attr_native_value = self.coordinator.data.state.name
-        self.async_write_ha_state()
-
-
-class HolidayModeSensor(BwtEntity, BinarySensorEntity):
-    """Current holiday mode state."""
-
-    _attr_icon = _HOLIDAY
-
-    def __init__(self, coordinator, device_info: DeviceInfo, entry_id: str) -> None:
-        """Initialize the sensor with the common coordinator."""
-        super().__init__(coordinator, device_info, entry_id, "holiday_mode")
+        """Publish the updated value according to the publish policy."""
+        if self._publisher is None:
+            super()._handle_coordinator_update()
+            return
+        if not self.available:
+            self._cancel_publish()
+            self._publisher.reset()
+            super()._handle_coordinator_update()
+            return
+        value = self.entity_description.value_fn(self.coordinator.data)
+        self._schedule_publish(self._publisher.delay(time.monotonic(), value))
 
     @callback
-    def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
-        self._attr_is_on = self.coordinator.data.holiday_mode == 1
-        self.async_write_ha_state()
-
+    def _schedule_publish(self, delay: float | None) -> None:
+        """Publish after the delay, unless a publish is due earlier anyway.
+
+        A significant change reschedules the pending heartbeat to the earlier
+        time. The value that is current by then is published.
+        """
+        if delay is None:
+            return
+        if delay <= 0:
+            self._publish()
+            return
+        due = time.monotonic() + delay
+        if self._unsub_publish is not None:
+            if self._publish_due <= due:
+                return
+            self._cancel_publish()
+        self._publish_due = due
+        self._unsub_publish = async_call_later(self.hass, delay, self._publish_later)
 
-class HolidayStartSensor(BwtEntity, SensorEntity):
-    """Future start of holiday mode if active."""
-
-    _attr_device_class = SensorDeviceClass.TIMESTAMP
-    _attr_icon = _HOLIDAY
-
-    def __init__(self, coordinator, device_info: DeviceInfo, entry_id: str) -> None:
-        """Initialize the sensor with the common coordinator."""
-        super().__init__(coordinator, device_info, entry_id, "holiday_mode_start")
+    @callback
+    def _publish_later(self, _now: datetime) -> None:
+        self._unsub_publish = None
+        if self.available:
+            self._publish()
 
     @callback
-    def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
-        holiday_mode = self.coordinator.data.holiday_mode
-        if holiday_mode > 1:
-            self._attr_native_value = datetime.fromtimestamp(
-                holiday_mode, tz=ZoneInfo("UTC")
-            )
-        else:
-            self._attr_native_value = None
+    def _publish(self) -> None:
+        self._cancel_publish()
+        self._update_attrs()
         self.async_write_ha_state()
+        self._publisher.published(time.monotonic(), self._attr_native_value)
+        self._schedule_publish(self._publisher.heartbeat)
 
-
-class CalculatedSensor(BwtEntity, SensorEntity):
-    """Sensor calculating blended water from treated water."""
-
-    suggested_display_precision = 0
-
-    def __init__(
-        self,
-        coordinator,
-        device_info: DeviceInfo,
-        entry_id: str,
-        key: str,
-        unit: UnitOfVolume,
-        stateClass: SensorStateClass,
-        extract,
-        icon: str,
-    ) -> None:
-        """Initialize the sensor with the common coordinator."""
-        super().__init__(coordinator, device_info, entry_id, key)
-        self._attr_native_unit_of_measurement = unit
-        self._attr_state_class = stateClass
-        self._attr_icon = icon
-        self._extract = extract
+    @callback
+    def _cancel_publish(self) -> None:
+        if self._unsub_publish is not None:
+            self._unsub_publish()
+            self._unsub_publish = None
 
     @callback
-    def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
-        self._attr_native_value = treated_to_blended(
-            self._extract(self.coordinator.data),
-            self.coordinator.data.in_hardness.dH,
-            self.coordinator.data.out_hardness.dH,
+    def _update_attrs(self) -> None:
+        """Update the state from the coordinator data."""
+        self._attr_native_value = self.entity_description.value_fn(
+            self.coordinator.data
         )
-        self.async_write_ha_state()
 
 
-class CalculatedWaterSensor(CalculatedSensor):
-    """Sensor calculating blended water from treated water with DeviceClass.WATER."""
+class BwtHealthSensor(BwtEntity, SensorEntity):
+    """Diagnostic sensor reading the health of the polling."""
 
-    _attr_device_class = SensorDeviceClass.WATER
+    entity_description: BwtHealthSensorEntityDescription
 
     def __init__(
         self,
-        coordinator,
+        coordinator: BwtCoordinator,
         device_info: DeviceInfo,
         entry_id: str,
-        key: str,
-        extract,
-        icon: str,
+        description: BwtHealthSensorEntityDescription,
     ) -> None:
-        """Initialize the sensor with the common coordinator."""
+        """Initialize the sensor, it is updated after every poll."""
         super().__init__(
-            coordinator,
-            device_info,
-            entry_id,
-            key,
-            UnitOfVolume.LITERS,
-            SensorStateClass.TOTAL_INCREASING,
-            extract,
-            icon,
+            coordinator, device_info, entry_id, description, frozenset({POLL_FIELD})
         )
 
+    @property
+    def available(self) -> bool:
+        """Return True, the health is also known while polls fail."""
+        return True
+
+    @callback
+    def _update_attrs(self) -> None:
+        """Update the state from the coordinator."""
+        self._attr_native_value = self.entity_description.value_fn(self.coordinator)
 
-class CalculatedCapacitySensor(BwtEntity, SensorEntity):
-    """Sensor calculating blended capacity from treated water."""
 
-    suggested_display_precision = 0
+class HolidayModeSensor(BwtEntity, BinarySensorEntity):
+    """Current holiday mode state."""
+
+    entity_description: BwtBinarySensorEntityDescription
 
     def __init__(
         self,
-        coordinator,
+        coordinator: BwtCoordinator,
         device_info: DeviceInfo,
         entry_id: str,
-        key: str,
-        extract,
+        description: BwtBinarySensorEntityDescription,
     ) -> None:
         """Initialize the sensor with the common coordinator."""
-        super().__init__(coordinator, device_info, entry_id, key)
-        self._attr_native_unit_of_measurement = UnitOfVolume.LITERS
-        self._attr_state_class = SensorStateClass.MEASUREMENT
-        self._attr_icon = _GLASS
-        self._extract = extract
+        super().__init__(
+            coordinator, device_info, entry_id, description, description.fields
+        )
 
     @callback
-    def _handle_coordinator_update(self) -> None:
-        """Handle updated data from the coordinator."""
-        self._attr_native_value = self._extract(self.coordinator.data) / (
-            (
-                self.coordinator.data.in_hardness.dH
-                - self.coordinator.data.out_hardness.dH
-            )
-            * 1000.0
-        )
-        self.async_write_ha_state()
+    def _update_attrs(self) -> None:
+        """Update the state from the coordinator data."""
+        self._attr_is_on = self.entity_description.is_on_fn(self.coordinator.data)
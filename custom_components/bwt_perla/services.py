@@ -0,0 +1,65 @@
+"""Services of the BWT Perla integration."""
+
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant, ServiceCall, callback
+from homeassistant.exceptions import ServiceValidationError
+from homeassistant.helpers import config_validation as cv
+
+from .const import DOMAIN
+from .coordinator import MAX_BOOST, BwtCoordinator
+
+SERVICE_CAPTURE = "capture"
+SERVICE_REFRESH = "refresh"
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_ENABLED = "enabled"
+ATTR_BOOST = "boost"
+
+CAPTURE_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Required(ATTR_ENABLED): cv.boolean,
+    }
+)
+REFRESH_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_BOOST): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=MAX_BOOST)
+        ),
+    }
+)
+
+
+@callback
+def _async_get_coordinator(hass: HomeAssistant, call: ServiceCall) -> BwtCoordinator:
+    """Return the coordinator of the device the service is called for."""
+    entry_id = call.data[ATTR_CONFIG_ENTRY_ID]
+    if (coordinator := hass.data.get(DOMAIN, {}).get(entry_id)) is None:
+        raise ServiceValidationError(
+            f"Device {entry_id} is not loaded",
+            translation_domain=DOMAIN,
+            translation_key="not_loaded",
+            translation_placeholders={"entry_id": entry_id},
+        )
+    return coordinator
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the services of the integration."""
+
+    async def capture(call: ServiceCall) -> None:
+        """Start or stop capturing the responses of a device."""
+        coordinator = _async_get_coordinator(hass, call)
+        await coordinator.async_set_capture(call.data[ATTR_ENABLED])
+
+    async def refresh(call: ServiceCall) -> None:
+        """Poll a device now and optionally keep polling it fast for a while."""
+        coordinator = _async_get_coordinator(hass, call)
+        if ATTR_BOOST in call.data:
+            coordinator.async_boost(call.data[ATTR_BOOST])
+        await coordinator.async_refresh_now()
+
+    hass.services.async_register(DOMAIN, SERVICE_CAPTURE, capture, CAPTURE_SCHEMA)
+    hass.services.async_register(DOMAIN, SERVICE_REFRESH, refresh, REFRESH_SCHEMA)
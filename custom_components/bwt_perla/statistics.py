@@ -0,0 +1,177 @@
+"""Hourly long-term statistics imported in batches instead of per state."""
+
+from array import array
+from datetime import datetime
+import math
+
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import async_add_external_statistics
+from homeassistant.const import UnitOfVolume, UnitOfVolumeFlowRate
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+
+from .const import DOMAIN
+
+# Fields of a completed hour: start timestamp, total liters of the device and
+# the running sum at the end, the time weighted mean, min and max of the flow
+# in l/h
+_ROW = 6
+# Rows kept while the recorder is not available
+_MAX_ROWS = 7 * 24
+
+
+class HourlyStatistics:
+    """Aggregates the polls into hourly buckets until they are imported.
+
+    The sum of the consumption continues over a reset of the device total,
+    which is detected like in the output counters if the total decreases.
+    """
+
+    def __init__(self) -> None:
+        """Initialize without any data."""
+        self._rows = array("d")
+        self._offset = 0.0
+        self._last_total: float | None = None
+        self._hour: float | None = None
+        self._total = 0.0
+        self._seconds = 0.0
+        self._flow_seconds = 0.0
+        self._flow_min = math.inf
+        self._flow_max = -math.inf
+
+    def add(self, now: datetime, seconds: float, total: int, flow: float) -> bool:
+        """Add a poll observed for the given seconds.
+
+        Returns True if this completed an hour that can be imported.
+        """
+        # Statistics are aligned to full hours in UTC
+        start = dt_util.as_utc(now).replace(minute=0, second=0, microsecond=0)
+        hour = start.timestamp()
+        completed = False
+        if self._hour != hour:
+            completed = self._complete()
+            self._hour = hour
+            self._seconds = self._flow_seconds = 0.0
+            self._flow_min = math.inf
+            self._flow_max = -math.inf
+        if self._last_total is not None and total < self._last_total:
+            self._offset += self._last_total
+        self._last_total = total
+        self._total = total
+        self._seconds += seconds
+        self._flow_seconds += flow * seconds
+        self._flow_min = min(self._flow_min, flow)
+        self._flow_max = max(self._flow_max, flow)
+        return completed
+
+    def _complete(self) -> bool:
+        if self._hour is None or self._flow_min > self._flow_max:
+            return False
+        mean = self._flow_seconds / self._seconds if self._seconds else self._flow_min
+        self._rows.extend(
+            (
+                self._hour,
+                self._total,
+                self._offset + self._total,
+                mean,
+                self._flow_min,
+                self._flow_max,
+            )
+        )
+        if len(self._rows) > _MAX_ROWS * _ROW:
+            del self._rows[:_ROW]
+        return True
+
+    def pop_rows(self) -> list[tuple[float, ...]]:
+        """Return and forget the completed hours."""
+        rows = [
+            tuple(self._rows[i : i + _ROW]) for i in range(0, len(self._rows), _ROW)
+        ]
+        del self._rows[:]
+        return rows
+
+    def as_dict(self) -> dict:
+        """Return the completed and the current hour in a form that can be stored."""
+        current = None
+        if self._flow_min <= self._flow_max:
+            current = [
+                self._total,
+                self._seconds,
+                self._flow_seconds,
+                self._flow_min,
+                self._flow_max,
+            ]
+        return {
+            "rows": self._rows.tolist(),
+            "offset": self._offset,
+            "last_total": self._last_total,
+            "hour": self._hour,
+            "current": current,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict | None) -> "HourlyStatistics":
+        """Restore the statistics stored with as_dict."""
+        statistics = cls()
+        if data:
+            statistics._rows = array("d", data["rows"])
+            statistics._offset = data["offset"]
+            statistics._last_total = data["last_total"]
+            statistics._hour = data["hour"]
+        if data and data["current"]:
+            (
+                statistics._total,
+                statistics._seconds,
+                statistics._flow_seconds,
+                statistics._flow_min,
+                statistics._flow_max,
+            ) = data["current"]
+        return statistics
+
+
+def statistic_id(entry_id: str, name: str) -> str:
+    """Return the id of an external statistic of the entry."""
+    return f"{DOMAIN}:{entry_id.lower()}_{name}"
+
+
+@callback
+def async_import_statistics(
+    hass: HomeAssistant, entry_id: str, title: str, rows: list[tuple[float, ...]]
+) -> None:
+    """Import the completed hours as external statistics in one batch each."""
+    starts = [dt_util.utc_from_timestamp(row[0]) for row in rows]
+    async_add_external_statistics(
+        hass,
+        StatisticMetaData(
+            has_mean=False,
+            has_sum=True,
+            name=f"{title} water consumption",
+            source=DOMAIN,
+            statistic_id=statistic_id(entry_id, "water"),
+            unit_of_measurement=UnitOfVolume.LITERS,
+        ),
+        [
+            StatisticData(start=start, state=row[1], sum=row[2])
+            for start, row in zip(starts, rows)
+        ],
+    )
+    async_add_external_statistics(
+        hass,
+        StatisticMetaData(
+            has_mean=True,
+            has_sum=False,
+            name=f"{title} flow",
+            source=DOMAIN,
+            statistic_id=statistic_id(entry_id, "flow"),
+            unit_of_measurement=UnitOfVolumeFlowRate.CUBIC_METERS_PER_HOUR,
+        ),
+        [
+            StatisticData(
+                start=start,
+                mean=row[3] / 1000,
+                min=row[4] / 1000,
+                max=row[5] / 1000,
+            )
+            for start, row in zip(starts, rows)
+        ],
+    )
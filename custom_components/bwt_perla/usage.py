@@ -0,0 +1,91 @@
+"""Learn when water is usually drawn to poll more often ahead of it."""
+
+from datetime import datetime, timedelta
+
+_BUCKETS = 7 * 24
+# Only trust a bucket once it was observed for at least one hour in total
+_MIN_OBSERVED = 3600
+# Halve a bucket once it was observed for four hours, so old habits fade out
+_MAX_OBSERVED = 4 * 3600
+# Longer gaps between polls (e.g. while offline) only count up to this
+_MAX_SAMPLE = 300
+# Look this far into the future to tighten the interval before a busy window
+_LOOKAHEAD = timedelta(minutes=15)
+# Fraction of the time with flow below which a bucket is considered quiet
+_QUIET = 0.002
+# Fraction of the time with flow above which the interval is tightened
+_ACTIVE = 0.01
+# Fraction of the time with flow at which the shortest interval is reached
+_BUSY = 0.05
+# Factors applied to the idle interval
+_FACTOR_QUIET = 2.0
+_FACTOR_BUSY = 1 / 3
+
+
+class UsageHistogram:
+    """Per weekday and hour histogram of how much of the time water flows.
+
+    Each poll is weighted with the seconds since the previous poll. This keeps
+    the fast polling during a flow from skewing the probability.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty histogram."""
+        self._observed = [0] * _BUCKETS
+        self._flowing = [0] * _BUCKETS
+
+    @staticmethod
+    def _bucket(now: datetime) -> int:
+        return now.weekday() * 24 + now.hour
+
+    def record(self, now: datetime, seconds: float, flowing: bool) -> None:
+        """Record that the flow state was observed for the given seconds."""
+        bucket = self._bucket(now)
+        seconds = round(min(seconds, _MAX_SAMPLE))
+        self._observed[bucket] += seconds
+        if flowing:
+            self._flowing[bucket] += seconds
+        if self._observed[bucket] > _MAX_OBSERVED:
+            self._observed[bucket] //= 2
+            self._flowing[bucket] //= 2
+
+    def probability(self, now: datetime) -> float | None:
+        """Fraction of the time with flow in the bucket, None if unknown."""
+        bucket = self._bucket(now)
+        if self._observed[bucket] < _MIN_OBSERVED:
+            return None
+        return self._flowing[bucket] / self._observed[bucket]
+
+    def interval_factor(self, now: datetime) -> float:
+        """Factor to apply to the idle interval based on the learned usage."""
+        probabilities = [
+            p
+            for p in (self.probability(now), self.probability(now + _LOOKAHEAD))
+            if p is not None
+        ]
+        if not probabilities:
+            return 1.0
+        probability = max(probabilities)
+        if probability < _QUIET:
+            return _FACTOR_QUIET
+        if probability < _ACTIVE:
+            return 1.0
+        busy = min(1.0, (probability - _ACTIVE) / (_BUSY - _ACTIVE))
+        return 1.0 - busy * (1.0 - _FACTOR_BUSY)
+
+    def as_dict(self) -> dict[str, list[int]]:
+        """Return the histogram in a form that can be stored."""
+        return {"observed": self._observed, "flowing": self._flowing}
+
+    @classmethod
+    def from_dict(cls, data: dict[str, list[int]] | None) -> "UsageHistogram":
+        """Restore a histogram stored with as_dict."""
+        histogram = cls()
+        if (
+            data
+            and len(data.get("observed", ())) == _BUCKETS
+            and len(data.get("flowing", ())) == _BUCKETS
+        ):
+            histogram._observed = list(data["observed"])
+            histogram._flowing = list(data["flowing"])
+        return histogram
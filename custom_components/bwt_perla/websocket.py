@@ -0,0 +1,47 @@
+"""Websocket commands of the BWT Perla integration."""
+
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv
+
+from .const import DOMAIN
+
+
+@callback
+def async_setup_websocket(hass: HomeAssistant) -> None:
+    """Register the websocket commands of the integration."""
+    websocket_api.async_register_command(hass, websocket_regenerations)
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): f"{DOMAIN}/regenerations",
+        vol.Required("entry_id"): str,
+        vol.Optional("start_time"): cv.datetime,
+    }
+)
+@callback
+def websocket_regenerations(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict[str, Any]
+) -> None:
+    """Return the logged regenerations of a device, oldest first."""
+    if (coordinator := hass.data.get(DOMAIN, {}).get(msg["entry_id"])) is None:
+        connection.send_error(
+            msg["id"], websocket_api.ERR_NOT_FOUND, "Device is not loaded"
+        )
+        return
+    connection.send_result(
+        msg["id"],
+        {
+            "regenerations": [
+                regeneration.as_event()
+                for regeneration in coordinator.regenerations.since(
+                    msg.get("start_time")
+                )
+            ]
+        },
+    )
@@ -0,0 +1,308 @@
+"""Benchmark of the coordinator updates and the entities they update.
+
+Sets up 1 to N devices in a minimal Home Assistant instance, like
+scripts/replay.py, and polls them with synthetic responses: a flow every few
+minutes and no flow in between. The devices are polled at the intervals their
+coordinators choose, on a virtual clock. For each number of devices it reports
+the time and the allocated memory per update, the time spent per entity and
+the state changes per second of virtual time:
+
+    python scripts/benchmark.py --devices 1 4 8 --updates 1000
+
+Results can be saved as baseline and later runs compared against it, failing
+if a value got worse by more than the tolerance. Timings depend on the machine,
+so compare against a baseline taken on the same one:
+
+    python scripts/benchmark.py --save baseline.json
+    python scripts/benchmark.py --baseline baseline.json --tolerance 0.2
+"""
+
+import argparse
+import asyncio
+from collections import defaultdict
+from collections.abc import Callable
+import dataclasses
+from datetime import UTC, datetime
+import gc
+import heapq
+import json
+import logging
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any
+from unittest.mock import patch
+
+from bwt_api.data import BwtStatus, CurrentResponse, Hardness
+from bwt_api.error import BwtError
+
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import Event, HomeAssistant
+
+# The replay adds the integration to the path
+from replay import ReplayClock, async_start_home_assistant, replay_entry  # isort: skip
+from custom_components.bwt_perla.const import DOMAIN  # isort: skip
+from custom_components.bwt_perla.coordinator import BwtCoordinator  # isort: skip
+
+_LOGGER = logging.getLogger(__name__)
+
+# Seconds of one cycle of the synthetic usage and how long water flows in it
+_CYCLE = 600
+_FLOW_SECONDS = 90
+_FLOW = 720
+# Values compared against the baseline, all of them are better if lower
+_GATED = ("update_ms", "allocated_kib", "state_changes_per_second")
+
+_START = datetime(2024, 1, 1, 6, tzinfo=UTC)
+_BASE = CurrentResponse(
+    errors=[BwtError.REGENERATIV_20],
+    blended_total=100_000,
+    capacity_1=50_000_000,
+    capacity_2=40_000_000,
+    current_flow=0,
+    dosing_total=0,
+    firmware_version="2.0210",
+    in_hardness=Hardness(300, 20, 36, 3),
+    out_hardness=Hardness(90, 5, 9, 1),
+    holiday_mode=0,
+    regeneration_last_1=_START,
+    regeneration_last_2=_START,
+    service_customer=_START,
+    service_technician=_START,
+    out_of_service=0,
+    regeneration_count_1=100,
+    regeneration_count_2=100,
+    regeneration_count=200,
+    regenerativ_level=80,
+    regenerativ_days=100,
+    regenerativ_total=50_000,
+    state=BwtStatus.WARNING,
+    treated_day=0,
+    treated_month=0,
+    treated_year=0,
+)
+
+
+class SyntheticApi:
+    """Api answering with a flow in the first part of every cycle."""
+
+    def __init__(self, clock: ReplayClock, offset: float) -> None:
+        """Initialize the api, the offset shifts the cycle of the device."""
+        self._clock = clock
+        self._offset = offset
+        self._total = float(_BASE.blended_total)
+        self._last = clock.monotonic()
+
+    async def get_current_data(self) -> CurrentResponse:
+        """Return the response at the current time of the clock."""
+        now = self._clock.monotonic()
+        flow = _FLOW if (now + self._offset) % _CYCLE < _FLOW_SECONDS else 0
+        self._total += flow * (now - self._last) / 3600
+        self._last = now
+        treated = int(self._total) - _BASE.blended_total
+        return dataclasses.replace(
+            _BASE,
+            blended_total=int(self._total),
+            current_flow=flow,
+            capacity_1=_BASE.capacity_1 - treated * 15_000,
+            treated_day=treated,
+            treated_month=treated,
+            treated_year=treated,
+        )
+
+    async def close(self) -> None:
+        """Nothing to close."""
+
+
+class _ListenerTimer:
+    """Measure the time the listeners of the coordinators take per entity.
+
+    The entities of all devices are summed up by the key of their description,
+    other listeners by their class.
+    """
+
+    def __init__(self) -> None:
+        self.seconds: dict[str, float] = defaultdict(float)
+        self.calls: dict[str, int] = defaultdict(int)
+        self.enabled = True
+
+    def wrap(self, original: Callable) -> Callable:
+        """Wrap BwtCoordinator.async_add_listener to time the listeners."""
+        timer = self
+
+        def async_add_listener(
+            coordinator: BwtCoordinator, update_callback: Callable, context: Any = None
+        ) -> Callable[[], None]:
+            listener = getattr(update_callback, "__self__", update_callback)
+            if (description := getattr(listener, "entity_description", None)) is None:
+                name = type(listener).__name__
+            else:
+                name = description.key
+            # Also report the entities that are never updated
+            timer.seconds.setdefault(name, 0.0)
+
+            def timed() -> None:
+                if not timer.enabled:
+                    update_callback()
+                    return
+                start = time.perf_counter()
+                update_callback()
+                timer.seconds[name] += time.perf_counter() - start
+                timer.calls[name] += 1
+
+            return original(coordinator, timed, context)
+
+        return async_add_listener
+
+
+async def async_benchmark(
+    hass: HomeAssistant, devices: int, updates: int
+) -> dict[str, Any]:
+    """Poll the devices and return the costs per update.
+
+    Every device is polled the given number of times, once measuring the
+    time and once more measuring the allocated memory.
+    """
+    clock = ReplayClock(_START)
+    apis = [SyntheticApi(clock, index * _CYCLE / devices) for index in range(devices)]
+    entries = [replay_entry(f"10.0.0.{index + 1}") for index in range(devices)]
+    listeners = _ListenerTimer()
+    state_changes = 0
+
+    def count_state_change(_event: Event) -> None:
+        nonlocal state_changes
+        state_changes += 1
+
+    with patch(
+        "custom_components.bwt_perla.SharedSessionBwtApi", side_effect=apis
+    ), patch.object(
+        BwtCoordinator,
+        "async_add_listener",
+        listeners.wrap(BwtCoordinator.async_add_listener),
+    ), clock.patch():
+        for entry in entries:
+            await hass.config_entries.async_add(entry)
+        await hass.async_block_till_done()
+        coordinators: list[BwtCoordinator] = [
+            hass.data[DOMAIN][entry.entry_id] for entry in entries
+        ]
+        due = [(clock.utcnow(), index) for index in range(devices)]
+
+        async def poll() -> None:
+            now, index = heapq.heappop(due)
+            clock.advance(now)
+            coordinator = coordinators[index]
+            await coordinator.async_refresh()
+            heapq.heappush(due, (now + coordinator.update_interval, index))
+
+        # Measure the time
+        listeners.enabled = True
+        unsub = hass.bus.async_listen(EVENT_STATE_CHANGED, count_state_change)
+        started = clock.utcnow()
+        durations = []
+        for _ in range(updates * devices):
+            start = time.perf_counter()
+            await poll()
+            durations.append(time.perf_counter() - start)
+        seconds = (clock.utcnow() - started).total_seconds()
+        unsub()
+
+        # Measure the memory allocated while updating, without the timers
+        listeners.enabled = False
+        gc.collect()
+        tracemalloc.start()
+        allocated = []
+        for _ in range(updates * devices):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            await poll()
+            allocated.append(tracemalloc.get_traced_memory()[1] - before)
+        tracemalloc.stop()
+
+        for entry in entries:
+            await hass.config_entries.async_remove(entry.entry_id)
+
+    polls = updates * devices
+    return {
+        "devices": devices,
+        "updates": polls,
+        "virtual_seconds": seconds,
+        "update_ms": statistics.fmean(durations) * 1000,
+        "update_ms_p95": statistics.quantiles(durations, n=20)[-1] * 1000,
+        "allocated_kib": statistics.fmean(allocated) / 1024,
+        "state_changes_per_second": state_changes / seconds if seconds else 0.0,
+        "entities": {
+            name: {
+                "calls_per_update": listeners.calls[name] / polls,
+                "us_per_update": listeners.seconds[name] / polls * 1e6,
+            }
+            for name in sorted(listeners.seconds)
+        },
+    }
+
+
+def compare(
+    results: list[dict[str, Any]], baseline: list[dict[str, Any]], tolerance: float
+) -> list[str]:
+    """Return the values that got worse than the baseline by the tolerance."""
+    previous = {result["devices"]: result for result in baseline}
+    regressions = []
+    for result in results:
+        if (base := previous.get(result["devices"])) is None:
+            continue
+        for name in _GATED:
+            if result[name] > base[name] * (1 + tolerance) and result[name] > 0:
+                regressions.append(
+                    f"{result['devices']} devices: {name} {result[name]:.3f}"
+                    f" > {base[name]:.3f}"
+                )
+    return regressions
+
+
+async def _run(args: argparse.Namespace) -> list[dict[str, Any]]:
+    results = []
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = await async_start_home_assistant(config_dir, "UTC")
+        for devices in args.devices:
+            result = await async_benchmark(hass, devices, args.updates)
+            _LOGGER.info(
+                "%s devices: %.3f ms and %.1f KiB per update, %.2f state changes/s",
+                devices,
+                result["update_ms"],
+                result["allocated_kib"],
+                result["state_changes_per_second"],
+            )
+            results.append(result)
+        await hass.async_stop()
+    return results
+
+
+def main() -> None:
+    """Run the benchmark from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--devices", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--updates", type=int, default=500, help="per device")
+    parser.add_argument("--save", help="write the results as baseline to this file")
+    parser.add_argument("--baseline", help="compare the results with this baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    logging.basicConfig(level=logging.INFO)
+    logging.getLogger("homeassistant").setLevel(logging.WARNING)
+    args = parser.parse_args()
+    results = asyncio.run(_run(args))
+    print(json.dumps(results, indent=2))
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as file:
+            json.dump(results, file, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for regression in regressions:
+            _LOGGER.error("Regression: %s", regression)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
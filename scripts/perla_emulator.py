@@ -0,0 +1,315 @@
+"""Emulator of the local API of a BWT Perla.
+
+Serves the same endpoints as the device, so the integration and bwt_api can be
+run without hardware. bwt_api always connects to port 8080, so run several
+emulated devices on different loopback addresses:
+
+    python scripts/perla_emulator.py --host 127.0.0.2 --code 1234 --profile shower
+
+The emulator can also be started from python, e.g. for tests or benchmarks:
+
+    emulator = PerlaEmulator(EmulatorConfig(code="1234"))
+    await emulator.start("127.0.0.2")
+    ...
+    await emulator.stop()
+"""
+
+import argparse
+import asyncio
+import base64
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+import logging
+import random
+import time
+
+from aiohttp import web
+
+_LOGGER = logging.getLogger(__name__)
+
+PORT = 8080
+
+# Flow profiles as (seconds, liters per hour) segments, repeated endlessly
+PROFILES: dict[str, list[tuple[float, int]]] = {
+    "idle": [(60, 0)],
+    "tap": [(50, 0), (5, 420), (120, 0), (15, 600)],
+    "shower": [(60, 0), (300, 720), (30, 0), (20, 420), (180, 0)],
+    "household": [
+        (600, 0),
+        (8, 400),
+        (120, 0),
+        (45, 900),
+        (900, 0),
+        (300, 720),
+        (1200, 0),
+    ],
+    "leak": [(60, 12)],
+}
+
+_TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def parse_profile(value: str) -> list[tuple[float, int]]:
+    """Parse a profile name or a list like "30:0,10:500" of seconds:flow."""
+    if value in PROFILES:
+        return PROFILES[value]
+    segments = []
+    for segment in value.split(","):
+        seconds, flow = segment.split(":")
+        segments.append((float(seconds), int(flow)))
+    return segments
+
+
+@dataclass
+class EmulatorConfig:
+    """Behaviour of the emulated device."""
+
+    code: str = "12345"
+    profile: list[tuple[float, int]] = field(default_factory=lambda: PROFILES["idle"])
+    # Seconds of emulated time that pass per real second
+    speed: float = 1.0
+    # Version reported by the device, the local API needs 2.02xx
+    firmware: str = "2.0210"
+    # Response latency in seconds, uniformly distributed
+    latency: tuple[float, float] = (0.02, 0.08)
+    # Probability that a request never gets an answer
+    timeout_rate: float = 0.0
+    # Probability that a request with the right code is answered as a wrong one
+    wrong_code_rate: float = 0.0
+    errors: list[int] = field(default_factory=list)
+    hardness_in: int = 20
+    hardness_out: int = 6
+    holiday_mode: int = 0
+
+
+class PerlaDevice:
+    """State of the emulated device, advanced by the flow profile."""
+
+    def __init__(self, config: EmulatorConfig) -> None:
+        """Initialize the device with realistic counters."""
+        self.config = config
+        self._start = time.monotonic()
+        self._elapsed = 0.0
+        self._period = sum(seconds for seconds, _ in config.profile)
+        self.blended_total = 154_321.0
+        self.treated_day = 120.0
+        self.treated_month = 3_500.0
+        self.treated_year = 41_000.0
+        self.column_capacity = 75_000_000
+        self.capacity = [self.column_capacity, self.column_capacity // 2]
+        self.regeneration_count = [412, 409]
+        now = datetime.now(UTC)
+        self.regeneration_last = [now, now]
+        self.active_column = 0
+        self.regenerativ_total = 215_000
+        self.regenerativ_level = 74
+        self.dosing_total = 0
+
+    def flow(self, elapsed: float) -> int:
+        """Flow in liters per hour at the given emulated second."""
+        offset = elapsed % self._period if self._period else 0
+        for seconds, flow in self.config.profile:
+            if offset < seconds:
+                return flow
+            offset -= seconds
+        return 0
+
+    def advance(self) -> int:
+        """Advance the counters to the current time and return the current flow."""
+        elapsed = (time.monotonic() - self._start) * self.config.speed
+        hardness_in = self.config.hardness_in
+        hardness_out = self.config.hardness_out
+        # Integrate the flow second by second to reflect the profile exactly
+        while self._elapsed < elapsed:
+            step = min(1.0, elapsed - self._elapsed)
+            blended = self.flow(self._elapsed) * step / 3600
+            treated = blended * (1 - hardness_out / hardness_in)
+            self.blended_total += blended
+            self.treated_day += treated
+            self.treated_month += treated
+            self.treated_year += treated
+            self._consume(int(treated * 1000 * hardness_in))
+            self._elapsed += step
+        return self.flow(elapsed)
+
+    def _consume(self, capacity: int) -> None:
+        column = self.active_column
+        self.capacity[column] -= capacity
+        if self.capacity[column] > 0:
+            return
+        # Regenerate the exhausted column and continue with the other one
+        self.capacity[column] = self.column_capacity
+        self.regeneration_count[column] += 1
+        self.regeneration_last[column] = datetime.now(UTC)
+        self.regenerativ_total += 180
+        self.regenerativ_level = max(0, self.regenerativ_level - 1)
+        self.active_column = 1 - column
+
+    def current_data(self) -> dict:
+        """Return the payload of GetCurrentData."""
+        flow = self.advance()
+        config = self.config
+        in_mmol = round(config.hardness_in / 5.6, 2)
+        out_mmol = round(config.hardness_out / 5.6, 2)
+        show_error = 0
+        if config.errors:
+            show_error = 1 if all(e in _WARNING_IDS for e in config.errors) else 2
+        return {
+            "ActiveErrorIDs": ",".join(str(error) for error in config.errors),
+            "BlendedWaterSinceSetup_l": int(self.blended_total),
+            "CapacityColumn1_ml_dH": self.capacity[0],
+            "CapacityColumn2_ml_dH": self.capacity[1],
+            "CurrentFlowrate_l_h": flow,
+            "DosingSinceSetup_ml": self.dosing_total,
+            "FirmwareVersion": config.firmware,
+            "HardnessIN_CaCO3": round(in_mmol * 100),
+            "HardnessIN_dH": config.hardness_in,
+            "HardnessIN_fH": round(in_mmol * 10),
+            "HardnessIN_mmol_l": in_mmol,
+            "HardnessOUT_CaCO3": round(out_mmol * 100),
+            "HardnessOUT_dH": config.hardness_out,
+            "HardnessOUT_fH": round(out_mmol * 10),
+            "HardnessOUT_mmol_l": out_mmol,
+            "HolidayModeStartTime": config.holiday_mode,
+            "LastRegenerationColumn1": self.regeneration_last[0].strftime(_TIME_FORMAT),
+            "LastRegenerationColumn2": self.regeneration_last[1].strftime(_TIME_FORMAT),
+            "LastServiceCustomer": "2024-03-02 09:12:44",
+            "LastServiceTechnican": "2023-11-20 14:03:10",
+            "OutOfService": 0,
+            "RegenerationCounterColumn1": self.regeneration_count[0],
+            "RegenerationCounterColumn2": self.regeneration_count[1],
+            "RegenerationCountSinceSetup": sum(self.regeneration_count),
+            "RegenerativLevel": self.regenerativ_level,
+            "RegenerativRemainingDays": self.regenerativ_level * 2,
+            "RegenerativSinceSetup_g": self.regenerativ_total,
+            "ShowError": show_error,
+            "WaterTreatedCurrentDay_l": int(self.treated_day),
+            "WaterTreatedCurrentMonth_l": int(self.treated_month),
+            "WaterTreatedCurrentYear_l": int(self.treated_year),
+        }
+
+    def daily_data(self) -> dict:
+        """Return the payload of GetDailyData."""
+        return {
+            f"{m // 60:02}{m % 60:02}_{m // 60:02}{m % 60 + 29:02}_l": 0
+            for m in range(0, 1440, 30)
+        }
+
+
+# Error ids bwt_api treats as warnings
+_WARNING_IDS = frozenset(
+    {5, 15, 16, 25, 32, 33, 34, 35, 36, 54, 55, 61, 62, 63, 64, 66, 67, 74, 75, 88}
+)
+
+
+class PerlaEmulator:
+    """Web server answering like the local API of the device."""
+
+    def __init__(self, config: EmulatorConfig) -> None:
+        """Initialize the emulator."""
+        self.config = config
+        self.device = PerlaDevice(config)
+        self.requests = 0
+        auth = base64.b64encode(f"user:{config.code}".encode("ascii")).decode()
+        self._authorization = f"Basic {auth}"
+        self._runner: web.AppRunner | None = None
+        app = web.Application()
+        app.router.add_get("/api/GetCurrentData", self._current_data)
+        app.router.add_get("/api/GetDailyData", self._daily_data)
+        app.router.add_get("/api/GetMonthlyData", self._monthly_data)
+        app.router.add_get("/api/GetYearlyData", self._yearly_data)
+        self._app = app
+
+    async def start(self, host: str = "127.0.0.1", port: int = PORT) -> None:
+        """Start serving on the given address."""
+        self._runner = web.AppRunner(self._app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+        _LOGGER.info("Emulating BWT Perla on %s:%s", host, port)
+
+    async def stop(self) -> None:
+        """Stop serving."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _respond(self, request: web.Request, payload) -> web.Response:
+        """Answer like the device, including its latency and failures."""
+        self.requests += 1
+        config = self.config
+        await asyncio.sleep(random.uniform(*config.latency))
+        if random.random() < config.timeout_rate:
+            # Keep the connection open without an answer like an unreachable device
+            await asyncio.sleep(3600)
+        if (
+            request.headers.get("Authorization") != self._authorization
+            or random.random() < config.wrong_code_rate
+        ):
+            # The device answers a wrong code with an empty 404
+            return web.Response(status=404, text="")
+        return web.json_response(payload(), content_type="text/html")
+
+    async def _current_data(self, request: web.Request) -> web.Response:
+        return await self._respond(request, self.device.current_data)
+
+    async def _daily_data(self, request: web.Request) -> web.Response:
+        return await self._respond(request, self.device.daily_data)
+
+    async def _monthly_data(self, request: web.Request) -> web.Response:
+        return await self._respond(
+            request, lambda: {f"Day{day:02}_l": 0 for day in range(1, 32)}
+        )
+
+    async def _yearly_data(self, request: web.Request) -> web.Response:
+        return await self._respond(
+            request, lambda: {f"Month{month:02}_l": 0 for month in range(1, 13)}
+        )
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    config = EmulatorConfig(
+        code=args.code,
+        profile=parse_profile(args.profile),
+        speed=args.speed,
+        firmware=args.firmware,
+        latency=(args.latency_min, args.latency_max),
+        timeout_rate=args.timeout_rate,
+        wrong_code_rate=args.wrong_code_rate,
+        errors=[int(error) for error in args.errors.split(",") if error],
+        holiday_mode=args.holiday_mode,
+    )
+    emulator = PerlaEmulator(config)
+    await emulator.start(args.host)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await emulator.stop()
+
+
+def main() -> None:
+    """Run the emulator from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--code", default="12345")
+    parser.add_argument(
+        "--profile",
+        default="household",
+        help=f"one of {', '.join(PROFILES)} or segments like 30:0,10:500",
+    )
+    parser.add_argument("--speed", type=float, default=1.0)
+    parser.add_argument("--firmware", default="2.0210")
+    parser.add_argument("--latency-min", type=float, default=0.02)
+    parser.add_argument("--latency-max", type=float, default=0.08)
+    parser.add_argument("--timeout-rate", type=float, default=0.0)
+    parser.add_argument("--wrong-code-rate", type=float, default=0.0)
+    parser.add_argument("--errors", default="", help="active error ids, e.g. 5,33")
+    parser.add_argument("--holiday-mode", type=int, default=0)
+    logging.basicConfig(level=logging.INFO)
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
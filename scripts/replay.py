@@ -0,0 +1,252 @@
+"""Replay captured responses of a BWT Perla through the integration.
+
+The bwt_perla.capture service writes the responses of a device to the
+bwt_perla_capture folder of the configuration. The replay sets the integration
+up in a minimal Home Assistant instance, with an api answering the polls with
+the captured responses and a virtual clock following the times of the capture:
+
+    python scripts/replay.py config/bwt_perla_capture/<entry_id>.*.jsonl.gz
+
+The states of the entities after the replay and how often each was written are
+printed as json, so the output of a capture can be compared between versions.
+For offline profiling run it with `python -m cProfile`.
+"""
+
+import argparse
+import asyncio
+from collections.abc import Callable, Iterator
+from contextlib import ExitStack, contextmanager
+from datetime import datetime, timedelta
+import heapq
+import itertools
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import patch
+
+from bwt_api.data import CurrentResponse
+
+from homeassistant import bootstrap, loader
+from homeassistant.config_entries import ConfigEntries, ConfigEntry
+from homeassistant.const import CONF_CODE, CONF_HOST, EVENT_STATE_CHANGED
+from homeassistant.core import Event, HomeAssistant
+from homeassistant.util import dt as dt_util
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# pylint: disable-next=wrong-import-position
+from custom_components.bwt_perla import (  # noqa: E402
+    capture,
+    coordinator as coordinator_module,
+    export,
+    sensor as sensor_module,
+)
+from custom_components.bwt_perla.const import DOMAIN  # noqa: E402
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class ReplayClock:
+    """Virtual time of the integration, moved forward by the replay.
+
+    Replaces the clocks and the timers the integration uses, so a replay gives
+    the same result at any speed.
+    """
+
+    def __init__(self, start: datetime) -> None:
+        """Start the clock at the given time."""
+        self._start = start
+        self._now = start
+        self._timers: list[tuple[datetime, int, Callable[[datetime], Any]]] = []
+        self._cancelled: set[int] = set()
+        self._ids = itertools.count()
+
+    def utcnow(self) -> datetime:
+        """Return the current time in UTC."""
+        return self._now
+
+    def now(self) -> datetime:
+        """Return the current local time."""
+        return dt_util.as_local(self._now)
+
+    def monotonic(self) -> float:
+        """Return the seconds since the start."""
+        return (self._now - self._start).total_seconds()
+
+    def call_later(
+        self, _hass: HomeAssistant, delay: float | timedelta, action: Callable
+    ) -> Callable[[], None]:
+        """Run the action after the delay, replaces async_call_later."""
+        if isinstance(delay, timedelta):
+            delay = delay.total_seconds()
+        timer = next(self._ids)
+        heapq.heappush(
+            self._timers, (self._now + timedelta(seconds=delay), timer, action)
+        )
+        return lambda: self._cancelled.add(timer)
+
+    def advance(self, to: datetime) -> None:
+        """Move the clock forward and run the timers that are due."""
+        while self._timers and self._timers[0][0] <= to:
+            due, timer, action = heapq.heappop(self._timers)
+            if timer not in self._cancelled:
+                self._now = max(self._now, due)
+                action(self._now)
+        self._now = max(self._now, to)
+
+    @contextmanager
+    def patch(self) -> Iterator[None]:
+        """Use the clock for the integration while in the context."""
+        clock_module = SimpleNamespace(monotonic=self.monotonic)
+        dt_module = SimpleNamespace(now=self.now, utcnow=self.utcnow)
+        with ExitStack() as stack:
+            stack.enter_context(patch.object(coordinator_module, "time", clock_module))
+            stack.enter_context(patch.object(coordinator_module, "dt_util", dt_module))
+            stack.enter_context(patch.object(sensor_module, "time", clock_module))
+            for module in (coordinator_module, sensor_module, capture, export):
+                stack.enter_context(
+                    patch.object(module, "async_call_later", self.call_later)
+                )
+            yield
+
+
+class ReplayApi:
+    """Api answering the polls with the response set by the replay."""
+
+    def __init__(self, response: CurrentResponse) -> None:
+        """Initialize with the response of the first poll."""
+        self.response = response
+
+    async def get_current_data(self) -> CurrentResponse:
+        """Return the current response."""
+        return self.response
+
+    async def close(self) -> None:
+        """Nothing to close."""
+
+
+async def async_start_home_assistant(config_dir: str, time_zone: str) -> HomeAssistant:
+    """Start a minimal Home Assistant instance that finds the integration."""
+    custom_components = os.path.join(config_dir, "custom_components")
+    if not os.path.exists(custom_components):
+        os.symlink(os.path.join(ROOT, "custom_components"), custom_components)
+    hass = HomeAssistant(config_dir)
+    hass.config.skip_pip = True
+    hass.config.set_time_zone(time_zone)
+    loader.async_setup(hass)
+    hass.config_entries = ConfigEntries(hass, {})
+    await bootstrap.async_load_base_functionality(hass)
+    # Discovery and the websocket commands are not used, they need the http server
+    hass.config.components.update({"network", "websocket_api"})
+    await hass.async_start()
+    return hass
+
+
+def replay_entry(host: str, options: dict[str, Any] | None = None) -> ConfigEntry:
+    """Return an entry of a device that is polled by the caller."""
+    return ConfigEntry(
+        version=2,
+        minor_version=1,
+        domain=DOMAIN,
+        title=f"Replay {host}",
+        data={CONF_HOST: host, CONF_CODE: ""},
+        source="user",
+        options=options or {},
+        # Not polled by the timer of the coordinator
+        pref_disable_polling=True,
+    )
+
+
+async def async_replay(
+    hass: HomeAssistant,
+    responses: list[tuple[datetime, CurrentResponse]],
+    speed: float = 0,
+    options: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """Set a device up and poll it once per captured response.
+
+    The replay waits for the time between two responses divided by the
+    speed, without waiting if the speed is 0. Returns the final states and
+    the number of state writes per entity.
+    """
+    start, first = responses[0]
+    clock = ReplayClock(start)
+    api = ReplayApi(first)
+    writes: dict[str, int] = {}
+
+    def count_write(event: Event) -> None:
+        entity_id = event.data["entity_id"]
+        writes[entity_id] = writes.get(entity_id, 0) + 1
+
+    entry = replay_entry("replay", options)
+    with patch(
+        "custom_components.bwt_perla.SharedSessionBwtApi", return_value=api
+    ), clock.patch():
+        unsub = hass.bus.async_listen(EVENT_STATE_CHANGED, count_write)
+        await hass.config_entries.async_add(entry)
+        await hass.async_block_till_done()
+        coordinator = hass.data[DOMAIN][entry.entry_id]
+        started = time.monotonic()
+        for polled, response in responses[1:]:
+            if speed > 0:
+                elapsed = (polled - start).total_seconds() / speed
+                await asyncio.sleep(max(0, started + elapsed - time.monotonic()))
+            clock.advance(polled)
+            api.response = response
+            await coordinator.async_refresh()
+            await hass.async_block_till_done()
+        unsub()
+        states = {
+            state.entity_id: state.state
+            for state in hass.states.async_all()
+            if state.entity_id in writes
+        }
+        await hass.config_entries.async_remove(entry.entry_id)
+    return {
+        "responses": len(responses),
+        "duration": (responses[-1][0] - start).total_seconds(),
+        "states": dict(sorted(states.items())),
+        "writes": dict(sorted(writes.items())),
+    }
+
+
+async def _run(args: argparse.Namespace) -> None:
+    responses = list(capture.read_capture(args.files))
+    if not responses:
+        raise SystemExit("The capture is empty")
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = await async_start_home_assistant(config_dir, args.time_zone)
+        started = time.monotonic()
+        result = await async_replay(
+            hass, responses, args.speed, json.loads(args.options)
+        )
+        _LOGGER.info(
+            "Replayed %s responses in %.2f seconds",
+            len(responses),
+            time.monotonic() - started,
+        )
+        await hass.async_stop()
+    print(json.dumps(result, indent=2))
+
+
+def main() -> None:
+    """Replay a capture from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("files", nargs="+", help="files of the capture")
+    parser.add_argument(
+        "--speed", type=float, default=0, help="speedup, 0 to not wait at all"
+    )
+    parser.add_argument("--time-zone", default="UTC")
+    parser.add_argument("--options", default="{}", help="options of the entry as json")
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Tests for the BWT Perla integration."""
+
+from datetime import UTC, datetime
+
+from bwt_api.data import BwtStatus, CurrentResponse, Hardness
+from bwt_api.error import BwtError
+
+# Address and user code of the emulated device
+HOST = "127.0.0.1"
+CODE = "12345"
+
+_TIME = datetime(2024, 1, 1, tzinfo=UTC)
+
+
+def response(**changes) -> CurrentResponse:
+    """Return a response of an idle device with the given values changed."""
+    values = {
+        "errors": [BwtError.REGENERATIV_20],
+        "blended_total": 1000,
+        "capacity_1": 50_000_000,
+        "capacity_2": 40_000_000,
+        "current_flow": 0,
+        "dosing_total": 0,
+        "firmware_version": "2.0210",
+        "in_hardness": Hardness(300, 20, 36, 3),
+        "out_hardness": Hardness(90, 5, 9, 1),
+        "holiday_mode": 0,
+        "regeneration_last_1": _TIME,
+        "regeneration_last_2": _TIME,
+        "service_customer": _TIME,
+        "service_technician": _TIME,
+        "out_of_service": 0,
+        "regeneration_count_1": 10,
+        "regeneration_count_2": 11,
+        "regeneration_count": 21,
+        "regenerativ_level": 80,
+        "regenerativ_days": 100,
+        "regenerativ_total": 5000,
+        "state": BwtStatus.WARNING,
+        "treated_day": 100,
+        "treated_month": 1000,
+        "treated_year": 10000,
+    }
+    values.update(changes)
+    return CurrentResponse(**values)
@@ -0,0 +1,53 @@
+"""Fixtures for the BWT Perla tests."""
+
+from collections.abc import AsyncIterator
+import os
+import sys
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.const import CONF_CODE, CONF_HOST
+
+from custom_components.bwt_perla.const import DOMAIN
+
+from . import CODE, HOST
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "scripts"))
+
+# pylint: disable-next=wrong-import-position,wrong-import-order
+from perla_emulator import EmulatorConfig, PerlaEmulator  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def auto_enable_custom_integrations(enable_custom_integrations):
+    """Enable the integration in all tests."""
+    yield
+
+
+@pytest.fixture
+def emulator_config() -> EmulatorConfig:
+    """Return the behaviour of the emulated device, idle by default."""
+    return EmulatorConfig(code=CODE, latency=(0, 0))
+
+
+@pytest.fixture
+async def emulator(
+    socket_enabled, emulator_config: EmulatorConfig
+) -> AsyncIterator[PerlaEmulator]:
+    """Serve the local API of a device on the test host."""
+    emulator = PerlaEmulator(emulator_config)
+    await emulator.start(HOST)
+    yield emulator
+    await emulator.stop()
+
+
+@pytest.fixture
+def config_entry() -> MockConfigEntry:
+    """Return the entry of the emulated device."""
+    return MockConfigEntry(
+        domain=DOMAIN,
+        version=2,
+        title="BWT Perla",
+        data={CONF_HOST: HOST, CONF_CODE: CODE},
+    )
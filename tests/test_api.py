@@ -0,0 +1,61 @@
+"""Test the requests of the api and the mapping of its errors."""
+
+from bwt_api.data import BwtStatus
+from bwt_api.exception import ApiException, ConnectException, WrongCodeException
+import pytest
+from pytest_homeassistant_custom_component.test_util.aiohttp import AiohttpClientMocker
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.bwt_perla.api import PORT, SharedSessionBwtApi
+
+from . import CODE, HOST
+
+
+async def test_current_data(hass: HomeAssistant, emulator) -> None:
+    """Test the payload is parsed like bwt_api does."""
+    async with SharedSessionBwtApi(hass, HOST, CODE) as api:
+        data = await api.get_current_data()
+
+    assert data.firmware_version == "2.0210"
+    assert data.state == BwtStatus.OK
+    assert data.errors == []
+    assert data.in_hardness.dH == 20
+    assert data.regeneration_count == sum(emulator.device.regeneration_count)
+    assert data.service_technician.tzinfo is not None
+
+
+async def test_wrong_code(hass: HomeAssistant, emulator) -> None:
+    """Test a code the device rejects."""
+    api = SharedSessionBwtApi(hass, HOST, "wrong")
+    with pytest.raises(WrongCodeException):
+        await api.get_current_data()
+
+
+async def test_cannot_connect(hass: HomeAssistant, socket_enabled) -> None:
+    """Test a host without device."""
+    api = SharedSessionBwtApi(hass, HOST, CODE)
+    with pytest.raises(ConnectException):
+        await api.get_current_data()
+
+
+async def test_invalid_payload(
+    hass: HomeAssistant, aioclient_mock: AiohttpClientMocker
+) -> None:
+    """Test another service on the port fails like the device api."""
+    url = f"http://{HOST}:{PORT}/api/GetCurrentData"
+    api = SharedSessionBwtApi(hass, HOST, CODE)
+
+    aioclient_mock.get(url, text="<html></html>")
+    with pytest.raises(ApiException):
+        await api.get_current_data()
+
+    aioclient_mock.clear_requests()
+    aioclient_mock.get(url, json={"FirmwareVersion": "1.0"})
+    with pytest.raises(ApiException):
+        await api.get_current_data()
+
+    aioclient_mock.clear_requests()
+    aioclient_mock.get(url, status=500, text="error")
+    with pytest.raises(ApiException):
+        await api.get_current_data()
@@ -0,0 +1,72 @@
+"""Test the last values stay available for the grace period while polls fail."""
+
+from datetime import timedelta
+from unittest.mock import patch
+
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_fire_time_changed,
+)
+
+from homeassistant.const import STATE_UNAVAILABLE
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from custom_components.bwt_perla.availability import GracePeriods
+from custom_components.bwt_perla.const import CONF_GRACE_PERIOD, DOMAIN
+from custom_components.bwt_perla.coordinator import BwtCoordinator
+
+
+def test_grace_periods() -> None:
+    """Test only slow fields get the longer grace period."""
+    grace = GracePeriods.from_options({CONF_GRACE_PERIOD: 60})
+
+    assert grace.for_fields(frozenset({"service_customer"})) == grace.slow
+    assert grace.for_fields(frozenset({"regeneration_last_1"})) == grace.fast
+    assert grace.for_fields(frozenset({"in_hardness", "current_flow"})) == grace.fast
+    assert grace.for_fields(None) == grace.fast
+    assert grace.slow == timedelta(days=1)
+
+
+async def test_grace_expiry(
+    hass: HomeAssistant, emulator, config_entry: MockConfigEntry
+) -> None:
+    """Test the entities become unavailable once their grace period expired."""
+    config_entry.add_to_hass(hass)
+    hass.config_entries.async_update_entry(
+        config_entry, options={CONF_GRACE_PERIOD: 60}
+    )
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator: BwtCoordinator = hass.data[DOMAIN][config_entry.entry_id]
+    await emulator.stop()
+
+    # Consecutive failed polls within the grace period keep the values
+    with patch(
+        "custom_components.bwt_perla.coordinator.async_discover", return_value=[]
+    ):
+        for _ in range(2):
+            # The emulator runs on the real clock, age the snapshot instead
+            coordinator.data_time -= timedelta(seconds=20)
+            await coordinator.async_refresh()
+            await hass.async_block_till_done()
+    assert not coordinator.last_update_success
+    assert hass.states.get("sensor.bwt_perla_total_output").state != STATE_UNAVAILABLE
+    assert hass.states.get("sensor.bwt_perla_data_age").state == "40"
+
+    # No poll happens until the grace period expired
+    coordinator.data_time -= timedelta(seconds=21)
+    async_fire_time_changed(hass, dt_util.utcnow() + timedelta(seconds=21))
+    await hass.async_block_till_done()
+    for entity_id in (
+        "sensor.bwt_perla_total_output",
+        "sensor.bwt_perla_last_regeneration_1",
+        "binary_sensor.bwt_perla_leak",
+    ):
+        assert hass.states.get(entity_id).state == STATE_UNAVAILABLE, entity_id
+    assert (
+        hass.states.get("sensor.bwt_perla_last_salt_refill").state != STATE_UNAVAILABLE
+    )
+    assert hass.states.get("sensor.bwt_perla_data_age").state == "61"
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
@@ -0,0 +1,51 @@
+"""Test capturing responses and replaying them through the integration."""
+
+from datetime import timedelta
+import os
+
+import pytest
+
+from homeassistant.core import HomeAssistant
+from homeassistant.util import dt as dt_util
+
+from custom_components.bwt_perla.capture import ResponseCapture, read_capture
+
+from . import response
+
+# pylint: disable-next=wrong-import-order
+from replay import async_replay
+
+
+async def test_capture_replay(hass: HomeAssistant, tmp_path) -> None:
+    """Test a capture is read back in order and replayed into the states."""
+    hass.config.config_dir = str(tmp_path)
+    start = dt_util.utcnow().replace(microsecond=0)
+    capture = ResponseCapture(hass, "entry")
+    # Added out of order, the capture is sorted by time when read
+    capture.add(start + timedelta(minutes=1), response(treated_day=110))
+    capture.add(start, response())
+    capture.add(start + timedelta(minutes=2), response(treated_day=110))
+    capture.add(start + timedelta(minutes=3), response(holiday_mode=1))
+    await capture.async_close()
+
+    responses = list(
+        read_capture(path for path in capture.paths if os.path.exists(path))
+    )
+    assert [time for time, _ in responses] == [
+        start + timedelta(minutes=minute) for minute in range(4)
+    ]
+    assert [data.treated_day for _, data in responses] == [100, 110, 110, 100]
+    assert responses[3][1].holiday_mode == 1
+
+    result = await async_replay(hass, responses)
+
+    assert result["responses"] == 4
+    assert result["duration"] == 180
+    # The treated water blended from 20 °dH down to 5 °dH
+    assert float(result["states"]["sensor.bwt_perla_day_output"]) == pytest.approx(
+        100 * 20 / 15
+    )
+    assert result["states"]["sensor.bwt_perla_holiday_mode"] == "on"
+    # Written once when added, then only on the polls that changed the value
+    assert result["writes"]["sensor.bwt_perla_day_output"] == 3
+    assert result["writes"]["sensor.bwt_perla_holiday_mode"] == 2
@@ -0,0 +1,123 @@
+"""Test the config flow against the emulated device."""
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant import config_entries
+from homeassistant.const import CONF_CODE, CONF_HOST
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import FlowResultType
+
+from custom_components.bwt_perla.const import (
+    CONF_EXPORT_TARGET,
+    CONF_MAX_INTERVAL,
+    CONF_MIN_INTERVAL,
+    DOMAIN,
+)
+
+from . import CODE, HOST
+
+
+async def test_user_step(hass: HomeAssistant, emulator) -> None:
+    """Test an entry is created for a device accepting the code."""
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+    assert result["type"] == FlowResultType.FORM
+    assert result["errors"] == {}
+
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {CONF_HOST: HOST, CONF_CODE: CODE}
+    )
+    await hass.async_block_till_done()
+
+    assert result["type"] == FlowResultType.CREATE_ENTRY
+    assert result["title"] == "BWT Perla"
+    assert result["data"] == {CONF_HOST: HOST, CONF_CODE: CODE}
+    assert emulator.requests >= 1
+
+
+async def test_user_step_wrong_code(hass: HomeAssistant, emulator) -> None:
+    """Test a code the device rejects."""
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {CONF_HOST: HOST, CONF_CODE: "wrong"}
+    )
+
+    assert result["type"] == FlowResultType.FORM
+    assert result["errors"] == {"base": "invalid_auth"}
+
+
+async def test_user_step_cannot_connect(hass: HomeAssistant, socket_enabled) -> None:
+    """Test a host without device."""
+    result = await hass.config_entries.flow.async_init(
+        DOMAIN, context={"source": config_entries.SOURCE_USER}
+    )
+    result = await hass.config_entries.flow.async_configure(
+        result["flow_id"], {CONF_HOST: HOST, CONF_CODE: CODE}
+    )
+
+    assert result["type"] == FlowResultType.FORM
+    assert result["errors"] == {"base": "cannot_connect"}
+
+
+async def test_reauth(
+    hass: HomeAssistant, emulator, config_entry: MockConfigEntry
+) -> None:
+    """Test a changed code is asked for and the entry set up with it."""
+    config_entry.add_to_hass(hass)
+    hass.config_entries.async_update_entry(
+        config_entry, data={**config_entry.data, CONF_CODE: "old"}
+    )
+    assert not await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    [flow] = hass.config_entries.flow.async_progress()
+    assert flow["context"]["source"] == config_entries.SOURCE_REAUTH
+    result = await hass.config_entries.flow.async_configure(
+        flow["flow_id"], {CONF_CODE: "still wrong"}
+    )
+    assert result["errors"] == {"base": "invalid_auth"}
+
+    result = await hass.config_entries.flow.async_configure(
+        flow["flow_id"], {CONF_CODE: CODE}
+    )
+    await hass.async_block_till_done()
+
+    assert result["type"] == FlowResultType.ABORT
+    assert result["reason"] == "reauth_successful"
+    assert config_entry.data[CONF_CODE] == CODE
+    assert config_entry.state is config_entries.ConfigEntryState.LOADED
+
+
+async def test_options(
+    hass: HomeAssistant, emulator, config_entry: MockConfigEntry
+) -> None:
+    """Test the options are validated and applied without a reload."""
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator = hass.data[DOMAIN][config_entry.entry_id]
+
+    result = await hass.config_entries.options.async_init(config_entry.entry_id)
+    assert result["type"] == FlowResultType.FORM
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], {CONF_MIN_INTERVAL: 60, CONF_MAX_INTERVAL: 30}
+    )
+    assert result["errors"] == {"base": "invalid_intervals"}
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"],
+        {CONF_MIN_INTERVAL: 2, CONF_MAX_INTERVAL: 30, CONF_EXPORT_TARGET: "ftp://x"},
+    )
+    assert result["errors"] == {"base": "invalid_export_target"}
+    result = await hass.config_entries.options.async_configure(
+        result["flow_id"], {CONF_MIN_INTERVAL: 2, CONF_MAX_INTERVAL: 60}
+    )
+    await hass.async_block_till_done()
+
+    assert result["type"] == FlowResultType.CREATE_ENTRY
+    assert hass.data[DOMAIN][config_entry.entry_id] is coordinator
+    assert coordinator.policy.min_interval == 2
+    assert coordinator.policy.max_interval == 60
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
@@ -0,0 +1,49 @@
+"""Test the timeout and the circuit breaker of the requests."""
+
+from custom_components.bwt_perla.connection import (
+    TIMEOUT_MAX,
+    TIMEOUT_MIN,
+    CircuitBreaker,
+    RttEstimator,
+)
+
+
+def test_timeout() -> None:
+    """Test the timeout follows the round trip time within its bounds."""
+    rtt = RttEstimator()
+    assert rtt.timeout == TIMEOUT_MAX
+    rtt.add(0.1)
+    assert rtt.timeout == TIMEOUT_MIN
+    rtt.add(2.0)
+    assert TIMEOUT_MIN < rtt.timeout < TIMEOUT_MAX
+    timeout = rtt.timeout
+    rtt.timed_out()
+    assert rtt.timeout == min(TIMEOUT_MAX, timeout * 2)
+    rtt.add(2.0)
+    assert rtt.timeout < timeout * 2
+
+
+def test_circuit_breaker() -> None:
+    """Test the circuit opens after repeated failures and closes on success."""
+    breaker = CircuitBreaker()
+    assert breaker.failure(0) is None
+    assert breaker.failure(1) is None
+    assert not breaker.is_open
+    backoff = breaker.failure(2)
+    assert 24 <= backoff <= 36
+    assert breaker.is_open
+    assert not breaker.allow_request(10)
+    assert breaker.allow_request(2 + backoff)
+    # A failed probe doubles the backoff
+    assert 48 <= breaker.failure(2 + backoff) <= 72
+    breaker.success()
+    assert not breaker.is_open
+    assert breaker.allow_request(0)
+
+
+def test_backoff_limit() -> None:
+    """Test the backoff doesn't grow beyond ten minutes."""
+    breaker = CircuitBreaker()
+    for now in range(20):
+        backoff = breaker.failure(now)
+    assert backoff <= 600 * 1.2
@@ -0,0 +1,37 @@
+"""Test the coordinator polling the emulated device."""
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.bwt_perla.const import DOMAIN
+from custom_components.bwt_perla.coordinator import BwtCoordinator
+
+
+@pytest.fixture
+def emulator_config(emulator_config):
+    """Let water flow all the time, an hour per second."""
+    emulator_config.profile = [(3600, 720)]
+    emulator_config.speed = 3600
+    return emulator_config
+
+
+async def test_flow(
+    hass: HomeAssistant, emulator, config_entry: MockConfigEntry
+) -> None:
+    """Test the flow is polled with the minimum interval."""
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator: BwtCoordinator = hass.data[DOMAIN][config_entry.entry_id]
+    first = coordinator.data.current.blended_total
+
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    assert coordinator.data.current.current_flow == 720
+    assert coordinator.data.current.blended_total > first
+    assert coordinator.update_interval.total_seconds() == 1
+    assert hass.states.get("sensor.bwt_perla_current_flow").state == "0.72"
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
@@ -0,0 +1,53 @@
+"""Test the day, month and year output reconstructed from the total."""
+
+from datetime import datetime
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.bwt_perla.counters import Output, OutputCounters
+
+_DEVICE = Output(100, 500, 900)
+
+
+def _at(*args: int) -> datetime:
+    return datetime(*args, tzinfo=dt_util.UTC)
+
+
+def test_seeded_from_device() -> None:
+    """Test unknown periods start with the values of the device."""
+    counters = OutputCounters()
+    assert counters.update(_at(2024, 1, 10, 12), 1000, _DEVICE) == _DEVICE
+    assert counters.update(_at(2024, 1, 10, 13), 1050, _DEVICE) == (150, 550, 950)
+
+
+def test_new_period() -> None:
+    """Test a period that started between two polls starts at the last total."""
+    counters = OutputCounters()
+    counters.update(_at(2024, 1, 31, 23, 50), 1000, _DEVICE)
+    output = counters.update(_at(2024, 2, 1, 0, 10), 1020, Output(0, 0, 0))
+    assert output == (20, 20, 920)
+
+
+def test_counter_reset() -> None:
+    """Test the total before a reset of the device counter is kept."""
+    counters = OutputCounters()
+    counters.update(_at(2024, 1, 10, 12), 1000, _DEVICE)
+    assert counters.update(_at(2024, 1, 10, 13), 10, _DEVICE) == (110, 510, 910)
+    assert counters.update(_at(2024, 1, 10, 14), 15, _DEVICE) == (115, 515, 915)
+
+
+def test_pause() -> None:
+    """Test a period that started while paused is seeded from the device."""
+    counters = OutputCounters()
+    counters.update(_at(2024, 1, 10, 12), 1000, _DEVICE)
+    counters.pause()
+    output = counters.update(_at(2024, 1, 11, 8), 1100, Output(40, 600, 1000))
+    assert output == (40, 600, 1000)
+
+
+def test_restore() -> None:
+    """Test the anchors survive a restart."""
+    counters = OutputCounters()
+    counters.update(_at(2024, 1, 10, 12), 1000, _DEVICE)
+    restored = OutputCounters.from_dict(counters.as_dict())
+    assert restored.update(_at(2024, 1, 10, 13), 1050, _DEVICE) == (150, 550, 950)
@@ -0,0 +1,65 @@
+"""Test the data derived once per update and the fields that changed."""
+
+from datetime import UTC, datetime
+
+from bwt_api.error import BwtError
+import pytest
+
+from custom_components.bwt_perla.data import BwtData
+
+from . import response
+
+
+def test_changed_fields() -> None:
+    """Test response and derived fields are compared to the previous update."""
+    old = BwtData.from_response(response())
+    new = BwtData.from_response(response(current_flow=500, treated_day=120))
+
+    assert new.changed_fields(None) is None
+    assert new.changed_fields(old) >= {"current_flow", "flow", "treated_day"}
+    assert "blended_day" in new.changed_fields(old)
+    assert not new.changed_fields(old) & {"blended_total", "blended_month", "state"}
+    assert new.changed_fields(new) == frozenset()
+
+
+def test_derived_values() -> None:
+    """Test the values the sensors read are derived from the response."""
+    data = BwtData.from_response(
+        response(
+            errors=[BwtError.OFFLINE_MOTOR_1, BwtError.REGENERATIV_20],
+            holiday_mode=1704067200,
+        )
+    )
+
+    # Treated water with 20 °dH in and 5 °dH out
+    assert data.blended_day == pytest.approx(100 * 20 / 15)
+    assert data.blended_year == pytest.approx(10000 * 20 / 15)
+    assert data.blended_capacity_1 == pytest.approx(50_000_000 / 15_000)
+    assert data.error_names == "OFFLINE_MOTOR_1"
+    assert data.warning_names == "REGENERATIV_20"
+    assert data.holiday_start == datetime(2024, 1, 1, tzinfo=UTC)
+    assert data.flow == 0
+
+
+def test_without_holiday_or_hardness_delta() -> None:
+    """Test values that cannot be derived are None."""
+    data = BwtData.from_response(response(holiday_mode=1, errors=[]))
+
+    assert data.holiday_start is None
+    assert data.error_names == data.warning_names == ""
+    hardness = response().in_hardness
+    data = BwtData.from_response(response(out_hardness=hardness))
+    assert data.blended_capacity_1 is None
+
+
+def test_wanted_fields() -> None:
+    """Test derived values no entity uses are skipped."""
+    data = BwtData.from_response(
+        response(holiday_mode=1704067200), wanted={"blended_day", "current_flow"}
+    )
+
+    assert data.blended_day is not None
+    assert data.blended_month is data.blended_year is None
+    assert data.blended_capacity_1 is data.blended_capacity_2 is None
+    assert data.error_names is data.warning_names is None
+    assert data.holiday_start is None
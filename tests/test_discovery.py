@@ -0,0 +1,104 @@
+"""Test finding the device in the local network."""
+
+from unittest.mock import patch
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+import pytest_socket
+
+from homeassistant import config_entries
+from homeassistant.config_entries import ConfigEntryState
+from homeassistant.const import CONF_CODE, CONF_HOST
+from homeassistant.core import HomeAssistant
+from homeassistant.data_entry_flow import FlowResultType
+
+from custom_components.bwt_perla.api import _DATA_HOSTS
+from custom_components.bwt_perla.const import DOMAIN
+from custom_components.bwt_perla.discovery import (
+    async_discover,
+    async_get_candidate_hosts,
+)
+
+from . import CODE, HOST
+
+# A loopback address without device
+_OTHER_HOST = "127.0.0.2"
+
+
+@pytest.fixture(autouse=True)
+def allow_other_host(socket_enabled) -> None:
+    """Allow connections to the loopback address without device."""
+    pytest_socket.socket_allow_hosts([HOST, _OTHER_HOST], allow_unix_socket=True)
+
+
+def _adapter(enabled: bool, address: str, prefix: int) -> dict:
+    return {
+        "name": "eth0",
+        "index": 0,
+        "enabled": enabled,
+        "auto": True,
+        "default": True,
+        "ipv4": [{"address": address, "network_prefix": prefix}],
+        "ipv6": [],
+    }
+
+
+async def test_candidate_hosts(hass: HomeAssistant) -> None:
+    """Test large subnets are limited to the /24 around the own address."""
+    adapters = [
+        _adapter(True, "192.168.17.10", 16),
+        _adapter(True, "127.0.0.1", 8),
+        _adapter(False, "10.0.0.2", 24),
+    ]
+    with patch(
+        "custom_components.bwt_perla.discovery.network.async_get_adapters",
+        return_value=adapters,
+    ):
+        hosts = await async_get_candidate_hosts(hass)
+
+    assert len(hosts) == 253
+    assert hosts[0] == "192.168.17.1"
+    assert "192.168.17.10" not in hosts
+
+
+async def test_discover(hass: HomeAssistant, emulator) -> None:
+    """Test only hosts accepting the code are found."""
+    assert await async_discover(hass, CODE, [HOST, _OTHER_HOST]) == [HOST]
+    assert await async_discover(hass, "wrong", [HOST, _OTHER_HOST]) == []
+    # The probed hosts keep no request limit
+    assert not hass.data.get(_DATA_HOSTS)
+
+
+async def test_user_step_discovers(hass: HomeAssistant, emulator) -> None:
+    """Test the host is found if the user leaves it empty."""
+    with patch(
+        "custom_components.bwt_perla.discovery.async_get_candidate_hosts",
+        return_value=[_OTHER_HOST, HOST],
+    ):
+        result = await hass.config_entries.flow.async_init(
+            DOMAIN, context={"source": config_entries.SOURCE_USER}
+        )
+        result = await hass.config_entries.flow.async_configure(
+            result["flow_id"], {CONF_HOST: "", CONF_CODE: CODE}
+        )
+        await hass.async_block_till_done()
+
+    assert result["type"] == FlowResultType.CREATE_ENTRY
+    assert result["data"] == {CONF_HOST: HOST, CONF_CODE: CODE}
+
+
+async def test_device_moved(hass: HomeAssistant, emulator) -> None:
+    """Test the entry follows the device to its new address."""
+    entry = MockConfigEntry(
+        domain=DOMAIN, version=2, data={CONF_HOST: _OTHER_HOST, CONF_CODE: CODE}
+    )
+    entry.add_to_hass(hass)
+    with patch(
+        "custom_components.bwt_perla.discovery.async_get_candidate_hosts",
+        return_value=[_OTHER_HOST, HOST],
+    ):
+        assert not await hass.config_entries.async_setup(entry.entry_id)
+        await hass.async_block_till_done()
+
+    assert entry.state is ConfigEntryState.SETUP_RETRY
+    assert entry.data[CONF_HOST] == HOST
@@ -0,0 +1,46 @@
+"""Test the flow derived from the total output."""
+
+from custom_components.bwt_perla.flow import FlowEstimator
+
+
+def test_reported_flow() -> None:
+    """Test the reported flow is used while the device sees it."""
+    estimator = FlowEstimator()
+    assert estimator.update(0, 100, 600) == (0, None, 600)
+    sample = estimator.update(6, 101, 600)
+    assert sample.drawn == 1
+    assert sample.derived_flow == 600
+    assert sample.flow == 600
+
+
+def test_missed_flow() -> None:
+    """Test a draw only seen in the total is reported as flow."""
+    estimator = FlowEstimator()
+    estimator.update(0, 100, 0)
+    sample = estimator.update(10, 102, 0)
+    assert sample.drawn == 2
+    assert sample.derived_flow == 720
+    assert sample.flow == 720
+    # Once the total stopped increasing, the draw is over
+    sample = estimator.update(30, 102, 0)
+    assert sample.derived_flow == 240
+    assert sample.flow == 0
+
+
+def test_window() -> None:
+    """Test the flow is derived from the last minute only."""
+    estimator = FlowEstimator()
+    estimator.update(0, 100, 0)
+    estimator.update(60, 160, 3600)
+    estimator.update(120, 162, 120)
+    sample = estimator.update(180, 164, 120)
+    assert sample.derived_flow == 120
+
+
+def test_counter_reset() -> None:
+    """Test a reset of the total starts over."""
+    estimator = FlowEstimator()
+    estimator.update(0, 100, 0)
+    estimator.update(10, 105, 0)
+    assert estimator.update(20, 3, 0) == (0, None, 0)
+    assert estimator.update(30, 4, 0).drawn == 1
@@ -0,0 +1,69 @@
+"""Test the forecast of the salt and the regenerations."""
+
+from datetime import datetime, timedelta
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.bwt_perla.forecast import Forecaster
+
+_START = datetime(2024, 1, 10, tzinfo=dt_util.UTC)
+_STEP = timedelta(minutes=30)
+
+
+def _run(forecaster: Forecaster, steps: int):
+    """Use 50 liters, 10 g salt, 1 % level and 1e6 capacity per half hour."""
+    forecast = None
+    for i in range(steps):
+        forecast = forecaster.update(
+            _START + i * _STEP,
+            5000 + 10 * i,
+            1000 + 50 * i,
+            80 - i,
+            50_000_000 - 1_000_000 * i,
+            40_000_000 - 1_000_000 * i,
+        )
+    return forecast
+
+
+def test_forecast() -> None:
+    """Test the trends are extrapolated once they are long enough."""
+    forecaster = Forecaster()
+    forecast = _run(forecaster, 2)
+    assert forecast.salt_per_m3 is None
+    assert forecast.salt_refill is None
+
+    forecast = _run(Forecaster(), 13)
+    last = _START + 12 * _STEP
+    assert forecast.salt_per_m3 == 200
+    assert forecast.salt_refill == last + timedelta(hours=34)
+    assert forecast.next_regeneration_1 == last + timedelta(hours=19)
+    assert forecast.next_regeneration_2 == last + timedelta(hours=14)
+    assert forecast.last_salt_refill is None
+
+
+def test_sample_interval() -> None:
+    """Test updates between two samples return the last forecast."""
+    forecaster = Forecaster()
+    forecast = _run(forecaster, 13)
+    later = _START + 12 * _STEP + timedelta(minutes=10)
+    assert forecaster.update(later, 0, 0, 0, 0, 0) is forecast
+
+
+def test_refill() -> None:
+    """Test an increase of the salt level is a refill."""
+    forecaster = Forecaster()
+    _run(forecaster, 13)
+    refill = _START + 13 * _STEP
+    forecast = forecaster.update(refill, 5130, 1650, 100, 37_000_000, 27_000_000)
+    assert forecast.last_salt_refill == refill
+    # The level trend starts over with the refill
+    assert forecast.salt_refill is None
+
+
+def test_restore() -> None:
+    """Test the history survives a restart."""
+    forecaster = Forecaster()
+    forecast = _run(forecaster, 13)
+    restored = Forecaster.from_dict(forecaster.as_dict())
+    later = _START + 12 * _STEP + timedelta(minutes=10)
+    assert restored.update(later, 0, 0, 0, 0, 0) == forecast
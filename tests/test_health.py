@@ -0,0 +1,75 @@
+"""Test the health of the polling and the diagnostics showing it."""
+
+from bwt_api.exception import ConnectException
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.const import CONF_CODE, CONF_HOST
+from homeassistant.core import HomeAssistant
+
+from custom_components.bwt_perla.diagnostics import async_get_config_entry_diagnostics
+from custom_components.bwt_perla.health import PollHealth
+
+
+def test_latency_window() -> None:
+    """Test the histogram only covers the latest polls."""
+    health = PollHealth()
+    for _ in range(500):
+        health.add_latency(0.02)
+    for _ in range(100):
+        health.add_latency(3)
+
+    latency = health.as_dict()["latency"]
+    assert health.polls == 600
+    assert latency["window"] == 500
+    assert latency["histogram"]["<=0.05"] == 400
+    assert latency["histogram"]["<=5"] == 100
+    assert latency["p50"] == 0.05
+    assert latency["p95"] == 5
+    assert latency["max"] == 3
+    assert health.mean_latency == pytest.approx((400 * 0.02 + 100 * 3) / 500)
+
+
+def test_errors_intervals_and_writes() -> None:
+    """Test errors by type, the intervals and the writes per update."""
+    health = PollHealth()
+    assert health.writes_per_update is None
+    assert health.latency_quantile(0.5) is None
+
+    health.add_error(ConnectException())
+    health.add_error(TimeoutError())
+    health.add_error(TimeoutError())
+    health.add_interval(1.2)
+    health.add_interval(30)
+    health.add_notification(3, 20)
+    health.add_notification(1, 22)
+    for _ in range(3):
+        health.add_write()
+
+    assert health.error_count == 3
+    assert health.as_dict()["errors"] == {"ConnectException": 1, "TimeoutError": 2}
+    assert health.as_dict()["intervals"] == {1: 1, 30: 1}
+    assert health.skipped_listeners == 42
+    assert health.writes_per_update == 1.5
+
+
+async def test_diagnostics(
+    hass: HomeAssistant, emulator, config_entry: MockConfigEntry
+) -> None:
+    """Test the diagnostics show the health without the host and code."""
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    diagnostics = await async_get_config_entry_diagnostics(hass, config_entry)
+
+    assert diagnostics["entry"]["data"] == {
+        CONF_HOST: "**REDACTED**",
+        CONF_CODE: "**REDACTED**",
+    }
+    assert diagnostics["coordinator"]["last_update_success"]
+    assert diagnostics["coordinator"]["circuit_open"] is False
+    assert diagnostics["health"]["polls"] == 1
+    assert diagnostics["health"]["latency"]["window"] == 1
+    assert diagnostics["data"]["firmware_version"] == "2.0210"
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
@@ -0,0 +1,114 @@
+"""Test the setup of the integration and its coordinator against the emulator."""
+
+from unittest.mock import patch
+
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.config_entries import SOURCE_REAUTH, ConfigEntryState
+from homeassistant.const import CONF_CODE, STATE_UNAVAILABLE
+from homeassistant.core import HomeAssistant
+
+from custom_components.bwt_perla.const import DOMAIN
+from custom_components.bwt_perla.coordinator import BwtCoordinator
+
+from . import CODE
+
+
+async def test_setup_and_unload(
+    hass: HomeAssistant, emulator, config_entry: MockConfigEntry
+) -> None:
+    """Test the entities show the values of the device."""
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert config_entry.state is ConfigEntryState.LOADED
+    coordinator: BwtCoordinator = hass.data[DOMAIN][config_entry.entry_id]
+    assert coordinator.last_update_success
+    total = hass.states.get("sensor.bwt_perla_total_output")
+    assert int(total.state) == int(emulator.device.blended_total)
+    assert hass.states.get("sensor.bwt_perla_current_flow").state == "0.0"
+    assert hass.states.get("binary_sensor.bwt_perla_leak").state == "off"
+    # Added by the sensor platform
+    assert hass.states.get("sensor.bwt_perla_holiday_mode").state == "off"
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    await hass.async_block_till_done()
+    assert config_entry.state is ConfigEntryState.NOT_LOADED
+    assert hass.states.get("sensor.bwt_perla_total_output").state == STATE_UNAVAILABLE
+
+
+async def test_only_changed_fields_written(
+    hass: HomeAssistant, emulator, config_entry: MockConfigEntry
+) -> None:
+    """Test only the entities whose fields changed write their state."""
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator: BwtCoordinator = hass.data[DOMAIN][config_entry.entry_id]
+    health = coordinator.health
+    day_output = hass.states.get("sensor.bwt_perla_day_output").state
+    writes = health.entity_writes
+    skipped = health.skipped_listeners
+
+    emulator.device.treated_day += 10
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    assert hass.states.get("sensor.bwt_perla_day_output").state != day_output
+    listeners = len(coordinator._listeners)
+    assert health.skipped_listeners - skipped >= listeners - 4
+    assert health.entity_writes - writes <= 4
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+async def test_disabled_entities_skipped(
+    hass: HomeAssistant, emulator, config_entry: MockConfigEntry
+) -> None:
+    """Test the values of entities disabled by default are not derived."""
+    emulator.config.holiday_mode = 1704067200
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator: BwtCoordinator = hass.data[DOMAIN][config_entry.entry_id]
+
+    await coordinator.async_refresh()
+    wanted = coordinator.wanted_fields()
+    assert {"blended_total", "blended_day", "current_flow"} <= wanted
+    assert not wanted & {"holiday_start", "in_hardness", "regeneration_count_1"}
+    assert coordinator.data.holiday_start is None
+    assert coordinator.data.blended_day is not None
+    assert hass.states.get("sensor.bwt_perla_holiday_mode_start") is None
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+async def test_setup_wrong_code(
+    hass: HomeAssistant, emulator, config_entry: MockConfigEntry
+) -> None:
+    """Test a code the device rejects starts a reauth flow."""
+    config_entry.add_to_hass(hass)
+    hass.config_entries.async_update_entry(
+        config_entry, data={**config_entry.data, CONF_CODE: "wrong"}
+    )
+    assert not await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+
+    assert config_entry.state is ConfigEntryState.SETUP_ERROR
+    [flow] = hass.config_entries.flow.async_progress()
+    assert flow["context"]["source"] == SOURCE_REAUTH
+
+
+async def test_setup_unreachable(
+    hass: HomeAssistant, socket_enabled, config_entry: MockConfigEntry
+) -> None:
+    """Test the setup is retried if the device doesn't answer."""
+    config_entry.add_to_hass(hass)
+    with patch(
+        "custom_components.bwt_perla.coordinator.async_discover", return_value=[]
+    ) as discover:
+        assert not await hass.config_entries.async_setup(config_entry.entry_id)
+        await hass.async_block_till_done()
+
+    assert config_entry.state is ConfigEntryState.SETUP_RETRY
+    # The device is searched at another address
+    discover.assert_called_once_with(hass, CODE)
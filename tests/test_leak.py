@@ -0,0 +1,93 @@
+"""Test the detection of continuous flows and drips."""
+
+from datetime import datetime, timedelta
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.bwt_perla.leak import (
+    LEAK_DRIP,
+    LEAK_FLOW,
+    LeakConfig,
+    LeakDetector,
+)
+
+_NOON = datetime(2024, 1, 10, 12, tzinfo=dt_util.UTC)
+_NIGHT = datetime(2024, 1, 10, 1, tzinfo=dt_util.UTC)
+_INTERVAL = timedelta(seconds=30)
+
+
+def test_volume() -> None:
+    """Test a flow drawing more than the volume is a leak."""
+    detector = LeakDetector(LeakConfig(volume=100))
+    for i in range(9):
+        state = detector.update(_NOON + timedelta(seconds=10 * i), 1200, 10, _INTERVAL)
+        assert state.reason is None
+    state = detector.update(_NOON + timedelta(seconds=90), 1200, 10, _INTERVAL)
+    assert state == (LEAK_FLOW, 90, 100)
+
+
+def test_duration() -> None:
+    """Test a flow lasting longer than the duration is a leak."""
+    detector = LeakDetector(LeakConfig(duration=10))
+    for minute in range(10):
+        state = detector.update(_NOON + timedelta(minutes=minute), 30, 0, _INTERVAL)
+        assert state.reason is None
+    state = detector.update(_NOON + timedelta(minutes=10), 30, 1, _INTERVAL)
+    assert state.reason == LEAK_FLOW
+    assert state.duration == 600
+
+
+def test_gap() -> None:
+    """Test a flow ends after a long enough poll without flow."""
+    detector = LeakDetector(LeakConfig())
+    detector.update(_NOON, 600, 5, _INTERVAL)
+    state = detector.update(_NOON + timedelta(seconds=30), 0, 5, _INTERVAL)
+    assert state.duration == 30
+    assert state.volume == 10
+    state = detector.update(_NOON + timedelta(seconds=200), 0, 0, _INTERVAL)
+    assert state == (None, 0, 0)
+
+
+def test_gap_of_slow_polls() -> None:
+    """Test a draw seen by polls further apart than the gap is continuous."""
+    detector = LeakDetector(LeakConfig(volume=30))
+    interval = timedelta(seconds=300)
+    for i in range(3):
+        state = detector.update(_NOON + i * interval, 0, 10, interval)
+    assert state == (LEAK_FLOW, 600, 30)
+
+
+def test_drip() -> None:
+    """Test water drawn in every slot of the night is a drip."""
+    detector = LeakDetector(LeakConfig())
+    for slot in range(3):
+        state = detector.update(
+            _NIGHT + timedelta(minutes=30 * slot + 5), 0, 1, _INTERVAL
+        )
+        assert state.reason is None
+    state = detector.update(_NIGHT + timedelta(minutes=95), 0, 1, _INTERVAL)
+    assert state.reason == LEAK_DRIP
+    # Still reported within the next slot
+    state = detector.update(_NIGHT + timedelta(minutes=125), 0, 0, _INTERVAL)
+    assert state.reason == LEAK_DRIP
+    # A slot without water ends the drip
+    state = detector.update(_NIGHT + timedelta(minutes=155), 0, 0, _INTERVAL)
+    assert state.reason is None
+
+
+def test_drip_ends_with_window() -> None:
+    """Test a drip is no longer reported after the window."""
+    detector = LeakDetector(LeakConfig())
+    for slot in range(8):
+        state = detector.update(_NIGHT + timedelta(minutes=30 * slot), 0, 1, _INTERVAL)
+    assert state.reason == LEAK_DRIP
+    state = detector.update(_NIGHT + timedelta(hours=4), 0, 1, _INTERVAL)
+    assert state.reason is None
+
+
+def test_no_drip_outside_window() -> None:
+    """Test water drawn during the day is no drip."""
+    detector = LeakDetector(LeakConfig())
+    for slot in range(6):
+        state = detector.update(_NOON + timedelta(minutes=30 * slot), 0, 1, _INTERVAL)
+    assert state.reason is None
@@ -0,0 +1,53 @@
+"""Test the polling policy configured in the options."""
+
+from datetime import datetime, time, timedelta
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.bwt_perla.const import (
+    CONF_MAX_INTERVAL,
+    CONF_QUIET_END,
+    CONF_QUIET_START,
+)
+from custom_components.bwt_perla.policy import PollingPolicy
+
+
+def _at(hour: int, minute: int = 0) -> datetime:
+    return datetime(2024, 1, 10, hour, minute, tzinfo=dt_util.UTC)
+
+
+def test_from_options() -> None:
+    """Test missing options use the defaults."""
+    assert PollingPolicy.from_options({}) == PollingPolicy()
+    policy = PollingPolicy.from_options(
+        {CONF_MAX_INTERVAL: 60, CONF_QUIET_START: "22:00:00", CONF_QUIET_END: "06:00"}
+    )
+    assert policy.max_interval == 60
+    assert policy.quiet_start == time(22)
+    assert policy.quiet_end == time(6)
+
+
+def test_quiet_window() -> None:
+    """Test a quiet window within a day and one spanning midnight."""
+    policy = PollingPolicy(quiet_start=time(22), quiet_end=time(6))
+    assert policy.is_quiet(_at(23))
+    assert policy.is_quiet(_at(5, 59))
+    assert not policy.is_quiet(_at(6))
+    assert not policy.is_quiet(_at(12))
+    policy = PollingPolicy(quiet_start=time(9), quiet_end=time(17))
+    assert policy.is_quiet(_at(12))
+    assert not policy.is_quiet(_at(23))
+    assert not PollingPolicy().is_quiet(_at(12))
+
+
+def test_idle_interval() -> None:
+    """Test the interval without flow."""
+    policy = PollingPolicy(
+        max_interval=30, quiet_start=time(22), quiet_end=time(6), quiet_interval=120
+    )
+    assert policy.idle_interval(_at(12), False, 1.0) == timedelta(seconds=30)
+    assert policy.idle_interval(_at(12), False, 0.5) == timedelta(seconds=15)
+    assert policy.idle_interval(_at(23), False, 0.5) == timedelta(seconds=120)
+    assert policy.idle_interval(_at(23), True, 1.0) == timedelta(seconds=300)
+    # Never shorter than the interval during a flow
+    assert policy.idle_interval(_at(12), False, 0.01) == timedelta(seconds=1)
@@ -0,0 +1,50 @@
+"""Test the policy of publishing fast changing values."""
+
+from custom_components.bwt_perla.publish import PublishPolicy, Publisher
+
+_POLICY = PublishPolicy(
+    deadband=0.01, relative_deadband=0.1, min_interval=5, heartbeat=60
+)
+
+
+def test_first_value() -> None:
+    """Test the first value is published right away."""
+    assert Publisher(_POLICY).delay(0, 0.5) == 0
+
+
+def test_min_interval() -> None:
+    """Test significant changes are published at most every min_interval."""
+    publisher = Publisher(_POLICY)
+    publisher.published(0, 0.5)
+    assert publisher.delay(2, 1.0) == 3
+    assert publisher.delay(7, 1.0) == 0
+
+
+def test_deadband() -> None:
+    """Test changes within the deadband wait for the heartbeat."""
+    publisher = Publisher(_POLICY)
+    publisher.published(0, 0.5)
+    assert publisher.delay(10, 0.54) == 50
+    assert publisher.delay(10, 0.5) == 50
+    assert publisher.delay(70, 0.54) == 0
+    publisher = Publisher(PublishPolicy(deadband=1))
+    publisher.published(0, 5)
+    assert publisher.heartbeat is None
+    assert publisher.delay(10, 5.5) is None
+
+
+def test_start_and_end_of_flow() -> None:
+    """Test changes from and to zero are always significant."""
+    publisher = Publisher(_POLICY)
+    publisher.published(0, 0)
+    assert publisher.delay(10, 0.005) == 0
+    publisher.published(10, 0.005)
+    assert publisher.delay(20, 0) == 0
+
+
+def test_reset() -> None:
+    """Test the next value is published right away after a reset."""
+    publisher = Publisher(_POLICY)
+    publisher.published(0, 0.5)
+    publisher.reset()
+    assert publisher.delay(1, 0.5) == 0
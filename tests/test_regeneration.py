@@ -0,0 +1,157 @@
+"""Test the log of the regenerations and the websocket command reading it."""
+
+from datetime import UTC, datetime, timedelta
+import json
+
+from pytest_homeassistant_custom_component.common import (
+    MockConfigEntry,
+    async_capture_events,
+)
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.bwt_perla.const import DOMAIN, EVENT_REGENERATION
+from custom_components.bwt_perla.coordinator import BwtCoordinator
+from custom_components.bwt_perla.regeneration import RegenerationLog
+
+from . import response
+
+_TIME = datetime(2024, 1, 1, tzinfo=UTC)
+
+
+def _regenerate(log: RegenerationLog, regenerations: int) -> None:
+    """Let the first column regenerate after every 100 liters and 180 grams."""
+    for index in range(1, regenerations + 1):
+        log.update(
+            response(
+                regeneration_count_1=10 + index,
+                regeneration_last_1=_TIME + timedelta(hours=index),
+                blended_total=1000 + 100 * index,
+                regenerativ_total=5000 + 180 * index,
+            )
+        )
+
+
+def test_update() -> None:
+    """Test the regenerations are detected from the counters and times."""
+    log = RegenerationLog()
+    assert log.update(response()) == []
+    assert log.update(response(blended_total=1100)) == []
+
+    first = log.update(response(regeneration_count_1=11, blended_total=1200))
+    assert [(event.column, event.count, event.water) for event in first] == [
+        (1, 11, None)
+    ]
+
+    # A new time without a new count is a regeneration too
+    last = _TIME + timedelta(hours=1)
+    second = log.update(
+        response(
+            regeneration_count_1=11,
+            regeneration_last_2=last,
+            blended_total=1500,
+            regenerativ_total=5180,
+        )
+    )
+    assert second[0].as_event() == {
+        "time": last.isoformat(),
+        "column": 2,
+        "count": 11,
+        "water": 300,
+        "salt": 180,
+    }
+    assert list(log.events) == first + second
+
+
+def test_bounded() -> None:
+    """Test the log keeps the latest regenerations only."""
+    log = RegenerationLog()
+    log.update(response())
+    _regenerate(log, 250)
+
+    assert len(log.events) == 200
+    assert log.events[0].count == 61
+    assert [event.count for event in log.since(_TIME + timedelta(hours=249))] == [
+        259,
+        260,
+    ]
+
+
+def test_stored() -> None:
+    """Test a restored log continues where the stored one stopped."""
+    log = RegenerationLog()
+    log.update(response())
+    _regenerate(log, 2)
+
+    restored = RegenerationLog.from_dict(json.loads(json.dumps(log.as_dict())))
+
+    assert list(restored.events) == list(log.events)
+    # The values of the last regeneration before the restart
+    unchanged = response(
+        regeneration_count_1=12,
+        regeneration_last_1=_TIME + timedelta(hours=2),
+        blended_total=1200,
+        regenerativ_total=5360,
+    )
+    assert restored.update(unchanged) == []
+    new = restored.update(
+        response(
+            regeneration_count_1=13,
+            regeneration_last_1=_TIME + timedelta(hours=3),
+            blended_total=1300,
+            regenerativ_total=5540,
+        )
+    )
+    assert [(event.count, event.water, event.salt) for event in new] == [(13, 100, 180)]
+    assert RegenerationLog.from_dict(None).as_dict() == RegenerationLog().as_dict()
+
+
+async def test_websocket(
+    hass: HomeAssistant,
+    hass_ws_client,
+    emulator,
+    config_entry: MockConfigEntry,
+) -> None:
+    """Test a regeneration of the device is fired and returned by the command."""
+    events = async_capture_events(hass, EVENT_REGENERATION)
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    coordinator: BwtCoordinator = hass.data[DOMAIN][config_entry.entry_id]
+
+    last = datetime.now(UTC).replace(microsecond=0) + timedelta(hours=1)
+    emulator.device.regeneration_count[1] += 1
+    emulator.device.regeneration_last[1] = last
+    await coordinator.async_refresh()
+    await hass.async_block_till_done()
+
+    assert len(events) == 1
+    assert events[0].data["entry_id"] == config_entry.entry_id
+    assert events[0].data["column"] == 2
+
+    client = await hass_ws_client(hass)
+    await client.send_json_auto_id(
+        {"type": f"{DOMAIN}/regenerations", "entry_id": config_entry.entry_id}
+    )
+    result = await client.receive_json()
+    assert result["success"]
+    assert result["result"]["regenerations"] == [
+        {key: value for key, value in events[0].data.items() if key != "entry_id"}
+    ]
+
+    await client.send_json_auto_id(
+        {
+            "type": f"{DOMAIN}/regenerations",
+            "entry_id": config_entry.entry_id,
+            "start_time": (last + timedelta(seconds=1)).isoformat(),
+        }
+    )
+    result = await client.receive_json()
+    assert result["result"]["regenerations"] == []
+
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+    await client.send_json_auto_id(
+        {"type": f"{DOMAIN}/regenerations", "entry_id": config_entry.entry_id}
+    )
+    result = await client.receive_json()
+    assert result["error"]["code"] == "not_found"
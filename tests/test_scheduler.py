@@ -0,0 +1,97 @@
+"""Test the request slots and poll phases shared by all devices."""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import Mock
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.core import HomeAssistant
+
+from custom_components.bwt_perla.coordinator import BwtCoordinator
+from custom_components.bwt_perla.scheduler import PollScheduler
+
+
+async def test_priority() -> None:
+    """Test devices with flow get a free slot first."""
+    scheduler = PollScheduler()
+    started = []
+    done = asyncio.Event()
+
+    async def poll(name: str, priority: bool) -> None:
+        async with scheduler.request_slot(priority):
+            started.append(name)
+            await done.wait()
+
+    tasks = [asyncio.create_task(poll(f"idle {i}", False)) for i in range(6)]
+    await asyncio.sleep(0)
+    tasks.append(asyncio.create_task(poll("flow", True)))
+    await asyncio.sleep(0)
+    assert len(started) == 4
+
+    tasks[4].cancel()
+    done.set()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    assert started[4] == "flow"
+    assert "idle 4" not in started
+
+
+async def test_cancelled_after_handover() -> None:
+    """Test a slot handed to a cancelled waiter is passed on."""
+    scheduler = PollScheduler()
+    for _ in range(4):
+        await scheduler._acquire(False)
+    first = asyncio.create_task(scheduler._acquire(False))
+    second = asyncio.create_task(scheduler._acquire(False))
+    await asyncio.sleep(0)
+
+    scheduler._release()
+    first.cancel()
+    await asyncio.gather(first, return_exceptions=True)
+    await second
+    assert scheduler._active == 4
+
+
+async def test_cancelled_after_release() -> None:
+    """Test a cancelled waiter a release already dropped."""
+    scheduler = PollScheduler()
+    for _ in range(4):
+        await scheduler._acquire(False)
+    waiter = asyncio.create_task(scheduler._acquire(False))
+    await asyncio.sleep(0)
+
+    waiter.cancel()
+    scheduler._release()
+    await asyncio.gather(waiter, return_exceptions=True)
+    assert scheduler._active == 3
+    assert not any(scheduler._waiting)
+
+
+def test_spread_phases() -> None:
+    """Test the polls of the devices are spread over the second."""
+    scheduler = PollScheduler()
+    coordinators = [SimpleNamespace(poll_phase=0.3) for _ in range(4)]
+    unregister = [scheduler.async_register(coordinator) for coordinator in coordinators]
+    assert [c.poll_phase for c in coordinators] == [0, 0.25, 0.5, 0.75]
+
+    unregister[0]()
+    assert [c.poll_phase for c in coordinators[1:]] == [0, 1 / 3, 2 / 3]
+
+
+async def test_poll_phase(
+    hass: HomeAssistant, config_entry: MockConfigEntry, caplog: pytest.LogCaptureFixture
+) -> None:
+    """Test the phase is the offset of the scheduled polls within the second."""
+    config_entry.add_to_hass(hass)
+    coordinator = BwtCoordinator(hass, Mock(), config_entry)
+
+    coordinator.poll_phase = 0.5
+    assert coordinator.poll_phase == 0.5
+    assert coordinator._microsecond == 0.5
+
+    # A Home Assistant version without the private offset
+    del coordinator._microsecond
+    coordinator.poll_phase = 0.25
+    assert not hasattr(coordinator, "_microsecond")
+    assert "can't be staggered" in caplog.text
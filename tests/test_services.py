@@ -0,0 +1,86 @@
+"""Test the services of the integration."""
+
+import asyncio
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant
+from homeassistant.exceptions import ServiceValidationError
+
+from custom_components.bwt_perla.const import DOMAIN
+from custom_components.bwt_perla.coordinator import BwtCoordinator
+from custom_components.bwt_perla.services import SERVICE_REFRESH
+
+
+async def _setup(hass: HomeAssistant, config_entry: MockConfigEntry) -> BwtCoordinator:
+    config_entry.add_to_hass(hass)
+    assert await hass.config_entries.async_setup(config_entry.entry_id)
+    await hass.async_block_till_done()
+    return hass.data[DOMAIN][config_entry.entry_id]
+
+
+async def _refresh(hass: HomeAssistant, entry_id: str, **data) -> None:
+    await hass.services.async_call(
+        DOMAIN,
+        SERVICE_REFRESH,
+        {"config_entry_id": entry_id, **data},
+        blocking=True,
+    )
+
+
+async def test_refresh(
+    hass: HomeAssistant, emulator, config_entry: MockConfigEntry
+) -> None:
+    """Test concurrent refreshes poll once and fresh data is not polled again."""
+    coordinator = await _setup(hass, config_entry)
+    requests = emulator.requests
+
+    # Polled within the debounce window by the setup
+    await _refresh(hass, config_entry.entry_id)
+    assert emulator.requests == requests
+
+    coordinator._last_poll -= 10
+    emulator.device.treated_day += 10
+    await asyncio.gather(*(_refresh(hass, config_entry.entry_id) for _ in range(5)))
+    assert emulator.requests == requests + 1
+    assert coordinator.data.current.treated_day == emulator.device.treated_day
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+async def test_boost(
+    hass: HomeAssistant, emulator, config_entry: MockConfigEntry
+) -> None:
+    """Test a boost polls with the minimum interval while the device is idle."""
+    coordinator = await _setup(hass, config_entry)
+    assert coordinator.update_interval.total_seconds() > coordinator.policy.min_interval
+
+    await _refresh(hass, config_entry.entry_id, boost=60)
+
+    assert (
+        coordinator.update_interval.total_seconds() == coordinator.policy.min_interval
+    )
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+async def test_boost_limit(
+    hass: HomeAssistant, emulator, config_entry: MockConfigEntry
+) -> None:
+    """Test a boost beyond the maximum is rejected."""
+    await _setup(hass, config_entry)
+
+    with pytest.raises(vol.Invalid):
+        await _refresh(hass, config_entry.entry_id, boost=601)
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+
+async def test_not_loaded(
+    hass: HomeAssistant, emulator, config_entry: MockConfigEntry
+) -> None:
+    """Test a device that is not loaded is reported."""
+    await _setup(hass, config_entry)
+    assert await hass.config_entries.async_unload(config_entry.entry_id)
+
+    with pytest.raises(ServiceValidationError):
+        await _refresh(hass, config_entry.entry_id)
@@ -0,0 +1,50 @@
+"""Test the hourly statistics aggregated from the polls."""
+
+from datetime import datetime, timedelta
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.bwt_perla.statistics import HourlyStatistics
+
+_HOUR = datetime(2024, 1, 10, 12, tzinfo=dt_util.UTC)
+
+
+def test_hourly_rows() -> None:
+    """Test an hour is completed by the first poll of the next one."""
+    statistics = HourlyStatistics()
+    assert not statistics.add(_HOUR, 10, 1000, 0)
+    assert not statistics.add(_HOUR + timedelta(minutes=30), 30, 1005, 600)
+    assert not statistics.add(_HOUR + timedelta(minutes=59), 20, 1010, 0)
+    assert statistics.add(_HOUR + timedelta(hours=1), 10, 1010, 0)
+
+    assert statistics.pop_rows() == [(_HOUR.timestamp(), 1010, 1010, 300, 0, 600)]
+    assert statistics.pop_rows() == []
+
+
+def test_restore() -> None:
+    """Test the completed and the current hour survive a restart."""
+    statistics = HourlyStatistics()
+    statistics.add(_HOUR, 10, 1000, 120)
+    statistics.add(_HOUR + timedelta(hours=1), 10, 1010, 0)
+    statistics.add(_HOUR + timedelta(hours=1, minutes=5), 10, 1012, 240)
+
+    restored = HourlyStatistics.from_dict(statistics.as_dict())
+    assert restored.add(_HOUR + timedelta(hours=2), 10, 1012, 0)
+    assert restored.pop_rows() == [
+        (_HOUR.timestamp(), 1000, 1000, 120, 120, 120),
+        ((_HOUR + timedelta(hours=1)).timestamp(), 1012, 1012, 120, 0, 240),
+    ]
+
+
+def test_reset() -> None:
+    """Test the sum continues when the device total is reset."""
+    statistics = HourlyStatistics()
+    statistics.add(_HOUR, 10, 1000, 0)
+    statistics.add(_HOUR + timedelta(minutes=30), 10, 1010, 0)
+    statistics.add(_HOUR + timedelta(hours=1), 10, 5, 0)
+    # The reset survives a restart
+    statistics = HourlyStatistics.from_dict(statistics.as_dict())
+    statistics.add(_HOUR + timedelta(hours=1, minutes=30), 10, 20, 0)
+    statistics.add(_HOUR + timedelta(hours=2), 10, 20, 0)
+
+    assert [row[1:3] for row in statistics.pop_rows()] == [(1010, 1010), (20, 1030)]
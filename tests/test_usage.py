@@ -0,0 +1,68 @@
+"""Test the learned usage scaling the idle interval."""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.bwt_perla.usage import UsageHistogram
+
+# A Monday
+_MONDAY = datetime(2024, 1, 8, 12, tzinfo=dt_util.UTC)
+
+
+def _observe(
+    usage: UsageHistogram, start: datetime, seconds: int, flowing: int
+) -> None:
+    """Observe the hour of the start in polls of a minute."""
+    for second in range(0, seconds, 60):
+        usage.record(start + timedelta(seconds=second), 60, second < flowing)
+
+
+def test_unknown() -> None:
+    """Test the interval is kept until a bucket was observed for an hour."""
+    usage = UsageHistogram()
+    _observe(usage, _MONDAY, 1800, 0)
+
+    assert usage.probability(_MONDAY) is None
+    assert usage.interval_factor(_MONDAY) == 1.0
+
+
+def test_quiet_and_busy() -> None:
+    """Test quiet hours poll less often and busy ones more often."""
+    usage = UsageHistogram()
+    _observe(usage, _MONDAY, 3600, 0)
+    _observe(usage, _MONDAY + timedelta(hours=1), 3600, 600)
+
+    assert usage.probability(_MONDAY) == 0
+    assert usage.interval_factor(_MONDAY) == 2.0
+    assert usage.interval_factor(_MONDAY + timedelta(hours=1)) == pytest.approx(1 / 3)
+    # The busy hour already counts shortly before it starts
+    assert usage.interval_factor(_MONDAY + timedelta(minutes=50)) == pytest.approx(
+        1 / 3
+    )
+    # The same hour on another weekday is still unknown
+    assert usage.probability(_MONDAY + timedelta(days=1, hours=1)) is None
+
+
+def test_fade_out() -> None:
+    """Test old observations lose weight and long gaps are capped."""
+    usage = UsageHistogram()
+    usage.record(_MONDAY, 3600, True)
+    _observe(usage, _MONDAY, 4 * 3600, 0)
+
+    assert 0 < usage.probability(_MONDAY) < 0.2
+    assert usage.as_dict()["observed"][12] <= 4 * 3600
+
+
+def test_restore() -> None:
+    """Test the histogram survives a restart and invalid data is ignored."""
+    usage = UsageHistogram()
+    _observe(usage, _MONDAY, 3600, 360)
+
+    restored = UsageHistogram.from_dict(usage.as_dict())
+    assert restored.probability(_MONDAY) == pytest.approx(0.1)
+    assert UsageHistogram.from_dict({"observed": [1], "flowing": [0]}).as_dict() == (
+        UsageHistogram().as_dict()
+    )